@@ -1,20 +1,37 @@
 import streamlit as st
-import joblib
+import os
 import re
 import time
 import plotly.graph_objects as go
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+from artifacts import (
+    DEFAULT_ARTIFACT_DIR,
+    DEFAULT_MODEL_PATH,
+    DEFAULT_VECTORIZER_PATH,
+    MODEL_INFO_PATH,
+    has_artifacts,
+    load_mapped_resources,
+    load_model_info,
+    load_pickle_resources,
+    model_path,
+)
+from compiled_scorer import _to_builtin
+from explain import explain_row
+from features import scan_features
+from metrics import METRICS
+from result_cache import VerdictCache, fingerprint_files
 
 # =============================================================================
 # 1. KONFIGURASI GLOBAL & INJEKSI CSS TINGKAT LANJUT
 # =============================================================================
 
-st.set_page_config(
-    page_title="Deteksi Berita Hoax | Diskominfo Jabar",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Konfigurasi halaman dipanggil dari blok eksekusi agar modul ini dapat diimpor
+# oleh skrip non-UI (mis. batch.py) tanpa memicu perintah Streamlit.
+def configure_page():
+    st.set_page_config(
+        page_title="Deteksi Berita Hoax | Diskominfo Jabar",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
 
 # Injeksi CSS Kustom untuk estetika yang disempurnakan
 def inject_custom_css():
@@ -121,81 +138,155 @@ def inject_custom_css():
         </style>
     """, unsafe_allow_html=True)
 
-inject_custom_css()
-
 # Inisialisasi session state
-if 'text_input' not in st.session_state:
-    st.session_state.text_input = ""
-if 'last_result' not in st.session_state:
-    st.session_state.last_result = None
+def init_session_state():
+    if 'text_input' not in st.session_state:
+        st.session_state.text_input = ""
+    if 'last_result' not in st.session_state:
+        st.session_state.last_result = None
+    if 'last_view' not in st.session_state:
+        st.session_state.last_view = None
 
 # =============================================================================
 # 2. FUNGSI INTI & PEMUATAN SUMBER DAYA
 # =============================================================================
 
+# Jumlah token minimum setelah pembersihan agar teks layak dianalisis
+MIN_CLEAN_TOKENS = 5
+TEXT_TOO_SHORT_ERROR = "Teks terlalu singkat atau tidak mengandung informasi yang cukup untuk dianalisis."
+
+# Cache verdict untuk teks yang berulang/hampir sama (lihat result_cache.py).
+# Isi RESULT_CACHE_PATH (mis. "verdict_cache.sqlite3") untuk backend disk.
+RESULT_CACHE_PATH = None
+
+# Teks sangat panjang (mis. PDF utuh yang ditempel) dianalisis per potongan agar
+# memori puncak tidak berlipat mengikuti panjang teks (lihat streaming.py)
+STREAMING_MIN_CHARS = 200_000
+
 @st.cache_resource
 def load_resources():
     try:
-        resources = {
-            "model": joblib.load('svm_model.pkl'),
-            "vectorizer": joblib.load('tfidf_vectorizer.pkl'),
-            "stemmer": StemmerFactory().create_stemmer(),
-            "stopwords": set(StopWordRemoverFactory().get_stop_words())
-        }
+        # Artefak mmap (lihat artifacts.py) dipakai bila tersedia agar beberapa
+        # proses Streamlit berbagi halaman memori model yang sama
+        # Semua file model dicari di direktori model yang sama (lihat artifacts.model_path)
+        artifact_dir = model_path(DEFAULT_ARTIFACT_DIR)
+        if has_artifacts(artifact_dir):
+            resources = load_mapped_resources(artifact_dir)
+            model_files = [os.path.join(artifact_dir, name) for name in ("meta.json", "coef.npy", "idf.npy")]
+        else:
+            model_files = [model_path(DEFAULT_MODEL_PATH), model_path(DEFAULT_VECTORIZER_PATH)]
+            resources = load_pickle_resources(*model_files)
+        resources["model_info"] = load_model_info(model_path(MODEL_INFO_PATH))
+        resources["result_cache"] = VerdictCache(namespace=fingerprint_files(model_files), path=RESULT_CACHE_PATH)
         return resources
     except FileNotFoundError:
         st.error("Error: Pastikan file model 'svm_model.pkl' dan 'tfidf_vectorizer.pkl' ada di direktori yang sama.")
         return None
 
-def run_text_preprocessing(text: str, _stemmer, _stopwords) -> str:
+# Tahapan pembersihan dipisah agar dapat diukur sendiri-sendiri (lihat bench.py)
+def clean_text(text: str) -> str:
     text = text.lower()
     text = re.sub(r'http\S+|www\S+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\d+|[^\w\s]', ' ', text)
-    tokens = [word for word in text.split() if word not in _stopwords and len(word) > 1]
-    tokens = [_stemmer.stem(word) for word in tokens]
+    return re.sub(r'\d+|[^\w\s]', ' ', text)
+
+def filter_stopwords(text: str, _stopwords) -> list:
+    return [word for word in text.split() if word not in _stopwords and len(word) > 1]
+
+def stem_tokens(tokens, _stemmer) -> list:
+    return [_stemmer.stem(word) for word in tokens]
+
+def run_text_preprocessing(text: str, _stemmer, _stopwords) -> str:
+    with METRICS.stage("cleanup"):
+        text = clean_text(text)
+    with METRICS.stage("stopwords"):
+        tokens = filter_stopwords(text, _stopwords)
+    with METRICS.stage("stemming"):
+        tokens = stem_tokens(tokens, _stemmer)
     return ' '.join(tokens)
 
+# Analisis mentah dilakukan pada teks asli sebelum pembersihan, dalam satu
+# pemindaian token (lihat features.py untuk leksikon dan pola yang dipakai)
+def compute_raw_analysis(text: str) -> dict:
+    return scan_features(text)
+
 def perform_analysis(text: str, resources: dict):
+    with METRICS.stage("total"):
+        result = None
+        if len(text) >= STREAMING_MIN_CHARS:
+            # Impor lokal karena streaming.py memakai tahapan pembersihan dari modul ini
+            from streaming import analyze_stream, supports_streaming
+            if supports_streaming(resources):
+                result = analyze_stream(text, resources)
+        if result is None:
+            result = _perform_analysis(text, resources)
+    METRICS.inc("analyses_total", outcome=result.get("cache", "rejected"))
+    return result
+
+# Setiap tahap diukur lewat METRICS.stage (lihat metrics.py); tanpa HOAX_METRICS=1
+# pengukuran nonaktif dan biayanya dapat diabaikan
+def _perform_analysis(text: str, resources: dict):
     start_time = time.time()
-    
-    # Analisis mentah dilakukan pada teks asli sebelum pembersihan
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s for s in sentences if len(s.split()) > 3]
-    avg_sentence_length = sum(len(s.split()) for s in sentences) / len(sentences) if sentences else 0
-
-    raw_analysis = {
-        "word_count": len(text.split()),
-        "avg_sentence_length": avg_sentence_length,
-        "num_count": len(re.findall(r'\d', text)),
-        "upper_count": len(re.findall(r'\b[A-Z]{2,}\b', text)),
-        "exclamation_count": text.count('!'),
-        "question_count": text.count('?'),
-        "quote_count": text.count('"') + text.count("'"),
-        "first_person_count": len(re.findall(r'\b(saya|kami|penulis)\b', text, re.IGNORECASE)),
-        "has_source": bool(re.search(r'(dilansir|menurut|sumber|dikutip|melansir)', text, re.IGNORECASE)),
-        "call_to_action": len(re.findall(r'\b(bagikan|sebarkan|viralkan|share)\b', text, re.IGNORECASE)),
-        "emotional_words": len(re.findall(r'(waspada|sebarkan|penting|bahaya|terungkap|fakta|bukti|viral|heboh|menggemparkan|skandal)', text, re.IGNORECASE)),
-        "clickbait_phrases": len(re.findall(r'(mengejutkan|terbongkar|jangan kaget|wajib tahu|ternyata|begini|tak disangka)', text, re.IGNORECASE)),
-        "entity_mentions": len(re.findall(r'\b(presiden|menteri|gubernur|polri|kpk|dpr|pemprov|pemkab|kemenkeu|bi|istana)\b', text, re.IGNORECASE)),
-        "date_mentions": len(re.findall(r'\b(\d{1,2}\s(januari|februari|maret|april|mei|juni|juli|agustus|september|oktober|november|desember)\s\d{4})\b|\b(\d{4})\b', text, re.IGNORECASE)),
-    }
-    
-    cleaned_text = run_text_preprocessing(text, resources["stemmer"], resources["stopwords"])
-    
-    # Validasi setelah pembersihan
-    if len(cleaned_text.split()) < 5:
-        return {"error": "Teks terlalu singkat atau tidak mengandung informasi yang cukup untuk dianalisis."}
 
-    vectorized_text = resources["vectorizer"].transform([cleaned_text])
-    prediction = resources["model"].predict(vectorized_text)[0]
-    probability = resources["model"].predict_proba(vectorized_text)[0]
+    with METRICS.stage("raw_features"):
+        raw_analysis = compute_raw_analysis(text)
+    result_cache = resources.get("result_cache")
+
+    # Duplikat persis (setelah normalisasi) langsung memakai verdict tersimpan
+    with METRICS.stage("cache_lookup"):
+        cache_key = result_cache.key(text) if result_cache is not None else None
+        verdict = result_cache.get_exact(cache_key) if result_cache is not None else None
+    cache_status = "exact" if verdict is not None else "fresh"
+
+    if verdict is None:
+        cleaned_text = run_text_preprocessing(text, resources["stemmer"], resources["stopwords"])
+        tokens = cleaned_text.split()
+
+        # Validasi setelah pembersihan
+        if len(tokens) < MIN_CLEAN_TOKENS:
+            METRICS.inc("rejected_too_short_total")
+            return {"error": TEXT_TOO_SHORT_ERROR}
+
+        # Repost yang hanya berbeda sedikit dicari lewat indeks SimHash/MinHash
+        fingerprint = None
+        if result_cache is not None:
+            with METRICS.stage("cache_lookup"):
+                fingerprint = result_cache.fingerprint(tokens)
+                verdict = result_cache.get_near(fingerprint)
+            if verdict is not None:
+                cache_status = "near_duplicate"
+
+        if verdict is None:
+            if resources.get("scorer") is not None:
+                with METRICS.stage("compiled_score"):
+                    prediction, probability = resources["scorer"].score(cleaned_text)
+                with METRICS.stage("explain"):
+                    explanation = resources["scorer"].explain(cleaned_text)
+            else:
+                with METRICS.stage("vectorize"):
+                    vectorized_text = resources["vectorizer"].transform([cleaned_text])
+                with METRICS.stage("predict"):
+                    prediction = resources["model"].predict(vectorized_text)[0]
+                with METRICS.stage("predict_proba"):
+                    probability = resources["model"].predict_proba(vectorized_text)[0]
+                with METRICS.stage("explain"):
+                    explanation = explain_row(vectorized_text, resources["vectorizer"], resources["model"])
+            verdict = {
+                "prediction": _to_builtin(prediction),
+                "confidence": float(max(probability)),
+                "explanation": explanation,
+            }
+            if result_cache is not None:
+                result_cache.put(cache_key, verdict, fingerprint)
+
     processing_time = time.time() - start_time
     
     return {
-        "prediction": prediction,
-        "confidence": probability.max(),
+        "prediction": verdict["prediction"],
+        "confidence": verdict["confidence"],
         "processing_time": processing_time,
-        "raw_analysis": raw_analysis
+        "raw_analysis": raw_analysis,
+        "explanation": verdict.get("explanation"),
+        "cache": cache_status
     }
 
 def create_gauge_chart(value):
@@ -314,9 +405,25 @@ def render_sidebar(resources):
         with st.container(border=True):
             st.subheader("Statistik Model")
             col1, col2 = st.columns(2)
-            col1.metric("Akurasi", "98.20%", help="Akurasi model pada data uji.")
-            col2.metric("Metode", "SVM", help="Support Vector Machine (SVM) digunakan sebagai model klasifikasi.")
-        
+            # Akurasi uji dari model_metrics.json (ditulis train.py); nilai bawaan
+            # untuk model yang dikirim bersama repo
+            model_info = resources.get("model_info") or {}
+            accuracy = model_info.get("accuracy")
+            col1.metric("Akurasi", f"{accuracy:.2%}" if accuracy is not None else "98.20%", help="Akurasi model pada data uji.")
+            if model_info.get("method_name") == "SGD":
+                col2.metric("Metode", "SGD", help="Regresi logistik dengan SGD di atas fitur hashing digunakan sebagai model klasifikasi.")
+            else:
+                col2.metric("Metode", "SVM", help="Support Vector Machine (SVM) digunakan sebagai model klasifikasi.")
+            if model_info.get("n_test"):
+                st.caption(f"Diuji pada {model_info['n_test']:,} teks, dilatih {model_info.get('trained_at', '-')}.")
+
+            stem_stats = resources["stemmer"].stats()
+            st.caption(
+                f"Cache stemming: {stem_stats['hit_rate']:.1%} hit "
+                f"({stem_stats['lexicon_hits'] + stem_stats['cache_hits']} hit, {stem_stats['misses']} miss, "
+                f"leksikon {stem_stats['lexicon_size']} kata)"
+            )
+
         with st.container(border=True):
             st.subheader("Analisis Cepat")
             contoh_valid = "Menteri Keuangan Sri Mulyani Indrawati menyatakan bahwa realisasi sementara Anggaran Pendapatan dan Belanja Negara (APBN) 2024 mencatatkan kinerja positif hingga akhir Mei. Pendapatan negara mencapai Rp1.123,5 triliun atau 40,1 persen dari target, sementara belanja negara terealisasi sebesar Rp1.144,7 triliun atau 34,4 persen."
@@ -355,41 +462,61 @@ def render_main_panel(resources):
     if submit_button:
         if st.session_state.text_input.strip():
             with st.spinner("Melakukan analisis mendalam..."):
-                time.sleep(0.5)
                 result = perform_analysis(st.session_state.text_input, resources)
                 if "error" in result:
                     alert_placeholder.warning(result["error"])
                     st.session_state.last_result = None
+                    st.session_state.last_view = None
                 else:
                     st.session_state.last_result = result
+                    st.session_state.last_view = build_result_view(result)
         else:
             alert_placeholder.warning("Harap masukkan teks berita terlebih dahulu untuk dianalisis.")
             st.session_state.last_result = None
+            st.session_state.last_view = None
     
     if st.session_state.last_result:
-        render_results_card(st.session_state.last_result)
+        if st.session_state.last_view is None:
+            st.session_state.last_view = build_result_view(st.session_state.last_result)
+        render_results_card(st.session_state.last_view)
 
-def render_results_card(result):
+# Seluruh HTML kartu hasil dibangun sekali per hasil; rerun berikutnya hanya
+# mengirim ulang string yang sudah jadi
+def build_card_html(result) -> dict:
     is_hoax = result["prediction"] == 1
     confidence = result["confidence"] * 100
-    
-    with st.container(border=True):
-        header_class = "result-header-hoax" if is_hoax else "result-header-valid"
-        header_text = "Terindikasi HOAX" if is_hoax else "Terindikasi VALID"
-        st.markdown(f"<div class='{header_class}'>{header_text}</div>", unsafe_allow_html=True)
 
-        col1, col2 = st.columns([1, 1])
+    header_class = "result-header-hoax" if is_hoax else "result-header-valid"
+    header_text = "Terindikasi HOAX" if is_hoax else "Terindikasi VALID"
+
+    status_text = "Hoax" if is_hoax else "Valid"
+    if confidence > 95: interp_text = "Sangat Yakin"
+    elif confidence > 80: interp_text = "Cukup Yakin"
+    else: interp_text = "Perlu Verifikasi"
+    time_text = f"{result['processing_time']:.2f}"
+
+    cache_caption = None
+    cache_status = result.get("cache")
+    if cache_status == "exact":
+        cache_caption = "Verdict diambil dari cache: teks yang sama persis pernah dianalisis."
+    elif cache_status == "near_duplicate":
+        cache_caption = "Verdict diambil dari cache: teks hampir identik dengan teks yang pernah dianalisis."
+
+    insight_blocks = []
+    for category, insights in generate_advanced_insights(result).items():
+        if insights:
+            insight_html = f"<p class='insight-category'>{category}</p><ul class='insight-list'>"
+            for title, text in insights:
+                insight_html += f"<li><div><strong>{title}:</strong> {text}</div></li>"
+            insight_html += "</ul>"
+            insight_blocks.append(insight_html)
+    explanation_html = build_term_explanation_html(result.get("explanation"))
+    if explanation_html:
+        insight_blocks.append(explanation_html)
 
-        with col1:
-            st.plotly_chart(create_gauge_chart(confidence), use_container_width=True)
-            
-            status_text = "Hoax" if is_hoax else "Valid"
-            if confidence > 95: interp_text = "Sangat Yakin"
-            elif confidence > 80: interp_text = "Cukup Yakin"
-            else: interp_text = "Perlu Verifikasi"
-            time_text = f"{result['processing_time']:.2f}"
-            
-            st.markdown(f"""
+    return {
+        "header": f"<div class='{header_class}'>{header_text}</div>",
+        "metrics": f"""
                 <div class="metrics-grid">
                     <div class="metric-item">
                         <div class="label">Status</div>
@@ -404,30 +531,92 @@ def render_results_card(result):
                         <div class="value">{time_text} s</div>
                     </div>
                 </div>
-            """, unsafe_allow_html=True)
+            """,
+        "cache_caption": cache_caption,
+        "insights": insight_blocks,
+    }
+
+# Streamlit menjalankan ulang seluruh skrip pada setiap interaksi widget. HTML
+# kartu dan figur gauge dibangun sekali per submit lalu disimpan di
+# session_state; st.cache_data/cache_resource tidak dipakai karena hashing
+# argumennya di setiap rerun lebih mahal daripada membangun ulang kartu
+def build_result_view(result) -> dict:
+    card = build_card_html(result)
+    card["gauge"] = create_gauge_chart(result["confidence"] * 100)
+    return card
+
+# Term hasil stemming yang paling mendorong verdict ke tiap arah (lihat explain.py)
+def build_term_explanation_html(explanation) -> str:
+    if not explanation or not (explanation.get("hoax") or explanation.get("valid")):
+        return ""
+    insight_html = "<p class='insight-category'>Kata Paling Berpengaruh</p><ul class='insight-list'>"
+    for key, title in (("hoax", "Mendorong ke Hoax"), ("valid", "Mendorong ke Valid")):
+        terms = explanation.get(key) or []
+        if terms:
+            text = ", ".join(f"{term} ({abs(value):.3f})" for term, value in terms)
+            insight_html += f"<li><div><strong>{title}:</strong> {text}</div></li>"
+    insight_html += "</ul>"
+    return insight_html
+
+# Kartu ditampilkan bertahap: verdict dan metrik lebih dulu, lalu wawasan,
+# dan gauge (elemen termahal) terakhir ke slot yang sudah disiapkan
+def render_results_card(card):
+    with st.container(border=True):
+        st.markdown(card["header"], unsafe_allow_html=True)
+
+        col1, col2 = st.columns([1, 1])
+
+        with col1:
+            chart_slot = st.empty()
+            st.markdown(card["metrics"], unsafe_allow_html=True)
+            if card["cache_caption"]:
+                st.caption(card["cache_caption"])
 
         with col2:
             st.subheader("Wawasan & Karakteristik Teks")
             st.markdown("Analisis ini mengidentifikasi beberapa karakteristik dari teks yang Anda masukkan:")
-            
-            categorized_insights = generate_advanced_insights(result)
-            
-            for category, insights in categorized_insights.items():
-                if insights:
-                    st.markdown(f"<p class='insight-category'>{category}</p>", unsafe_allow_html=True)
-                    insight_html = "<ul class='insight-list'>"
-                    for title, text in insights:
-                        insight_html += f"<li><div><strong>{title}:</strong> {text}</div></li>"
-                    insight_html += "</ul>"
-                    st.markdown(insight_html, unsafe_allow_html=True)
+            for insight_html in card["insights"]:
+                st.markdown(insight_html, unsafe_allow_html=True)
+
+        chart_slot.plotly_chart(card["gauge"], use_container_width=True)
+
+# Panel debug opsional, hanya tampil bila instrumentasi aktif (HOAX_METRICS=1)
+def render_debug_panel():
+    snapshot = METRICS.snapshot()
+    with st.expander("Panel Debug: Latensi per Tahap"):
+        rows = [
+            {
+                "Tahap": name,
+                "Jumlah": stats["count"],
+                "Rata-rata (ms)": round(stats["mean"] * 1000, 3),
+                "p50 (ms)": round(stats["p50"] * 1000, 3),
+                "p95 (ms)": round(stats["p95"] * 1000, 3),
+                "p99 (ms)": round(stats["p99"] * 1000, 3),
+                "Maks (ms)": round(stats["max"] * 1000, 3),
+            }
+            for name, stats in snapshot["stages"].items()
+        ]
+        if rows:
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+        else:
+            st.caption("Belum ada analisis yang diukur.")
+        for name, value in snapshot["counters"].items():
+            st.caption(f"{name}: {value}")
+        st.code(METRICS.dump(), language="text")
 
 # =============================================================================
 # 4. EKSEKUSI APLIKASI
 # =============================================================================
 
 if __name__ == "__main__":
+    configure_page()
+    inject_custom_css()
+    init_session_state()
+
     resources = load_resources()
     if resources:
         render_sidebar(resources)
         render_main_panel(resources)
+        if METRICS.enabled:
+            render_debug_panel()
 
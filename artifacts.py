@@ -0,0 +1,512 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import subprocess
+import sys
+import time
+import zlib
+from bisect import bisect_left
+
+import joblib
+import numpy as np
+
+from compiled_scorer import LinearScorer, compile_scorer
+from stem_cache import DEFAULT_LEXICON_PATH, CachedStemmer, create_stemmer, sastrawi_words
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+DEFAULT_MODEL_PATH = "svm_model.pkl"
+DEFAULT_VECTORIZER_PATH = "tfidf_vectorizer.pkl"
+DEFAULT_ARTIFACT_DIR = "model_artifacts"
+# Ringkasan evaluasi yang ditulis train.py (akurasi uji, metode, throughput)
+MODEL_INFO_PATH = "model_metrics.json"
+# Direktori model yang dipakai app.py (default: direktori kerja)
+MODEL_DIR_ENV = "HOAX_MODEL_DIR"
+FORMAT_VERSION = 1
+# Indeks vocab: "hash" (open addressing, lihat write_string_table) atau
+# "perfect" (hash sempurna minimal, kolom = slot; lihat write_perfect_table)
+VOCAB_INDEXES = ("hash", "perfect")
+# Rata-rata jumlah kunci per bucket pada hash sempurna; makin besar makin
+# ringkas array displacement, makin lama pencarian saat membangun
+PERFECT_BUCKET_SIZE = 4
+# Batas pencarian d0 per bucket sebelum dibangun ulang dengan jumlah bucket lain
+PERFECT_MAX_D0 = 64
+# Slot cadangan 1/PERFECT_SLACK dari jumlah kunci agar bucket terakhir tetap
+# menemukan slot kosong dengan cepat
+PERFECT_SLACK = 100
+
+# =============================================================================
+# 2. TABEL STRING HASH DI ATAS BUFFER DATAR
+# =============================================================================
+
+# String disimpan sebagai satu buffer UTF-8 + array offset, dengan tabel slot
+# open addressing (crc32, probing linear). Semua file dibuka lewat mmap sehingga
+# beberapa proses berbagi halaman yang sama melalui page cache OS.
+def write_string_table(prefix: str, strings, values=None) -> None:
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    size = 1
+    while size < 2 * max(len(encoded), 1):
+        size *= 2
+    slots = np.full(size, -1, dtype=np.int32)
+    mask = size - 1
+    for index, data in enumerate(encoded):
+        slot = zlib.crc32(data) & mask
+        while slots[slot] != -1:
+            slot = (slot + 1) & mask
+        slots[slot] = index
+
+    with open(prefix + ".strings.bin", "wb") as f:
+        f.write(b"".join(encoded))
+    np.save(prefix + ".offsets.npy", offsets)
+    np.save(prefix + ".slots.npy", slots)
+    if values is not None:
+        np.save(prefix + ".values.npy", np.asarray(values, dtype=np.int32))
+
+class MappedStringTable:
+    def __init__(self, prefix: str):
+        with open(prefix + ".strings.bin", "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        self._offsets = np.load(prefix + ".offsets.npy", mmap_mode="r")
+        self._slots = np.load(prefix + ".slots.npy", mmap_mode="r")
+        self._mask = len(self._slots) - 1
+        values_path = prefix + ".values.npy"
+        self._values = np.load(values_path, mmap_mode="r") if os.path.exists(values_path) else None
+
+    def index(self, key: str) -> int:
+        data = key.encode("utf-8")
+        slot = zlib.crc32(data) & self._mask
+        while True:
+            index = int(self._slots[slot])
+            if index < 0:
+                return -1
+            start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+            if self._buffer[start:end] == data:
+                return index
+            slot = (slot + 1) & self._mask
+
+    def get(self, key: str, default=None):
+        index = self.index(key)
+        if index < 0:
+            return default
+        return int(self._values[index]) if self._values is not None else index
+
+    def contains(self, key: str) -> bool:
+        # Sastrawi memeriksa kamus juga dengan None (hasil disambiguasi awalan
+        # yang gagal); ArrayDictionary menjawab False, begitu pula tabel ini
+        return key is not None and self.index(key) >= 0
+
+    __contains__ = contains
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+# Hash sempurna (hash-and-displace): kunci disimpan di slot
+# (f1 + d0 * f2 + d1) mod m, dengan (d0, d1) dipilih per bucket agar tidak
+# ada tabrakan. Tanpa tabel slot maupun array nilai: posisi kunci = nilainya.
+# m adalah bilangan prima (agar setiap selisih slot dapat dicapai lewat d0)
+# sedikit di atas jumlah kunci; slot sisa dibiarkan kosong.
+def _perfect_hashes(data: bytes, size: int, buckets: int):
+    # Tiga hash 32-bit saling bebas; crc32/adler32 terlalu mengelompok untuk
+    # kata pendek sehingga slot kosong terakhir tidak lagi terjangkau
+    digest = hashlib.blake2b(data, digest_size=12).digest()
+    return (int.from_bytes(digest[:4], "little") % buckets,
+            int.from_bytes(digest[4:8], "little") % size,
+            int.from_bytes(digest[8:], "little") % size)
+
+def _next_prime(n: int) -> int:
+    candidate = max(2, n)
+    while any(candidate % p == 0 for p in range(2, int(candidate ** 0.5) + 1)):
+        candidate += 1
+    return candidate
+
+def _place_buckets(encoded, size: int, buckets: int):
+    members = [[] for _ in range(buckets)]
+    for index, data in enumerate(encoded):
+        bucket, f1, f2 = _perfect_hashes(data, size, buckets)
+        members[bucket].append((index, f1, f2))
+    # Dua kunci dengan (f1, f2) sama dalam satu bucket tidak dapat dipisahkan
+    if any(len({(f1, f2) for _, f1, f2 in group}) != len(group) for group in members):
+        return None
+
+    slots = [-1] * len(encoded)
+    taken = bytearray(size)
+    free = list(range(size))
+    displace = np.zeros(buckets, dtype=np.int64)
+    # Bucket terbesar ditempatkan lebih dulu, selagi slot kosong masih banyak;
+    # bucket dengan f2 kembar (jarak slotnya tetap, d0 tidak membantu) paling awal.
+    # d1 hanya dicoba untuk posisi yang menaruh kunci pertama di slot kosong,
+    # mulai dari slot alaminya agar slot kosong tetap tersebar merata.
+    def difficulty(bucket):
+        group = members[bucket]
+        return len({f2 for _, _, f2 in group}) != len(group), len(group)
+
+    for bucket in sorted(range(buckets), key=difficulty, reverse=True):
+        group = members[bucket]
+        if not group:
+            continue
+        placed = None
+        _, first_f1, first_f2 = group[0]
+        for d0 in range(min(size, PERFECT_MAX_D0)):
+            base = (first_f1 + d0 * first_f2) % size
+            start = bisect_left(free, base)
+            for offset in range(len(free)):
+                d1 = (free[(start + offset) % len(free)] - base) % size
+                candidate = [(f1 + d0 * f2 + d1) % size for _, f1, f2 in group]
+                if len(set(candidate)) == len(candidate) and not any(taken[slot] for slot in candidate):
+                    placed = candidate
+                    break
+            if placed is not None:
+                break
+        if placed is None:
+            return None
+        for (index, _, _), slot in zip(group, placed):
+            slots[index] = slot
+            taken[slot] = 1
+            del free[bisect_left(free, slot)]
+        displace[bucket] = d0 * size + d1
+    return slots, displace
+
+def build_perfect_hash(strings):
+    # Mengembalikan (jumlah slot, slot per string, displacement per bucket)
+    encoded = [s.encode("utf-8") for s in strings]
+    size = _next_prime(len(encoded) + len(encoded) // PERFECT_SLACK + 1)
+    buckets = max(1, -(-len(encoded) // PERFECT_BUCKET_SIZE))
+    while True:
+        placement = _place_buckets(encoded, size, buckets)
+        if placement is not None:
+            return (size, *placement)
+        buckets += 1
+
+def write_perfect_table(prefix: str, strings):
+    # Menulis string dalam urutan slot; mengembalikan (jumlah slot, slot tiap string)
+    strings = list(strings)
+    size, slots, displace = build_perfect_hash(strings)
+    ordered = [b""] * size
+    for string, slot in zip(strings, slots):
+        ordered[slot] = string.encode("utf-8")
+    offsets = np.zeros(len(ordered) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in ordered])
+    if offsets[-1] < 2 ** 32:
+        offsets = offsets.astype(np.uint32)
+
+    with open(prefix + ".strings.bin", "wb") as f:
+        f.write(b"".join(ordered))
+    np.save(prefix + ".offsets.npy", offsets)
+    np.save(prefix + ".displace.npy", displace)
+    return size, slots
+
+class MappedPerfectTable:
+    def __init__(self, prefix: str):
+        with open(prefix + ".strings.bin", "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        self._offsets = np.load(prefix + ".offsets.npy", mmap_mode="r")
+        self._displace = np.load(prefix + ".displace.npy", mmap_mode="r")
+        self._size = len(self._offsets) - 1
+        self._buckets = len(self._displace)
+        self._count = int(np.count_nonzero(np.diff(self._offsets.astype(np.int64))))
+
+    def index(self, key: str) -> int:
+        data = key.encode("utf-8")
+        if not data:
+            return -1
+        bucket, f1, f2 = _perfect_hashes(data, self._size, self._buckets)
+        d0, d1 = divmod(int(self._displace[bucket]), self._size)
+        slot = (f1 + d0 * f2 + d1) % self._size
+        start, end = int(self._offsets[slot]), int(self._offsets[slot + 1])
+        return slot if self._buffer[start:end] == data else -1
+
+    def get(self, key: str, default=None):
+        index = self.index(key)
+        return default if index < 0 else index
+
+    def contains(self, key: str) -> bool:
+        # Sama seperti MappedStringTable: None (dari Sastrawi) bukan anggota
+        return key is not None and self.index(key) >= 0
+
+    __contains__ = contains
+
+    def __len__(self):
+        return self._count
+
+# Pengganti dict term -> (kolom, idf, bobot) untuk LinearScorer
+class MappedTermTable:
+    def __init__(self, vocab: MappedStringTable, idf, coef):
+        self.vocab = vocab
+        self.idf = idf
+        self.coef = coef
+
+    def get(self, term: str, default=None):
+        column = self.vocab.get(term)
+        if column is None:
+            return default
+        return column, float(self.idf[column]), float(self.coef[column])
+
+    def lookup(self, terms):
+        # Versi banyak term dari get() untuk LinearScorer.decision_many: setiap
+        # term unik dicari sekali per panggilan (term umum berulang antar teks)
+        found = {term: self.vocab.get(term) for term in set(terms)}
+        columns = list(map(found.__getitem__, terms))
+        keep = [i for i, column in enumerate(columns) if column is not None]
+        index = np.asarray([columns[i] for i in keep], dtype=np.intp)
+        return keep, np.asarray(self.idf[index], dtype=np.float64), np.asarray(self.coef[index], dtype=np.float64)
+
+    def __getitem__(self, term: str):
+        entry = self.get(term)
+        if entry is None:
+            raise KeyError(term)
+        return entry
+
+    def __len__(self):
+        return len(self.vocab)
+
+# =============================================================================
+# 3. KONVERSI DARI PICKLE
+# =============================================================================
+
+def write_scorer_tables(scorer, output_dir: str, vocab_index: str = "hash") -> int:
+    # vocab + idf.npy + coef.npy dari tabel LinearScorer; mengembalikan jumlah fitur
+    os.makedirs(output_dir, exist_ok=True)
+    n_features = len(scorer.table)
+    terms = [None] * n_features
+    idf = np.zeros(n_features, dtype=np.float64)
+    coef = np.zeros(n_features, dtype=np.float64)
+    for term, (column, term_idf, weight) in scorer.table.items():
+        terms[column] = term
+        idf[column] = term_idf
+        coef[column] = weight
+    prefix = os.path.join(output_dir, "vocab")
+    if vocab_index == "perfect":
+        # Kolom diurutkan ulang mengikuti slot hash sempurna; slot kosong berbobot nol
+        size, slots = write_perfect_table(prefix, terms)
+        slots = np.asarray(slots, dtype=np.int64)
+        reordered_idf, reordered_coef = np.zeros(size, dtype=np.float64), np.zeros(size, dtype=np.float64)
+        reordered_idf[slots], reordered_coef[slots] = idf, coef
+        idf, coef = reordered_idf, reordered_coef
+    else:
+        write_string_table(prefix, terms, values=range(n_features))
+    np.save(os.path.join(output_dir, "idf.npy"), idf)
+    np.save(os.path.join(output_dir, "coef.npy"), coef)
+    return n_features
+
+def export_scorer(scorer, output_dir: str, vocab_index: str = "hash", info: dict = None) -> dict:
+    from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+
+    n_features = write_scorer_tables(scorer, output_dir, vocab_index)
+    words = sastrawi_words()
+    write_string_table(os.path.join(output_dir, "kata_dasar"), words)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "n_features": n_features,
+        "vocab_index": vocab_index,
+        "intercept": scorer.intercept,
+        "classes": scorer.classes,
+        "token_pattern": scorer.token_pattern,
+        "lowercase": scorer.lowercase,
+        "sublinear_tf": scorer.sublinear_tf,
+        "binary": scorer.binary,
+        "norm": scorer.norm,
+        "calibration": scorer.calibration,
+        "prob_a": scorer.prob_a,
+        "prob_b": scorer.prob_b,
+        "stopwords": sorted(StopWordRemoverFactory().get_stop_words()),
+        "dictionary_size": len(words),
+        **(info or {}),
+    }
+    with open(os.path.join(output_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    return meta
+
+def convert(model_path: str, vectorizer_path: str, output_dir: str, vocab_index: str = "hash") -> dict:
+    model = joblib.load(model_path)
+    vectorizer = joblib.load(vectorizer_path)
+    scorer = compile_scorer(model, vectorizer)
+    if scorer is None:
+        raise ValueError("Model atau vectorizer tidak linear/tidak didukung; format mmap memerlukan scorer linear.")
+    return export_scorer(scorer, output_dir, vocab_index)
+
+# =============================================================================
+# 4. PEMUATAN SUMBER DAYA
+# =============================================================================
+
+# Satu aturan lokasi untuk pickle, artefak mmap dan metrik model: semuanya
+# berdampingan di direktori model. train.py --output-dir menulis dengan aturan yang sama.
+def model_path(name: str, model_dir: str = None) -> str:
+    return os.path.join(model_dir or os.environ.get(MODEL_DIR_ENV) or ".", name)
+
+def has_artifacts(artifact_dir: str = DEFAULT_ARTIFACT_DIR) -> bool:
+    return os.path.exists(os.path.join(artifact_dir, "meta.json"))
+
+def _read_meta(artifact_dir: str) -> dict:
+    with open(os.path.join(artifact_dir, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Versi format artefak tidak didukung: {meta.get('format_version')}")
+    return meta
+
+# Hanya stemmer dan stopword, cukup untuk run_text_preprocessing (mis. di proses worker)
+def load_text_resources(artifact_dir: str = None, lexicon_path: str = DEFAULT_LEXICON_PATH) -> dict:
+    # Leksikon stem tinggal di direktori model bersama file model lainnya
+    lexicon_path = model_path(lexicon_path) if lexicon_path else None
+    if artifact_dir and has_artifacts(artifact_dir):
+        meta = _read_meta(artifact_dir)
+        # Kamus kata dasar Sastrawi dibaca dari tabel mmap, bukan dibangun ulang per proses
+        dictionary = MappedStringTable(os.path.join(artifact_dir, "kata_dasar"))
+        return {
+            "stemmer": CachedStemmer(create_stemmer(dictionary), lexicon_path=lexicon_path),
+            "stopwords": set(meta["stopwords"]),
+        }
+
+    from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+
+    return {
+        "stemmer": CachedStemmer(create_stemmer(), lexicon_path=lexicon_path),
+        "stopwords": set(StopWordRemoverFactory().get_stop_words()),
+    }
+
+def load_model_info(path: str = MODEL_INFO_PATH) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def load_pickle_resources(model_path: str = DEFAULT_MODEL_PATH, vectorizer_path: str = DEFAULT_VECTORIZER_PATH,
+                          lexicon_path: str = DEFAULT_LEXICON_PATH) -> dict:
+    resources = {
+        "model": joblib.load(model_path),
+        "vectorizer": joblib.load(vectorizer_path),
+        **load_text_resources(None, lexicon_path),
+    }
+    # Scorer linear terkompilasi; None bila model tidak linear (fallback ke sklearn)
+    resources["scorer"] = compile_scorer(resources["model"], resources["vectorizer"])
+    return resources
+
+def load_mapped_resources(artifact_dir: str = DEFAULT_ARTIFACT_DIR, lexicon_path: str = DEFAULT_LEXICON_PATH) -> dict:
+    meta = _read_meta(artifact_dir)
+    vocab_table = MappedPerfectTable if meta.get("vocab_index") == "perfect" else MappedStringTable
+    table = MappedTermTable(
+        vocab_table(os.path.join(artifact_dir, "vocab")),
+        np.load(os.path.join(artifact_dir, "idf.npy"), mmap_mode="r"),
+        np.load(os.path.join(artifact_dir, "coef.npy"), mmap_mode="r"),
+    )
+    scorer = LinearScorer(
+        table=table,
+        intercept=meta["intercept"],
+        classes=meta["classes"],
+        token_pattern=meta["token_pattern"],
+        lowercase=meta["lowercase"],
+        sublinear_tf=meta["sublinear_tf"],
+        binary=meta["binary"],
+        norm=meta["norm"],
+        calibration=meta["calibration"],
+        prob_a=meta["prob_a"],
+        prob_b=meta["prob_b"],
+    )
+    return {
+        "model": None,
+        "vectorizer": None,
+        **load_text_resources(artifact_dir, lexicon_path),
+        "scorer": scorer,
+    }
+
+# =============================================================================
+# 5. PERBANDINGAN WAKTU MULAI & MEMORI
+# =============================================================================
+
+def _memory_kb() -> dict:
+    usage = {}
+    for path, keys in (("/proc/self/status", ("VmRSS",)), ("/proc/self/smaps_rollup", ("Pss", "Shared_Clean"))):
+        try:
+            with open(path) as f:
+                for line in f:
+                    name, _, value = line.partition(":")
+                    if name in keys:
+                        usage[name] = int(value.split()[0])
+        except OSError:
+            pass
+    return usage
+
+def _probe(mode: str, artifact_dir: str) -> int:
+    # Proses anak: muat sumber daya, tunggu aba-aba induk, lalu ukur memori
+    # ketika semua proses sedang hidup bersamaan.
+    start = time.perf_counter()
+    if mode == "mmap":
+        resources = load_mapped_resources(artifact_dir, lexicon_path=None)
+    else:
+        resources = load_pickle_resources(lexicon_path=None)
+    resources["scorer"].score("pemerintah umum kebijakan baru")
+    load_seconds = time.perf_counter() - start
+    print("ready", flush=True)
+    sys.stdin.readline()
+    print(json.dumps({"load_seconds": load_seconds, **_memory_kb()}), flush=True)
+    return 0
+
+def compare(artifact_dir: str, processes: int) -> dict:
+    report = {}
+    for mode in ("joblib", "mmap"):
+        children = [
+            subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "_probe", mode, "--artifact-dir", artifact_dir],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+            )
+            for _ in range(processes)
+        ]
+        for child in children:
+            child.stdout.readline()
+        samples = []
+        for child in children:
+            child.stdin.write("measure\n")
+            child.stdin.flush()
+            samples.append(json.loads(child.stdout.readline()))
+        for child in children:
+            child.wait()
+        report[mode] = {
+            "processes": processes,
+            "mean_load_seconds": sum(s["load_seconds"] for s in samples) / processes,
+            "mean_rss_kb": sum(s.get("VmRSS", 0) for s in samples) / processes,
+            "total_pss_kb": sum(s.get("Pss", 0) for s in samples),
+        }
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Artefak model berbasis mmap yang dapat dibagi antar proses.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    conv = sub.add_parser("convert", help="Konversi pickle joblib ke format mmap.")
+    conv.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    conv.add_argument("--vectorizer", default=DEFAULT_VECTORIZER_PATH)
+    conv.add_argument("-o", "--output", default=DEFAULT_ARTIFACT_DIR)
+    conv.add_argument("--vocab-index", choices=VOCAB_INDEXES, default="hash")
+
+    comp = sub.add_parser("compare", help="Bandingkan waktu mulai dan RSS/PSS jalur joblib vs mmap.")
+    comp.add_argument("--artifact-dir", default=DEFAULT_ARTIFACT_DIR)
+    comp.add_argument("--processes", type=int, default=4)
+
+    probe = sub.add_parser("_probe")
+    probe.add_argument("mode", choices=("joblib", "mmap"))
+    probe.add_argument("--artifact-dir", default=DEFAULT_ARTIFACT_DIR)
+
+    args = parser.parse_args(argv)
+    if args.command == "_probe":
+        return _probe(args.mode, args.artifact_dir)
+    if args.command == "convert":
+        meta = convert(args.model, args.vectorizer, args.output, args.vocab_index)
+        print(f"{args.output}: {meta['n_features']} fitur, {meta['dictionary_size']} kata dasar")
+        return 0
+
+    report = compare(args.artifact_dir, args.processes)
+    print(f"{'jalur':<8}{'proses':>8}{'muat (s)':>12}{'RSS/proses (MB)':>18}{'PSS total (MB)':>18}")
+    for mode, row in report.items():
+        print(f"{mode:<8}{row['processes']:>8}{row['mean_load_seconds']:>12.3f}"
+              f"{row['mean_rss_kb'] / 1024:>18.1f}{row['total_pss_kb'] / 1024:>18.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+from app import (
+    MIN_CLEAN_TOKENS,
+    TEXT_TOO_SHORT_ERROR,
+    compute_raw_analysis,
+    load_resources,
+    run_text_preprocessing,
+)
+from compiled_scorer import _to_builtin
+from features import RAW_FIELDS
+from preprocess_pool import PreprocessPool
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+DEFAULT_CHUNK_SIZE = 256
+INPUT_FORMATS = ("auto", "jsonl", "csv", "txt")
+OUTPUT_FORMATS = ("auto", "jsonl", "csv")
+
+# =============================================================================
+# 2. PEMBACAAN INPUT SECARA STREAMING
+# =============================================================================
+
+def detect_format(path: str, choices, fallback: str) -> str:
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext == "json":
+        ext = "jsonl"
+    return ext if ext in choices else fallback
+
+def read_records(stream, fmt: str, text_field: str = "text", id_field: str = "id"):
+    # Menghasilkan pasangan (id, teks) satu per satu agar input sebesar apa pun
+    # tidak pernah dimuat sekaligus ke memori.
+    if fmt == "csv":
+        for row_no, row in enumerate(csv.DictReader(stream), 1):
+            yield row.get(id_field) or row_no, row.get(text_field) or ""
+    elif fmt == "txt":
+        for line_no, line in enumerate(stream, 1):
+            if line.strip():
+                yield line_no, line.rstrip("\r\n")
+    else:
+        for line_no, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                yield line_no, record
+            else:
+                yield record.get(id_field, line_no), record.get(text_field) or ""
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+# =============================================================================
+# 3. PENILAIAN PER CHUNK
+# =============================================================================
+
+def label_for(prediction) -> str:
+    return "HOAX" if prediction == 1 else "VALID"
+
+# Skor untuk daftar teks yang sudah dibersihkan: satu transform dan satu
+# pemanggilan model untuk seluruh daftar. predict tetap dipakai untuk label agar
+# verdict identik dengan perform_analysis (pada SVC, argmax predict_proba tidak
+# selalu sama dengan predict).
+def score_cleaned_texts(cleaned_texts, resources: dict):
+    if not cleaned_texts:
+        return []
+    if resources.get("vectorizer") is None:
+        # Artefak mmap tidak membawa objek sklearn; satu panggilan scorer linear per chunk
+        scored = resources["scorer"].score_many(cleaned_texts)
+        return [(prediction, float(max(probability))) for prediction, probability in scored]
+    vectorized = resources["vectorizer"].transform(cleaned_texts)
+    predictions = resources["model"].predict(vectorized)
+    probabilities = resources["model"].predict_proba(vectorized)
+    return [
+        (_to_builtin(prediction), float(probability.max()))
+        for prediction, probability in zip(predictions, probabilities)
+    ]
+
+def score_chunk(records, resources: dict, include_raw: bool = True, cleaned=None):
+    # cleaned: teks bersih yang sudah dihitung (mis. oleh PreprocessPool), sejajar dengan records
+    results = []
+    cleaned_texts, positions = [], []
+
+    for index, (record_id, text) in enumerate(records):
+        result = {"id": record_id}
+        if include_raw:
+            result["raw_analysis"] = compute_raw_analysis(text)
+        if cleaned is None:
+            cleaned_text = run_text_preprocessing(text, resources["stemmer"], resources["stopwords"])
+        else:
+            cleaned_text = cleaned[index]
+        if len(cleaned_text.split()) < MIN_CLEAN_TOKENS:
+            result["error"] = TEXT_TOO_SHORT_ERROR
+        else:
+            cleaned_texts.append(cleaned_text)
+            positions.append(len(results))
+        results.append(result)
+
+    for pos, (prediction, confidence) in zip(positions, score_cleaned_texts(cleaned_texts, resources)):
+        results[pos]["prediction"] = prediction
+        results[pos]["label"] = label_for(prediction)
+        results[pos]["confidence"] = confidence
+
+    return results
+
+def score_stream(records, resources: dict, chunk_size: int = DEFAULT_CHUNK_SIZE, include_raw: bool = True,
+                 pool: PreprocessPool = None):
+    if pool is None:
+        for chunk in chunked(records, chunk_size):
+            yield score_chunk(chunk, resources, include_raw)
+        return
+
+    # Stemming berjalan di pool proses; record ditahan di antrean sampai teks
+    # bersihnya kembali (urutan hasil pool sama dengan urutan input)
+    pending = deque()
+
+    def texts():
+        for record in records:
+            pending.append(record)
+            yield record[1]
+
+    for cleaned in chunked(pool.imap(texts()), chunk_size):
+        chunk = [pending.popleft() for _ in cleaned]
+        yield score_chunk(chunk, resources, include_raw, cleaned)
+
+# =============================================================================
+# 4. PENULISAN OUTPUT BERTAHAP
+# =============================================================================
+
+class JsonlWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, results):
+        for result in results:
+            self.stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+class CsvWriter:
+    def __init__(self, stream, include_raw: bool = True):
+        fields = ["id", "prediction", "label", "confidence", "error"]
+        if include_raw:
+            fields += list(RAW_FIELDS)
+        self.stream = stream
+        self.writer = csv.DictWriter(stream, fieldnames=fields, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write(self, results):
+        for result in results:
+            row = {k: v for k, v in result.items() if k != "raw_analysis"}
+            row.update(result.get("raw_analysis", {}))
+            self.writer.writerow(row)
+        self.stream.flush()
+
+# =============================================================================
+# 5. EKSEKUSI CLI
+# =============================================================================
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Penilaian batch berita hoax dari file JSONL/CSV/TXT atau stdin."
+    )
+    parser.add_argument("input", nargs="?", default="-", help="File input, atau '-' untuk stdin (default).")
+    parser.add_argument("-o", "--output", default="-", help="File output, atau '-' untuk stdout (default).")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS, default="auto")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="auto")
+    parser.add_argument("--text-field", default="text", help="Nama kolom/kunci teks (default: text).")
+    parser.add_argument("--id-field", default="id", help="Nama kolom/kunci id (default: id).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Jumlah teks per vektorisasi dan pemanggilan model.")
+    parser.add_argument("--no-raw", action="store_true", help="Jangan sertakan raw_analysis pada output.")
+    parser.add_argument("--workers", type=int, default=1, help="Jumlah proses pra-pemrosesan paralel (default: 1).")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.chunk_size < 1:
+        print("Error: --chunk-size harus >= 1.", file=sys.stderr)
+        return 2
+
+    resources = load_resources()
+    if not resources:
+        print("Error: Pastikan file model 'svm_model.pkl' dan 'tfidf_vectorizer.pkl' ada di direktori yang sama.", file=sys.stderr)
+        return 1
+
+    input_format = args.input_format
+    if input_format == "auto":
+        input_format = detect_format(args.input, ("jsonl", "csv", "txt"), "jsonl")
+    output_format = args.output_format
+    if output_format == "auto":
+        output_format = detect_format(args.output, ("jsonl", "csv"), "jsonl")
+
+    in_stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8", newline="")
+    out_stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    include_raw = not args.no_raw
+
+    total = errors = 0
+    start_time = time.time()
+    pool = PreprocessPool(args.workers).start() if args.workers > 1 else None
+    try:
+        writer = CsvWriter(out_stream, include_raw) if output_format == "csv" else JsonlWriter(out_stream)
+        records = read_records(in_stream, input_format, args.text_field, args.id_field)
+        for results in score_stream(records, resources, args.chunk_size, include_raw, pool):
+            writer.write(results)
+            total += len(results)
+            errors += sum(1 for r in results if "error" in r)
+    finally:
+        if pool is not None:
+            pool.close()
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if out_stream is not sys.stdout:
+            out_stream.close()
+
+    elapsed = time.time() - start_time
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"{total} teks diproses ({errors} ditolak) dalam {elapsed:.2f} s ({rate:.1f} teks/s).", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,369 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from itertools import cycle, islice
+
+from app import (
+    clean_text,
+    compute_raw_analysis,
+    filter_stopwords,
+    load_resources,
+    perform_analysis,
+    stem_tokens,
+)
+from batch import score_chunk
+from explain import explain_row
+from stem_cache import create_stemmer
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+DEFAULT_SEED = 1234
+DEFAULT_CORPUS_SIZE = 10_000
+DEFAULT_MICRO_SIZE = 500
+DEFAULT_E2E_ITEMS = 2_000
+DEFAULT_BATCH_SIZES = (1, 10, 100, 1_000)
+# Jumlah batch minimum per ukuran batch, agar p50/p95/p99 punya sampel yang cukup
+MIN_BATCH_SAMPLES = 20
+DEFAULT_TOLERANCE = 0.10
+DEFAULT_BASELINE_PATH = "bench_baseline.json"
+UNCACHED_STEM_SAMPLE = 100
+
+# Profil panjang teks (jumlah kalimat) beserta bobot kemunculannya
+LENGTH_PROFILES = {
+    "short": ((1, 3), 0.3),
+    "medium": ((4, 10), 0.5),
+    "long": ((20, 60), 0.2),
+}
+
+# =============================================================================
+# 2. GENERATOR KORPUS SINTETIS
+# =============================================================================
+
+SUBJECTS = (
+    "Menteri Keuangan", "Gubernur Jawa Barat", "Badan Pusat Statistik", "Kementerian Kesehatan",
+    "Polri", "Bank Indonesia", "Dinas Pendidikan", "Wali Kota Bandung", "DPR", "BMKG",
+    "Kepala Dinas Kominfo", "Presiden", "Bupati Bogor", "Otoritas Jasa Keuangan",
+)
+VERBS = (
+    "menyatakan", "mengumumkan", "melaporkan", "menjelaskan", "menegaskan",
+    "meresmikan", "menyampaikan", "mencatat", "memaparkan",
+)
+TOPICS = (
+    "realisasi anggaran daerah", "program vaksinasi lanjutan", "pembangunan jalan tol",
+    "penyaluran bantuan sosial", "inflasi bulanan", "pemeriksaan kesehatan gratis",
+    "perbaikan jaringan irigasi", "penerimaan peserta didik baru", "cuaca ekstrem pekan ini",
+    "peningkatan layanan kependudukan", "harga bahan pokok", "penertiban pedagang kaki lima",
+)
+DETAILS = (
+    "mencapai {n} persen dari target tahunan", "dilaksanakan di {n} kecamatan",
+    "melibatkan sekitar {n} ribu warga", "dengan anggaran Rp{n} miliar",
+    "berlangsung hingga akhir bulan", "sesuai dengan peraturan yang berlaku",
+    "telah dievaluasi oleh tim independen", "diawasi langsung oleh inspektorat",
+)
+MONTHS = (
+    "januari", "februari", "maret", "april", "mei", "juni", "juli",
+    "agustus", "september", "oktober", "november", "desember",
+)
+HOAX_OPENERS = (
+    "SEBARKAN!!", "VIRAL!!!", "HEBOH!", "AWAS!!", "Jangan kaget,", "Wajib tahu!",
+    "Terungkap!", "Tak disangka,", "BAHAYA!!!",
+)
+HOAX_CLAIMS = (
+    "minuman bersoda dapat menyembuhkan penyakit dalam semalam",
+    "air rebusan daun sirih mampu membunuh virus di tenggorokan",
+    "pemerintah akan memblokir semua rekening warga minggu depan",
+    "sinyal menara telekomunikasi menyebabkan penyakit misterius",
+    "vaksin mengandung mikrocip untuk melacak warga",
+    "gempa besar dipastikan terjadi besok malam",
+    "uang kertas lama tidak berlaku mulai bulan depan",
+    "makanan kaleng impor mengandung cacing berbahaya",
+)
+HOAX_TAILS = (
+    "Bagikan ke semua grup sebelum dihapus!!", "Saya sudah membuktikannya sendiri.",
+    "Kami mendapat info ini dari orang dalam.", "Share sekarang juga, jangan sampai keluarga jadi korban!",
+    "Ini fakta yang disembunyikan media.", "Sudah banyak yang menjadi korban, waspada!!",
+    "Kenapa tidak ada yang membahas ini?", "Menggemparkan, ternyata selama ini kita dibohongi.",
+)
+
+def _valid_sentence(rng: random.Random) -> str:
+    detail = rng.choice(DETAILS).format(n=rng.randint(2, 950))
+    sentence = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} bahwa {rng.choice(TOPICS)} {detail}"
+    roll = rng.random()
+    if roll < 0.25:
+        sentence += f" pada {rng.randint(1, 28)} {rng.choice(MONTHS)} {rng.randint(2015, 2025)}"
+    elif roll < 0.4:
+        sentence = f'"{sentence}," kata juru bicara'
+    elif roll < 0.5:
+        sentence = f"Menurut data resmi, {sentence[0].lower()}{sentence[1:]}"
+    return sentence + "."
+
+def _hoax_sentence(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.3:
+        return f"{rng.choice(HOAX_OPENERS)} Beredar kabar bahwa {rng.choice(HOAX_CLAIMS)}!"
+    if roll < 0.6:
+        claim = rng.choice(HOAX_CLAIMS)
+        return (claim.upper() if rng.random() < 0.3 else claim.capitalize()) + rng.choice(("!!!", "?", "."))
+    if roll < 0.8:
+        return rng.choice(HOAX_TAILS)
+    return _valid_sentence(rng)
+
+def _sentence_count(rng: random.Random) -> tuple:
+    names = list(LENGTH_PROFILES)
+    profile = rng.choices(names, weights=[LENGTH_PROFILES[name][1] for name in names])[0]
+    low, high = LENGTH_PROFILES[profile][0]
+    return profile, rng.randint(low, high)
+
+def generate_corpus(size: int, seed: int = DEFAULT_SEED, hoax_ratio: float = 0.5):
+    # Korpus deterministik: seed yang sama selalu menghasilkan teks yang sama
+    rng = random.Random(seed)
+    for item_id in range(1, size + 1):
+        label = 1 if rng.random() < hoax_ratio else 0
+        profile, sentences = _sentence_count(rng)
+        make = _hoax_sentence if label else _valid_sentence
+        text = " ".join(make(rng) for _ in range(sentences))
+        if label and rng.random() < 0.2:
+            text += " https://bit.ly/" + "".join(rng.choices("abcdefghjkmnpqrstuvwxyz23456789", k=7))
+        yield {"id": item_id, "text": text, "label": label, "profile": profile}
+
+# =============================================================================
+# 3. PENGUKURAN
+# =============================================================================
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(samples) -> dict:
+    values = sorted(samples)
+    total = sum(values)
+    return {
+        "n": len(values),
+        "mean_ms": total / len(values) * 1000 if values else 0.0,
+        "p50_ms": percentile(values, 0.50) * 1000,
+        "p95_ms": percentile(values, 0.95) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "max_ms": values[-1] * 1000 if values else 0.0,
+    }
+
+def time_each(func, inputs):
+    # Menjalankan func untuk setiap input, mengembalikan (output, durasi per item)
+    outputs, samples = [], []
+    for item in inputs:
+        start = time.perf_counter()
+        outputs.append(func(item))
+        samples.append(time.perf_counter() - start)
+    return outputs, samples
+
+def run_micro(texts, resources: dict) -> dict:
+    stopwords, stemmer = resources["stopwords"], resources["stemmer"]
+    report = {}
+
+    _, samples = time_each(compute_raw_analysis, texts)
+    report["raw_features"] = summarize(samples)
+
+    cleaned, samples = time_each(clean_text, texts)
+    report["cleanup"] = summarize(samples)
+
+    tokens, samples = time_each(lambda text: filter_stopwords(text, stopwords), cleaned)
+    report["stopwords"] = summarize(samples)
+
+    # Stemming diukur dua kali: lewat CachedStemmer aplikasi setelah pemanasan
+    # (kondisi tunak) dan dengan stemmer Sastrawi mentah yang baru dibuat pada
+    # sampel kecil, sehingga tidak ada cache (milik aplikasi maupun Sastrawi) yang hangat
+    for item in tokens:
+        stem_tokens(item, stemmer)
+    stemmed, samples = time_each(lambda item: stem_tokens(item, stemmer), tokens)
+    report["stemming"] = summarize(samples)
+    raw_stemmer = create_stemmer()
+    _, samples = time_each(lambda item: stem_tokens(item, raw_stemmer), tokens[:UNCACHED_STEM_SAMPLE])
+    report["stemming_uncached"] = summarize(samples)
+
+    cleaned_texts = [" ".join(item) for item in stemmed]
+    if resources.get("vectorizer") is not None:
+        vectors, samples = time_each(lambda text: resources["vectorizer"].transform([text]), cleaned_texts)
+        report["vectorize"] = summarize(samples)
+        _, samples = time_each(resources["model"].predict, vectors)
+        report["predict"] = summarize(samples)
+        _, samples = time_each(resources["model"].predict_proba, vectors)
+        report["predict_proba"] = summarize(samples)
+        _, samples = time_each(lambda row: explain_row(row, resources["vectorizer"], resources["model"]), vectors)
+        report["explain"] = summarize(samples)
+    if resources.get("scorer") is not None:
+        _, samples = time_each(resources["scorer"].score, cleaned_texts)
+        report["compiled_score"] = summarize(samples)
+        _, samples = time_each(resources["scorer"].explain, cleaned_texts)
+        report["explain_compiled"] = summarize(samples)
+    return report
+
+def run_end_to_end(texts, resources: dict, batch_sizes, items: int) -> dict:
+    report = {}
+    _, samples = time_each(lambda text: perform_analysis(text, resources), texts[:items])
+    report["perform_analysis"] = summarize(samples)
+
+    for batch_size in batch_sizes:
+        total = max(batch_size * MIN_BATCH_SAMPLES, items)
+        records = list(enumerate(islice(cycle(texts), total), 1))
+        batches = [records[i:i + batch_size] for i in range(0, total, batch_size)]
+        start = time.perf_counter()
+        _, samples = time_each(lambda chunk: score_chunk(chunk, resources), batches)
+        elapsed = time.perf_counter() - start
+        row = summarize(samples)
+        row["items"] = total
+        row["throughput_per_s"] = total / elapsed if elapsed else 0.0
+        row["per_item_ms"] = elapsed / total * 1000
+        report[f"batch_{batch_size}"] = row
+    return report
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def run_benchmarks(resources: dict, size: int = DEFAULT_CORPUS_SIZE, seed: int = DEFAULT_SEED,
+                   micro_size: int = DEFAULT_MICRO_SIZE, batch_sizes=DEFAULT_BATCH_SIZES,
+                   e2e_items: int = DEFAULT_E2E_ITEMS) -> dict:
+    # Cache verdict dimatikan agar yang diukur adalah pipeline lengkap, bukan hit cache
+    resources = dict(resources, result_cache=None)
+    texts = [record["text"] for record in generate_corpus(size, seed)]
+    return {
+        "environment": environment(),
+        "config": {
+            "size": size, "seed": seed, "micro_size": micro_size,
+            "batch_sizes": list(batch_sizes), "e2e_items": e2e_items,
+            "backend": "sklearn" if resources.get("vectorizer") is not None else "mmap",
+        },
+        "micro": run_micro(texts[:micro_size], resources),
+        "end_to_end": run_end_to_end(texts, resources, batch_sizes, e2e_items),
+    }
+
+# =============================================================================
+# 4. PERBANDINGAN DENGAN BASELINE
+# =============================================================================
+
+# Metrik yang dibandingkan: (bagian, kunci). Throughput lebih besar lebih baik,
+# latensi lebih kecil lebih baik.
+COMPARED_KEYS = ("p50_ms", "p95_ms", "throughput_per_s")
+
+def flatten(results: dict) -> dict:
+    flat = {}
+    for section in ("micro", "end_to_end"):
+        for name, row in results.get(section, {}).items():
+            for key in COMPARED_KEYS:
+                if key in row:
+                    flat[f"{section}.{name}.{key}"] = row[key]
+    return flat
+
+def compare(current: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE):
+    rows, regressions = [], 0
+    base = flatten(baseline)
+    for metric, value in flatten(current).items():
+        old = base.get(metric)
+        if not old:
+            continue
+        higher_is_better = metric.endswith("_per_s")
+        change = (value - old) / old
+        regressed = change < -tolerance if higher_is_better else change > tolerance
+        regressions += regressed
+        rows.append((metric, old, value, change, regressed))
+    return rows, regressions
+
+# =============================================================================
+# 5. EKSEKUSI CLI
+# =============================================================================
+
+def _parse_sizes(value: str):
+    return tuple(int(part) for part in value.split(",") if part.strip())
+
+def print_report(results: dict):
+    print(f"{'tahap':<22}{'n':>7}{'rata2 (ms)':>12}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, row in results["micro"].items():
+        print(f"{name:<22}{row['n']:>7}{row['mean_ms']:>12.3f}{row['p50_ms']:>10.3f}"
+              f"{row['p95_ms']:>10.3f}{row['p99_ms']:>10.3f}")
+    print()
+    print(f"{'end-to-end':<22}{'item':>7}{'n':>6}{'item/s':>12}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, row in results["end_to_end"].items():
+        throughput = row.get("throughput_per_s", 1000 / row["mean_ms"] if row["mean_ms"] else 0.0)
+        print(f"{name:<22}{row.get('items', row['n']):>7}{row['n']:>6}{throughput:>12.1f}{row['p50_ms']:>10.3f}"
+              f"{row['p95_ms']:>10.3f}{row['p99_ms']:>10.3f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline deteksi hoax dengan korpus sintetis.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    corpus = sub.add_parser("corpus", help="Tulis korpus sintetis ke JSONL (id, text, label, profile).")
+    corpus.add_argument("-n", "--size", type=int, default=DEFAULT_CORPUS_SIZE)
+    corpus.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    corpus.add_argument("-o", "--output", default="-")
+
+    run = sub.add_parser("run", help="Jalankan microbenchmark per tahap dan benchmark end-to-end.")
+    run.add_argument("-n", "--size", type=int, default=DEFAULT_CORPUS_SIZE)
+    run.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run.add_argument("--micro-size", type=int, default=DEFAULT_MICRO_SIZE)
+    run.add_argument("--e2e-items", type=int, default=DEFAULT_E2E_ITEMS,
+                     help=f"Jumlah item minimum per ukuran batch end-to-end (paling sedikit {MIN_BATCH_SAMPLES} batch).")
+    run.add_argument("--batch-sizes", type=_parse_sizes, default=DEFAULT_BATCH_SIZES)
+    run.add_argument("-o", "--output", help="Simpan hasil sebagai JSON.")
+    run.add_argument("--baseline", help="Bandingkan dengan hasil JSON tersimpan.")
+    run.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                     help="Perubahan relatif yang dianggap regresi (default 0.10).")
+    run.add_argument("--save-baseline", action="store_true",
+                     help=f"Simpan hasil sebagai baseline ({DEFAULT_BASELINE_PATH} bila --baseline kosong).")
+
+    args = parser.parse_args(argv)
+    if args.command == "corpus":
+        out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        try:
+            for record in generate_corpus(args.size, args.seed):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        return 0
+
+    resources = load_resources()
+    if not resources:
+        print("Error: Pastikan file model 'svm_model.pkl' dan 'tfidf_vectorizer.pkl' ada di direktori yang sama.", file=sys.stderr)
+        return 1
+
+    results = run_benchmarks(
+        resources, size=args.size, seed=args.seed, micro_size=args.micro_size,
+        batch_sizes=args.batch_sizes, e2e_items=args.e2e_items,
+    )
+    print_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    status = 0
+    if args.baseline and os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, regressions = compare(results, baseline, args.tolerance)
+        print()
+        print(f"{'metrik':<44}{'baseline':>12}{'sekarang':>12}{'perubahan':>11}")
+        for metric, old, value, change, regressed in rows:
+            flag = "  REGRESI" if regressed else ""
+            print(f"{metric:<44}{old:>12.3f}{value:>12.3f}{change:>+10.1%}{flag}")
+        print(f"{regressions} regresi di atas toleransi {args.tolerance:.0%}.")
+        status = 1 if regressions else 0
+    if args.save_baseline:
+        path = args.baseline or DEFAULT_BASELINE_PATH
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline disimpan ke {path}.")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+import argparse
+import math
+import random
+import re
+import sys
+from collections import Counter
+
+import joblib
+import numpy as np
+
+from explain import DEFAULT_TOP_TERMS, top_contributions
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+DEFAULT_SCORER_PATH = "compiled_scorer.pkl"
+DEFAULT_TOLERANCE = 1e-6
+LIBSVM_MIN_PROB = 1e-7
+
+# =============================================================================
+# 2. KALIBRASI PROBABILITAS
+# =============================================================================
+
+# sigmoid_predict milik libsvm dalam bentuk yang stabil secara numerik
+def _sigmoid_predict(decision_value: float, a: float, b: float) -> float:
+    f = decision_value * a + b
+    if f >= 0:
+        return math.exp(-f) / (1.0 + math.exp(-f))
+    return 1.0 / (1.0 + math.exp(f))
+
+# Penggabungan probabilitas berpasangan (pairwise coupling) versi iteratif libsvm.
+# Untuk dua kelas hasilnya mendekati r01 tetapi tidak selalu sama persis.
+def _libsvm_coupling(r01: float):
+    k = 2
+    r = [[0.0, r01], [1.0 - r01, 0.0]]
+    p = [1.0 / k] * k
+    q = [[0.0] * k for _ in range(k)]
+    for t in range(k):
+        for j in range(t):
+            q[t][t] += r[j][t] * r[j][t]
+            q[t][j] = q[j][t]
+        for j in range(t + 1, k):
+            q[t][t] += r[j][t] * r[j][t]
+            q[t][j] = -r[j][t] * r[t][j]
+    eps = 0.005 / k
+    for _ in range(max(100, k)):
+        qp = [sum(q[t][j] * p[j] for j in range(k)) for t in range(k)]
+        pqp = sum(p[t] * qp[t] for t in range(k))
+        if max(abs(qp[t] - pqp) for t in range(k)) < eps:
+            break
+        for t in range(k):
+            diff = (-qp[t] + pqp) / q[t][t]
+            p[t] += diff
+            pqp = (pqp + diff * (diff * q[t][t] + 2 * qp[t])) / (1 + diff) / (1 + diff)
+            for j in range(k):
+                qp[j] = (qp[j] + diff * q[t][j]) / (1 + diff)
+                p[j] /= (1 + diff)
+    return p
+
+def _svc_probability(decision_value: float, a: float, b: float, coupling: str):
+    # decision_function publik sklearn adalah negasi nilai keputusan internal libsvm
+    r01 = min(max(_sigmoid_predict(-decision_value, a, b), LIBSVM_MIN_PROB), 1 - LIBSVM_MIN_PROB)
+    if coupling == "direct":
+        return [r01, 1.0 - r01]
+    return _libsvm_coupling(r01)
+
+def _platt_probability(decision_value: float, a: float, b: float):
+    # CalibratedClassifierCV(method="sigmoid"): p1 = expit(-(a*d + b)), p0 = 1 - p1
+    p1 = _sigmoid_predict(decision_value, a, b)
+    return [1.0 - p1, p1]
+
+def _logistic_probability(decision_value: float):
+    if decision_value >= 0:
+        p1 = 1.0 / (1.0 + math.exp(-decision_value))
+    else:
+        z = math.exp(decision_value)
+        p1 = z / (1.0 + z)
+    return [1.0 - p1, p1]
+
+# =============================================================================
+# 3. SCORER LINEAR TERKOMPILASI
+# =============================================================================
+
+class LinearScorer:
+    # Tabel term -> (kolom, idf, bobot), intercept dan parameter kalibrasi.
+    # Satu perkalian titik jarang (sparse dot product) per teks, tanpa sklearn.
+    def __init__(self, table, intercept, classes, token_pattern, lowercase=True,
+                 sublinear_tf=False, binary=False, norm="l2", calibration="libsvm",
+                 prob_a=0.0, prob_b=0.0):
+        self.table = table
+        self.intercept = intercept
+        self.classes = classes
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.norm = norm
+        self.calibration = calibration
+        self.prob_a = prob_a
+        self.prob_b = prob_b
+        self._token_re = re.compile(token_pattern)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_token_re"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._token_re = re.compile(self.token_pattern)
+
+    def to_dict(self) -> dict:
+        # Hanya tipe bawaan: file hasil dump tidak bergantung pada nama modul
+        # saat dump (mis. __main__ ketika dipanggil dari CLI)
+        state = self.__getstate__()
+        state["table"] = dict(state["table"])
+        return state
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        return cls(**state)
+
+    def tokenize(self, cleaned_text: str) -> list:
+        if self.lowercase:
+            cleaned_text = cleaned_text.lower()
+        return self._token_re.findall(cleaned_text)
+
+    def _weighted_terms(self, cleaned_text: str):
+        return self._weighted_counts(Counter(self.tokenize(cleaned_text)))
+
+    def _weighted_counts(self, counts):
+        # Nilai TF-IDF ternormalisasi per term yang dikenal (identik dengan satu
+        # baris hasil vectorizer.transform) beserta bobot model untuk term itu
+        entries = []
+        for term, tf in counts.items():
+            entry = self.table.get(term)
+            if entry is None:
+                continue
+            if self.binary:
+                tf = 1
+            elif self.sublinear_tf:
+                tf = 1.0 + math.log(tf)
+            entries.append((term, tf * entry[1], entry[2]))
+        if self.norm == "l2":
+            scale = math.sqrt(sum(v * v for _, v, _ in entries))
+        elif self.norm == "l1":
+            scale = sum(abs(v) for _, v, _ in entries)
+        else:
+            scale = 0.0
+        if scale > 0:
+            entries = [(term, v / scale, w) for term, v, w in entries]
+        return entries
+
+    def term_weights(self, cleaned_text: str):
+        return {term: v for term, v, _ in self._weighted_terms(cleaned_text)}
+
+    def decision_function(self, cleaned_text: str) -> float:
+        return sum(v * w for _, v, w in self._weighted_terms(cleaned_text)) + self.intercept
+
+    def predict_proba(self, cleaned_text: str):
+        return self.probability(self.decision_function(cleaned_text))
+
+    def probability(self, decision_value: float):
+        if self.calibration == "logistic":
+            return _logistic_probability(decision_value)
+        if self.calibration == "sigmoid":
+            return _platt_probability(decision_value, self.prob_a, self.prob_b)
+        return _svc_probability(decision_value, self.prob_a, self.prob_b, self.calibration)
+
+    def predict_label(self, decision_value: float):
+        # SVC libsvm memilih kelas positif saat nilai keputusan tepat nol,
+        # sedangkan model linear sklearn lainnya memilih kelas negatif.
+        if self.calibration == "logistic":
+            return self.classes[1] if decision_value > 0 else self.classes[0]
+        if self.calibration == "sigmoid":
+            # CalibratedClassifierCV memilih argmax probabilitas, bukan tanda nilai keputusan
+            p0, p1 = self.probability(decision_value)
+            return self.classes[1] if p1 > p0 else self.classes[0]
+        return self.classes[1] if decision_value >= 0 else self.classes[0]
+
+    def score(self, cleaned_text: str):
+        decision_value = self.decision_function(cleaned_text)
+        return self.predict_label(decision_value), self.probability(decision_value)
+
+    def decision_many(self, cleaned_texts):
+        # Nilai keputusan untuk banyak teks dalam satu perhitungan numpy. Urutan
+        # penjumlahan per baris sama dengan decision_function (bincount
+        # mengakumulasi sesuai urutan input), jadi hasilnya identik.
+        rows, terms, tfs = [], [], []
+        for row, cleaned_text in enumerate(cleaned_texts):
+            for term, tf in Counter(self.tokenize(cleaned_text)).items():
+                rows.append(row)
+                terms.append(term)
+                tfs.append(tf)
+        keep, idf, weight = _lookup_terms(self.table, terms)
+        rows = np.asarray(rows, dtype=np.intp)[keep]
+        if self.binary:
+            tf = np.ones(len(rows))
+        elif self.sublinear_tf:
+            tf = np.fromiter((1.0 + math.log(tfs[i]) for i in keep), dtype=np.float64, count=len(keep))
+        else:
+            tf = np.asarray(tfs, dtype=np.float64)[keep]
+        values = tf * idf
+        n = len(cleaned_texts)
+        if self.norm == "l2":
+            scale = np.sqrt(np.bincount(rows, values * values, n))
+        elif self.norm == "l1":
+            scale = np.bincount(rows, np.abs(values), n)
+        else:
+            scale = np.zeros(n)
+        values = values / np.where(scale > 0, scale, 1.0)[rows]
+        return np.bincount(rows, values * weight, n) + self.intercept
+
+    def score_many(self, cleaned_texts) -> list:
+        # Setara [score(t) for t in cleaned_texts]; kalibrasi tetap per nilai
+        # keputusan karena coupling libsvm bersifat iteratif
+        return [(self.predict_label(d), self.probability(d)) for d in self.decision_many(cleaned_texts).tolist()]
+
+    def decision_from_counts(self, counts) -> float:
+        # counts: term -> frekuensi, mis. diakumulasi bertahap oleh streaming.py
+        return sum(v * w for _, v, w in self._weighted_counts(counts)) + self.intercept
+
+    def score_counts(self, counts):
+        decision_value = self.decision_from_counts(counts)
+        return self.predict_label(decision_value), self.probability(decision_value)
+
+    def explain(self, cleaned_text: str, top_k: int = DEFAULT_TOP_TERMS) -> dict:
+        # Term dengan kontribusi (tfidf * bobot) terbesar ke tiap arah keputusan
+        return top_contributions(((term, v * w) for term, v, w in self._weighted_terms(cleaned_text)), top_k)
+
+    def explain_counts(self, counts, top_k: int = DEFAULT_TOP_TERMS) -> dict:
+        return top_contributions(((term, v * w) for term, v, w in self._weighted_counts(counts)), top_k)
+
+# =============================================================================
+# 4. KOMPILASI DARI MODEL SKLEARN
+# =============================================================================
+
+# Skalar numpy -> tipe bawaan Python (JSON, perbandingan label); dipakai juga
+# oleh app.py, batch.py, streaming.py dan service.py
+def _to_builtin(value):
+    return value.item() if hasattr(value, "item") else value
+
+def _lookup_terms(table, terms):
+    # Posisi term yang dikenal beserta idf dan bobotnya sebagai array. Tabel
+    # mmap (artifacts.MappedTermTable) punya lookup() yang mengambil semuanya
+    # dengan satu indeks numpy; dict biasa dibaca per term.
+    if hasattr(table, "lookup"):
+        return table.lookup(terms)
+    entries = list(map(table.get, terms))
+    keep = [i for i, entry in enumerate(entries) if entry is not None]
+    idf = np.array([entries[i][1] for i in keep], dtype=np.float64)
+    weight = np.array([entries[i][2] for i in keep], dtype=np.float64)
+    return keep, idf, weight
+
+def _supported_vectorizer(vectorizer) -> bool:
+    return (
+        type(vectorizer).__name__ == "TfidfVectorizer"
+        and getattr(vectorizer, "analyzer", None) == "word"
+        and tuple(getattr(vectorizer, "ngram_range", (1, 1))) == (1, 1)
+        and getattr(vectorizer, "preprocessor", None) is None
+        and getattr(vectorizer, "tokenizer", None) is None
+        and getattr(vectorizer, "strip_accents", None) is None
+        and getattr(vectorizer, "norm", None) in ("l1", "l2", None)
+        and hasattr(vectorizer, "vocabulary_")
+    )
+
+def _model_calibration(model):
+    # Mengembalikan jenis kalibrasi, atau None bila model tidak linear/tidak didukung
+    classes = getattr(model, "classes_", None)
+    if classes is None or len(classes) != 2:
+        return None
+    name = type(model).__name__
+    if name == "SVC":
+        if model.kernel != "linear" or not getattr(model, "probability", False):
+            return None
+        return "libsvm"
+    if name == "LogisticRegression":
+        return "logistic"
+    if name == "SGDClassifier" and model.loss in ("log", "log_loss"):
+        return "logistic"
+    if name == "CalibratedClassifierCV":
+        # Hanya satu estimator linear terkalibrasi sigmoid (ensemble=False)
+        calibrated = getattr(model, "calibrated_classifiers_", [])
+        if len(calibrated) != 1 or calibrated[0].method != "sigmoid":
+            return None
+        if not hasattr(calibrated[0].estimator, "coef_"):
+            return None
+        return "sigmoid"
+    return None
+
+def _linear_estimator(model):
+    # Estimator pemilik coef_/intercept_ (di dalam CalibratedClassifierCV bila ada)
+    if type(model).__name__ == "CalibratedClassifierCV":
+        return model.calibrated_classifiers_[0].estimator
+    return model
+
+def _dense_row(matrix):
+    row = matrix.toarray() if hasattr(matrix, "toarray") else matrix
+    return [float(v) for v in row.ravel()]
+
+def _detect_coupling(scorer, model, vectorizer, samples: int = 32, seed: int = 0) -> str:
+    # Versi libsvm yang dibundel sklearn menentukan apakah probabilitas biner
+    # memakai r01 langsung atau penggabungan iteratif; pilih yang cocok.
+    rng = random.Random(seed)
+    vocab = list(vectorizer.vocabulary_)
+    texts = [" ".join(rng.choices(vocab, k=rng.randint(5, 60))) for _ in range(samples)]
+    expected = model.predict_proba(vectorizer.transform(texts))
+    errors = {}
+    for coupling in ("libsvm", "direct"):
+        scorer.calibration = coupling
+        errors[coupling] = max(
+            abs(scorer.predict_proba(text)[1] - float(row[1])) for text, row in zip(texts, expected)
+        )
+    return min(errors, key=errors.get)
+
+def compile_scorer(model, vectorizer):
+    calibration = _model_calibration(model)
+    if calibration is None or not _supported_vectorizer(vectorizer):
+        return None
+
+    estimator = _linear_estimator(model)
+    coef = _dense_row(estimator.coef_)
+    idf = [float(v) for v in vectorizer.idf_] if vectorizer.use_idf else None
+    table = {
+        term: (int(column), idf[column] if idf else 1.0, coef[column])
+        for term, column in vectorizer.vocabulary_.items()
+    }
+    scorer = LinearScorer(
+        table=table,
+        intercept=float(estimator.intercept_[0]),
+        classes=[_to_builtin(c) for c in model.classes_],
+        token_pattern=vectorizer.token_pattern,
+        lowercase=vectorizer.lowercase,
+        sublinear_tf=vectorizer.sublinear_tf,
+        binary=vectorizer.binary,
+        norm=vectorizer.norm,
+        calibration=calibration,
+    )
+    if calibration == "sigmoid":
+        calibrator = model.calibrated_classifiers_[0].calibrators[0]
+        scorer.prob_a = float(calibrator.a_)
+        scorer.prob_b = float(calibrator.b_)
+    if calibration == "libsvm":
+        scorer.prob_a = float(model.probA_[0])
+        scorer.prob_b = float(model.probB_[0])
+        scorer.calibration = _detect_coupling(scorer, model, vectorizer)
+    return scorer
+
+def save_scorer(scorer, path: str = DEFAULT_SCORER_PATH) -> None:
+    joblib.dump(scorer.to_dict(), path)
+
+def load_scorer(path: str = DEFAULT_SCORER_PATH) -> LinearScorer:
+    return LinearScorer.from_dict(joblib.load(path))
+
+# =============================================================================
+# 5. VERIFIKASI TERHADAP SKLEARN
+# =============================================================================
+
+def verify_scorer(scorer, model, vectorizer, texts) -> dict:
+    vectorized = vectorizer.transform(texts)
+    expected_proba = model.predict_proba(vectorized)
+    expected_pred = model.predict(vectorized)
+    max_diff = 0.0
+    disagreements = 0
+    for text, proba, pred in zip(texts, expected_proba, expected_pred):
+        label, probability = scorer.score(text)
+        max_diff = max(max_diff, max(abs(p - float(e)) for p, e in zip(probability, proba)))
+        disagreements += label != _to_builtin(pred)
+    return {"texts": len(texts), "max_abs_diff": max_diff, "label_disagreements": disagreements}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kompilasi svm_model.pkl + tfidf_vectorizer.pkl menjadi scorer linear ringkas.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("export", "verify"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--model", default="svm_model.pkl")
+        cmd.add_argument("--vectorizer", default="tfidf_vectorizer.pkl")
+    sub.choices["export"].add_argument("-o", "--output", default=DEFAULT_SCORER_PATH)
+    verify = sub.choices["verify"]
+    verify.add_argument("corpus", nargs="*", help="File teks yang sudah dibersihkan (satu dokumen per baris).")
+    verify.add_argument("--samples", type=int, default=500, help="Jumlah dokumen sintetis dari kosakata.")
+    verify.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    model = joblib.load(args.model)
+    vectorizer = joblib.load(args.vectorizer)
+    scorer = compile_scorer(model, vectorizer)
+    if scorer is None:
+        print("Model atau vectorizer tidak linear/tidak didukung; gunakan jalur sklearn.", file=sys.stderr)
+        return 1
+
+    if args.command == "export":
+        save_scorer(scorer, args.output)
+        print(f"{args.output}: {len(scorer.table)} term, kalibrasi {scorer.calibration}")
+        return 0
+
+    rng = random.Random(42)
+    vocab = list(vectorizer.vocabulary_)
+    texts = [" ".join(rng.choices(vocab, k=rng.randint(5, 300))) for _ in range(args.samples)]
+    for path in args.corpus:
+        with open(path, encoding="utf-8") as f:
+            texts.extend(line.strip() for line in f if line.strip())
+    report = verify_scorer(scorer, model, vectorizer, texts)
+    print(f"{report['texts']} teks: selisih probabilitas maks {report['max_abs_diff']:.2e}, "
+          f"{report['label_disagreements']} label berbeda")
+    ok = report["max_abs_diff"] <= args.tolerance and report["label_disagreements"] == 0
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
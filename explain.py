@@ -0,0 +1,58 @@
+import heapq
+import weakref
+
+import numpy as np
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+# Jumlah term yang ditampilkan untuk tiap arah (mendorong hoaks / mendorong valid)
+DEFAULT_TOP_TERMS = 5
+
+# Kosakata terbalik dan koefisien padat per model/vectorizer. SVC linear
+# menghitung coef_ ulang setiap kali diakses, jadi disimpan sekali di sini.
+_inverse_vocabularies = weakref.WeakKeyDictionary()
+_dense_coefs = weakref.WeakKeyDictionary()
+
+# =============================================================================
+# 2. KONTRIBUSI TERM
+# =============================================================================
+
+def top_contributions(pairs, top_k: int = DEFAULT_TOP_TERMS) -> dict:
+    # pairs: (term, tfidf * bobot). Positif mendorong ke kelas positif (hoaks),
+    # negatif ke kelas negatif (valid); term tanpa kontribusi diabaikan.
+    pairs = [(term, float(value)) for term, value in pairs if value]
+    return {
+        "hoax": [(term, value) for term, value in heapq.nlargest(top_k, pairs, key=lambda p: p[1]) if value > 0],
+        "valid": [(term, value) for term, value in heapq.nsmallest(top_k, pairs, key=lambda p: p[1]) if value < 0],
+    }
+
+def _inverse_vocabulary(vectorizer):
+    terms = _inverse_vocabularies.get(vectorizer)
+    if terms is None:
+        terms = [None] * len(vectorizer.vocabulary_)
+        for term, index in vectorizer.vocabulary_.items():
+            terms[index] = term
+        _inverse_vocabularies[vectorizer] = terms
+    return terms
+
+def _dense_coef(model):
+    coef = _dense_coefs.get(model)
+    if coef is None:
+        coef = model.coef_
+        coef = np.asarray(coef.toarray() if hasattr(coef, "toarray") else coef, dtype=np.float64).ravel()
+        _dense_coefs[model] = coef
+    return coef
+
+def explain_row(row, vectorizer, model, top_k: int = DEFAULT_TOP_TERMS):
+    # Satu lintasan atas entri tak-nol baris hasil vectorizer.transform. Hanya
+    # untuk model linear biner dengan kosakata eksplisit; selain itu None.
+    classes = getattr(model, "classes_", None)
+    if not hasattr(model, "coef_") or classes is None or len(classes) != 2 or not hasattr(vectorizer, "vocabulary_"):
+        return None
+    row = row.tocsr()
+    coef = _dense_coef(model)
+    terms = _inverse_vocabulary(vectorizer)
+    contributions = row.data * coef[row.indices]
+    return top_contributions(zip((terms[index] for index in row.indices), contributions.tolist()), top_k)
@@ -0,0 +1,318 @@
+import argparse
+import re
+import sys
+from collections import Counter
+
+# =============================================================================
+# 1. POLA & LEKSIKON
+# =============================================================================
+
+SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+WORD_RE = re.compile(r'\w+')
+
+DIGIT_RE = re.compile(r'\d')
+UPPER_RE = re.compile(r'\b[A-Z]{2,}\b')
+SOURCE_RE = re.compile(r'(dilansir|menurut|sumber|dikutip|melansir)', re.IGNORECASE)
+EMOTIONAL_RE = re.compile(r'(waspada|sebarkan|penting|bahaya|terungkap|fakta|bukti|viral|heboh|menggemparkan|skandal)', re.IGNORECASE)
+CLICKBAIT_RE = re.compile(r'(mengejutkan|terbongkar|jangan kaget|wajib tahu|ternyata|begini|tak disangka)', re.IGNORECASE)
+
+# Leksikon berbatas \b (kata ganti orang pertama, ajakan menyebarkan, entitas
+# resmi) dan tahun dicocokkan dengan token utuh lewat satu alternasi bergrup
+# nama. Kata kuncinya tidak beririsan, sehingga setiap token masuk paling
+# banyak satu grup. Tahun menggantikan pola tanggal asli: alternatif
+# "tanggal bulan tahun" selalu berakhir pada token empat digit yang juga
+# dihitung alternatif tahun, jadi jumlahnya sama dengan jumlah token yang
+# tepat empat digit.
+WORD_LEXICON_RE = re.compile(
+    r'(?P<first_person_count>saya|kami|penulis)'
+    r'|(?P<call_to_action>bagikan|sebarkan|viralkan|share)'
+    r'|(?P<entity_mentions>presiden|menteri|gubernur|polri|kpk|dpr|pemprov|pemkab|kemenkeu|bi|istana)'
+    r'|(?P<date_mentions>\d{4})',
+    re.IGNORECASE,
+)
+
+# Frasa umpan klik yang mengandung spasi dapat melintasi dua token.
+# Nomor grup kepala dan ekor yang sama menandakan pasangan satu frasa.
+CLICKBAIT_HEAD_RE = re.compile(r'(?:(jangan)|(wajib)|(tak))\Z', re.IGNORECASE)
+CLICKBAIT_TAIL_RE = re.compile(r'(?:(kaget)|(tahu)|(disangka))', re.IGNORECASE)
+
+# Huruf non-ASCII yang oleh re.IGNORECASE disamakan dengan huruf ASCII. Setelah
+# dipetakan, str.lower() tidak mengubah panjang teks dan pola huruf kecil tanpa
+# IGNORECASE cocok di posisi yang sama dengan pola aslinya (jauh lebih cepat)
+IGNORECASE_FOLD = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"})
+CLICKBAIT_LOWER_RE = re.compile(CLICKBAIT_RE.pattern)
+
+# =============================================================================
+# 2. REGISTRI FITUR PER TOKEN
+# =============================================================================
+
+# Setiap fitur menerima satu token (run karakter \w hasil WORD_RE) dan
+# mengembalikan angka. Pola yang hanya memuat karakter \w tidak bisa cocok
+# melintasi token, dan pola berbatas \b cocok dengan token utuh, sehingga
+# penjumlahan per token identik dengan findall atas seluruh teks.
+def regex_counter(pattern):
+    findall = pattern.findall
+    return lambda token: len(findall(token))
+
+TOKEN_FEATURES = {
+    "num_count": regex_counter(DIGIT_RE),
+    "upper_count": regex_counter(UPPER_RE),
+    "has_source": regex_counter(SOURCE_RE),
+    "emotional_words": regex_counter(EMOTIONAL_RE),
+    "clickbait_phrases": regex_counter(CLICKBAIT_RE),
+}
+BOOLEAN_FEATURES = {"has_source"}
+LEXICON_FEATURES = tuple(WORD_LEXICON_RE.groupindex)
+
+# Urutan kunci raw_analysis seperti yang dipakai di seluruh aplikasi
+RAW_FIELDS = (
+    "word_count", "avg_sentence_length", "num_count", "upper_count",
+    "exclamation_count", "question_count", "quote_count", "first_person_count",
+    "has_source", "call_to_action", "emotional_words", "clickbait_phrases",
+    "entity_mentions", "date_mentions",
+)
+
+MAX_TOKEN_CACHE = 100_000
+_token_cache = {}
+_feature_names = tuple(TOKEN_FEATURES) + LEXICON_FEATURES
+
+def register_feature(name: str, func, boolean: bool = False) -> None:
+    # Fitur baru ikut dihitung dalam pemindaian yang sama tanpa pass tambahan.
+    # Pola yang dapat memuat karakter non-\w (spasi, tanda baca) tidak boleh
+    # didaftarkan di sini.
+    global _feature_names
+    TOKEN_FEATURES[name] = func
+    if boolean:
+        BOOLEAN_FEATURES.add(name)
+    _feature_names = tuple(TOKEN_FEATURES) + LEXICON_FEATURES
+    _token_cache.clear()
+
+def _analyze_token(token: str):
+    # Setiap token unik dihitung sekali; teks berikutnya cukup satu lookup dict
+    record = _token_cache.get(token)
+    if record is not None:
+        return record
+
+    counts = [func(token) for func in TOKEN_FEATURES.values()]
+    lexicon = WORD_LEXICON_RE.fullmatch(token)
+    group = lexicon.lastgroup if lexicon else None
+    counts.extend(int(name == group) for name in LEXICON_FEATURES)
+    head = CLICKBAIT_HEAD_RE.search(token)
+    tail = CLICKBAIT_TAIL_RE.match(token)
+    record = (
+        tuple(counts),
+        head.lastindex if head else None,
+        tail.lastindex if tail else None,
+    )
+
+    if len(_token_cache) >= MAX_TOKEN_CACHE:
+        _token_cache.clear()
+    _token_cache[token] = record
+    return record
+
+# =============================================================================
+# 3. PEMINDAIAN SATU PASS
+# =============================================================================
+
+class _ScanState:
+    # Akumulator yang dipakai scan_features (satu teks utuh) dan FeatureScanner
+    # (teks yang datang bertahap). Setiap segmen berakhir di spasi atau akhir
+    # teks, sehingga tidak ada kata, token, atau rangkaian tanda akhir kalimat
+    # yang terpotong di antara dua segmen.
+    def __init__(self):
+        self.totals = [0] * len(_feature_names)
+        self.word_count = 0
+        self.exclamation_count = 0
+        self.question_count = 0
+        self.quote_count = 0
+        self.sentence_count = 0
+        self.sentence_words = 0
+        self.current_words = 0
+        self.clickbait_heads = set()
+        self.clickbait_tails = set()
+
+    def scan(self, segment: str):
+        totals = self.totals
+        # Tokenisasi dan penghitungan token dilakukan di C (findall, Counter);
+        # loop Python hanya berjalan per token unik
+        for token, count in Counter(WORD_RE.findall(segment)).items():
+            counts, head, tail = _analyze_token(token)
+            for j, value in enumerate(counts):
+                if value:
+                    totals[j] += value * count
+            if head:
+                self.clickbait_heads.add(head)
+            if tail:
+                self.clickbait_tails.add(tail)
+
+        self.word_count += len(segment.split())
+        self.exclamation_count += segment.count('!')
+        self.question_count += segment.count('?')
+        self.quote_count += segment.count('"') + segment.count("'")
+
+        # Potongan pertama melanjutkan kalimat yang masih terbuka dari segmen sebelumnya
+        parts = SENTENCE_SPLIT_RE.split(segment)
+        current_words = self.current_words + len(parts[0].split())
+        for part in parts[1:]:
+            if current_words > 3:
+                self.sentence_count += 1
+                self.sentence_words += current_words
+            current_words = len(part.split())
+        self.current_words = current_words
+
+    @property
+    def clickbait_crosses(self) -> bool:
+        # Kepala dan ekor frasa yang sama muncul di teks; tanpa keduanya tidak
+        # ada frasa multi-kata yang bisa cocok
+        return bool(self.clickbait_heads & self.clickbait_tails)
+
+    def result(self, clickbait_phrases: int = None) -> dict:
+        sentence_count, sentence_words = self.sentence_count, self.sentence_words
+        if self.current_words > 3:
+            sentence_count += 1
+            sentence_words += self.current_words
+
+        features = dict(zip(_feature_names, self.totals))
+        features["exclamation_count"] = self.exclamation_count
+        features["question_count"] = self.question_count
+        features["quote_count"] = self.quote_count
+        if clickbait_phrases is not None:
+            features["clickbait_phrases"] = clickbait_phrases
+        for name in BOOLEAN_FEATURES:
+            features[name] = features[name] > 0
+
+        raw_analysis = {
+            "word_count": self.word_count,
+            "avg_sentence_length": sentence_words / sentence_count if sentence_count else 0,
+        }
+        for name in RAW_FIELDS[2:]:
+            raw_analysis[name] = features.pop(name)
+        raw_analysis.update(features)
+        return raw_analysis
+
+def fold_case(text: str) -> str:
+    return (text if text.isascii() else text.translate(IGNORECASE_FOLD)).lower()
+
+def scan_features(text: str) -> dict:
+    state = _ScanState()
+    state.scan(text)
+    # Hanya bila kepala dan ekor frasa sama-sama ada: ulangi pola umpan klik
+    # atas seluruh teks agar aturan non-overlap tetap identik
+    clickbait_phrases = len(CLICKBAIT_LOWER_RE.findall(fold_case(text))) if state.clickbait_crosses else None
+    return state.result(clickbait_phrases)
+
+# Panjang frasa umpan klik terpanjang: posisi awal yang berjarak sekurangnya
+# sepanjang ini dari ujung buffer sudah pasti cocok/tidak cocok
+CLICKBAIT_MAX_LEN = max(len(phrase) for phrase in CLICKBAIT_RE.pattern.strip("()").split("|"))
+
+def split_complete(text: str):
+    # Memisahkan teks menjadi bagian yang berakhir di spasi (semua kata sudah
+    # lengkap) dan sisa token terakhir yang mungkin berlanjut di potongan berikutnya
+    cut = len(text)
+    while cut and not text[cut - 1].isspace():
+        cut -= 1
+    return text[:cut], text[cut:]
+
+class FeatureScanner:
+    # Versi bertahap scan_features untuk dokumen sangat panjang: teks diumpankan
+    # per potongan lewat feed() dan hanya token terakhir yang belum lengkap serta
+    # jendela pendek untuk frasa umpan klik yang ditahan di memori.
+    # result() identik dengan scan_features atas gabungan seluruh potongan.
+    def __init__(self):
+        self._state = _ScanState()
+        self._carry = ""
+        self._window = ""
+        self._clickbait = 0
+
+    def _count_clickbait(self, final: bool = False):
+        # findall non-overlap yang sama dengan CLICKBAIT_RE atas seluruh teks;
+        # kecocokan hanya diterima bila seluruh jendela kandidatnya sudah terlihat
+        window = self._window
+        limit = len(window) if final else len(window) - CLICKBAIT_MAX_LEN
+        pos = 0
+        for match in CLICKBAIT_RE.finditer(window):
+            if match.start() > limit:
+                break
+            self._clickbait += 1
+            pos = match.end()
+        self._window = "" if final else window[max(pos, limit + 1, 0):]
+
+    def feed(self, piece: str):
+        complete, self._carry = split_complete(self._carry + piece)
+        if complete:
+            self._state.scan(complete)
+        self._window += piece
+        self._count_clickbait()
+        return self
+
+    def result(self) -> dict:
+        if self._carry:
+            self._state.scan(self._carry)
+            self._carry = ""
+        self._count_clickbait(final=True)
+        return self._state.result(self._clickbait)
+
+# =============================================================================
+# 4. IMPLEMENTASI REFERENSI & VERIFIKASI
+# =============================================================================
+
+# Implementasi multi-pass asli, dipertahankan sebagai acuan verifikasi
+def reference_raw_analysis(text: str) -> dict:
+    sentences = re.split(r'[.!?]+', text)
+    sentences = [s for s in sentences if len(s.split()) > 3]
+    avg_sentence_length = sum(len(s.split()) for s in sentences) / len(sentences) if sentences else 0
+
+    return {
+        "word_count": len(text.split()),
+        "avg_sentence_length": avg_sentence_length,
+        "num_count": len(re.findall(r'\d', text)),
+        "upper_count": len(re.findall(r'\b[A-Z]{2,}\b', text)),
+        "exclamation_count": text.count('!'),
+        "question_count": text.count('?'),
+        "quote_count": text.count('"') + text.count("'"),
+        "first_person_count": len(re.findall(r'\b(saya|kami|penulis)\b', text, re.IGNORECASE)),
+        "has_source": bool(re.search(r'(dilansir|menurut|sumber|dikutip|melansir)', text, re.IGNORECASE)),
+        "call_to_action": len(re.findall(r'\b(bagikan|sebarkan|viralkan|share)\b', text, re.IGNORECASE)),
+        "emotional_words": len(re.findall(r'(waspada|sebarkan|penting|bahaya|terungkap|fakta|bukti|viral|heboh|menggemparkan|skandal)', text, re.IGNORECASE)),
+        "clickbait_phrases": len(re.findall(r'(mengejutkan|terbongkar|jangan kaget|wajib tahu|ternyata|begini|tak disangka)', text, re.IGNORECASE)),
+        "entity_mentions": len(re.findall(r'\b(presiden|menteri|gubernur|polri|kpk|dpr|pemprov|pemkab|kemenkeu|bi|istana)\b', text, re.IGNORECASE)),
+        "date_mentions": len(re.findall(r'\b(\d{1,2}\s(januari|februari|maret|april|mei|juni|juli|agustus|september|oktober|november|desember)\s\d{4})\b|\b(\d{4})\b', text, re.IGNORECASE)),
+    }
+
+VERIFY_SAMPLES = (
+    "",
+    "   ",
+    "SEBARKAN!! Beredar kabar bahwa minuman bersoda dapat menyembuhkan penyakit COVID-19 dalam waktu singkat. Jangan kaget, wajib tahu!!!",
+    "Menteri Keuangan Sri Mulyani Indrawati menyatakan bahwa realisasi APBN 2024 positif hingga 31 Mei 2024. Menurut BI, inflasi 2,5 persen.",
+    "Ternyata jangan  kaget... jangan\nkaget, wajib tahuu, tak disangkanya! Xjangan kagetbegini dan kageternyata.",
+    "Saya dan KAMI, penulis. 'Dikutip' dari \"sumber\" resmi? Presiden, DPR, KPK, Polri; bi BI Bi 1999 12345 2024a _2024.",
+    "a b c d. e f. g h i j k!? l m n o ... p",
+    "HEBOH!!! Terungkap skandal menggemparkan, bukti fakta viral: VIRALKAN & share sekarang juga!!!",
+)
+
+def verify(texts) -> int:
+    mismatches = 0
+    for text in texts:
+        expected = reference_raw_analysis(text)
+        actual = scan_features(text)
+        if actual != expected or list(actual) != list(expected):
+            mismatches += 1
+            diff = {k: (expected.get(k), actual.get(k)) for k in expected if expected.get(k) != actual.get(k)}
+            print(f"Berbeda: {text[:60]!r} -> {diff}", file=sys.stderr)
+    return mismatches
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifikasi scan_features terhadap implementasi regex asli.")
+    parser.add_argument("corpus", nargs="*", help="File teks tambahan (satu dokumen per baris).")
+    args = parser.parse_args(argv)
+
+    texts = list(VERIFY_SAMPLES)
+    for path in args.corpus:
+        with open(path, encoding="utf-8") as f:
+            texts.extend(line.rstrip("\n") for line in f)
+    mismatches = verify(texts)
+    print(f"{len(texts)} teks diperiksa, {mismatches} berbeda.")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
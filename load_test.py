@@ -0,0 +1,199 @@
+import argparse
+import gc
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from app import build_card_html, load_resources, perform_analysis
+from bench import DEFAULT_SEED, generate_corpus, summarize
+from streaming import compare_results
+from ui_bench import DEFAULT_APP_PATH, DEFAULT_TIMEOUT_SECONDS, SUBMIT_LABEL
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+DEFAULT_LEVELS = (1, 10, 50, 100, 200)
+# apptest: skrip app.py utuh lewat AppTest (jalur form render_main_panel).
+# direct: pengganti ringan yang memanggil perform_analysis + build_card_html
+# pada sumber daya bersama yang sama, untuk jumlah sesi yang lebih besar.
+DRIVERS = ("apptest", "direct")
+BARRIER_TIMEOUT_SECONDS = 600
+MAX_REPORTED_DIVERGENCES = 5
+
+# =============================================================================
+# 2. DRIVER SESI
+# =============================================================================
+
+class AppTestDriver:
+    # Setiap sesi adalah AppTest sendiri; semua berbagi load_resources
+    # (st.cache_resource) dalam proses ini seperti pada server Streamlit
+    def __init__(self, app_path: str = DEFAULT_APP_PATH, timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        self.app_path = app_path
+        self.timeout = timeout
+
+    def prepare(self, text: str):
+        app_test = AppTest.from_file(self.app_path, default_timeout=self.timeout)
+        app_test.run()
+        app_test.text_area(key="text_input").input(text)
+        next(button for button in app_test.button if button.label == SUBMIT_LABEL).click()
+        return app_test
+
+    def submit(self, app_test):
+        start = time.perf_counter()
+        app_test.run()
+        latency = time.perf_counter() - start
+        if app_test.exception:
+            raise RuntimeError(app_test.exception[0].message)
+        result = app_test.session_state["last_result"]
+        if result is None:
+            # render_main_panel tidak menyimpan hasil bila teks ditolak
+            result = {"error": next((w.value for w in app_test.warning), "tidak ada hasil")}
+        return latency, result
+
+class DirectDriver:
+    # Server Streamlit melayani sesi dengan thread dalam satu proses, jadi
+    # thread di sini menghadapi GIL dan sumber daya bersama yang sama
+    def __init__(self, resources: dict):
+        self.resources = resources
+
+    def prepare(self, text: str):
+        return text
+
+    def submit(self, text: str):
+        start = time.perf_counter()
+        result = perform_analysis(text, self.resources)
+        if "error" not in result:
+            build_card_html(result)
+        return time.perf_counter() - start, result
+
+# =============================================================================
+# 3. LEVEL BEBAN
+# =============================================================================
+
+def _rss_mb() -> float:
+    gc.collect()
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        # Bukan Linux: hanya puncak RSS yang tersedia (KB di Linux, byte di macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+def run_level(driver, texts) -> dict:
+    # Sesi disiapkan berurutan, lalu semua submit dilepas bersamaan lewat barrier
+    rss_start = _rss_mb()
+    sessions = [driver.prepare(text) for text in texts]
+    barrier = threading.Barrier(len(sessions))
+    outcomes = [None] * len(sessions)
+
+    def worker(index):
+        try:
+            barrier.wait(BARRIER_TIMEOUT_SECONDS)
+            outcomes[index] = driver.submit(sessions[index])
+        except Exception as exc:
+            outcomes[index] = exc
+
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(len(sessions))]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    rss_end = _rss_mb()
+
+    latencies = [outcome[0] for outcome in outcomes if isinstance(outcome, tuple)]
+    errors = [repr(outcome) for outcome in outcomes if isinstance(outcome, Exception)]
+    return {
+        "sessions": len(texts),
+        "elapsed_seconds": elapsed,
+        "throughput_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "latency": summarize(latencies),
+        "rss_start_mb": rss_start,
+        "rss_end_mb": rss_end,
+        "rss_per_session_kb": (rss_end - rss_start) * 1000 / len(texts),
+        "errors": errors[:MAX_REPORTED_DIVERGENCES],
+        "error_count": len(errors),
+        "results": [outcome[1] if isinstance(outcome, tuple) else None for outcome in outcomes],
+    }
+
+def find_divergences(texts, results, resources: dict) -> list:
+    # Acuan dihitung berurutan setelah beban, tanpa cache verdict, pada model yang sama.
+    # Verdict hampir-duplikat memang berasal dari teks lain, jadi tidak dibandingkan.
+    reference_resources = dict(resources, result_cache=None)
+    divergences = []
+    for index, (text, result) in enumerate(zip(texts, results)):
+        if result is None or result.get("cache") == "near_duplicate":
+            continue
+        problems = compare_results(result, perform_analysis(text, reference_resources))
+        if problems:
+            divergences.append({"session": index, "fields": problems})
+    return divergences
+
+def load_test(driver, resources: dict, levels, seed: int = DEFAULT_SEED) -> list:
+    # Setiap level memakai teks berbeda agar memo/cache verdict tidak menutupi
+    # pekerjaan stemmer dan model yang sebenarnya
+    corpus = generate_corpus(sum(levels), seed)
+    rows = []
+    for level in levels:
+        texts = [next(corpus)["text"] for _ in range(level)]
+        row = run_level(driver, texts)
+        results = row.pop("results")
+        divergences = find_divergences(texts, results, resources)
+        row["near_duplicate"] = sum(1 for result in results if result and result.get("cache") == "near_duplicate")
+        row["divergent"] = len(divergences)
+        row["divergences"] = divergences[:MAX_REPORTED_DIVERGENCES]
+        rows.append(row)
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji beban sesi Streamlit serentak (dalam proses).")
+    parser.add_argument("--levels", default=",".join(map(str, DEFAULT_LEVELS)),
+                        help="Daftar jumlah sesi serentak, mis. 1,10,50,100,200.")
+    parser.add_argument("--driver", choices=DRIVERS, default="apptest")
+    parser.add_argument("--app", default=DEFAULT_APP_PATH, help="Skrip aplikasi untuk driver apptest.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_SECONDS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("-o", "--output", help="Simpan hasil sebagai JSON.")
+    args = parser.parse_args(argv)
+
+    levels = [int(part) for part in args.levels.split(",") if part.strip()]
+    if not levels or min(levels) < 1:
+        print("Error: --levels harus berisi bilangan >= 1.", file=sys.stderr)
+        return 2
+    resources = load_resources()
+    if not resources:
+        print("Error: Pastikan file model 'svm_model.pkl' dan 'tfidf_vectorizer.pkl' ada di direktori yang sama.", file=sys.stderr)
+        return 1
+    driver = AppTestDriver(args.app, args.timeout) if args.driver == "apptest" else DirectDriver(resources)
+
+    rows = load_test(driver, resources, levels, args.seed)
+    print(f"driver {args.driver}, {os.cpu_count()} CPU")
+    print(f"{'sesi':>6}{'sesi/s':>9}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}"
+          f"{'RSS (MB)':>10}{'KB/sesi':>9}{'cache~':>8}{'galat':>7}{'beda':>6}")
+    for row in rows:
+        latency = row["latency"]
+        print(f"{row['sessions']:>6}{row['throughput_per_s']:>9.1f}{latency['p50_ms']:>10.1f}{latency['p95_ms']:>10.1f}"
+              f"{latency['p99_ms']:>10.1f}{row['rss_end_mb']:>10.1f}{row['rss_per_session_kb']:>9.1f}"
+              f"{row['near_duplicate']:>8}{row['error_count']:>7}{row['divergent']:>6}")
+    for row in rows:
+        for divergence in row["divergences"]:
+            print(f"PERINGATAN: {row['sessions']} sesi, sesi #{divergence['session']} berbeda dari acuan "
+                  f"berurutan pada {', '.join(divergence['fields'])}")
+        for error in row["errors"]:
+            print(f"GALAT: {row['sessions']} sesi: {error}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"driver": args.driver, "cpu_count": os.cpu_count(), "levels": rows}, f, indent=2)
+    return 0 if all(not row["divergent"] and not row["error_count"] for row in rows) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+# Instrumentasi aktif bila HOAX_METRICS=1 (atau Metrics.enable() dipanggil)
+METRICS_ENV = "HOAX_METRICS"
+METRIC_PREFIX = "hoax"
+# Batas bucket histogram latensi (detik), dari 5 mikrodetik hingga 5 detik
+DEFAULT_BUCKETS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+# Tahapan analisis yang diukur, sesuai urutan pada perform_analysis
+STAGES = (
+    "raw_features",
+    "cache_lookup",
+    "cleanup",
+    "stopwords",
+    "stemming",
+    "vectorize",
+    "predict",
+    "predict_proba",
+    "compiled_score",
+    "explain",
+    "total",
+)
+
+# =============================================================================
+# 2. HISTOGRAM & REGISTRI
+# =============================================================================
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        # Estimasi dari bucket (interpolasi linear), seperti histogram_quantile Prometheus
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen, lower = 0, 0.0
+        for upper, count in zip(self.buckets + (self.max,), self.counts):
+            if count and seen + count >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+            lower = upper
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _StageTimer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+class Metrics:
+    # Saat nonaktif, stage() mengembalikan satu objek context manager kosong
+    # yang sama sehingga biaya per tahap hanya satu pengecekan atribut.
+    def __init__(self, enabled: bool = False, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name)
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def inc(self, name: str, value: int = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {name: histogram.snapshot() for name, histogram in self._histograms.items()}
+            counters = {
+                name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else ""): value
+                for (name, labels), value in sorted(self._counters.items())
+            }
+        ordered = {name: stages[name] for name in STAGES if name in stages}
+        ordered.update({name: stats for name, stats in sorted(stages.items()) if name not in ordered})
+        return {"enabled": self.enabled, "stages": ordered, "counters": counters}
+
+    def dump(self, prefix: str = METRIC_PREFIX) -> str:
+        # Format teks eksposisi Prometheus (versi 0.0.4)
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+            metric = f"{prefix}_stage_seconds"
+            lines.append(f"# HELP {metric} Latensi per tahap analisis dalam detik.")
+            lines.append(f"# TYPE {metric} histogram")
+            for name, histogram in histograms:
+                cumulative = 0
+                for upper, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{stage="{name}",le="{upper:g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{stage="{name}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{stage="{name}"}} {histogram.sum:.9g}')
+                lines.append(f'{metric}_count{{stage="{name}"}} {histogram.count}')
+
+            declared = set()
+            for (name, labels), value in counters:
+                metric = f"{prefix}_{name}"
+                if metric not in declared:
+                    lines.append(f"# TYPE {metric} counter")
+                    declared.add(metric)
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{metric}{{{label_text}}} {value}" if label_text else f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    @contextmanager
+    def enabled_for(self, enabled: bool = True):
+        previous = self.enabled
+        self.enabled = enabled
+        try:
+            yield self
+        finally:
+            self.enabled = previous
+
+# Registri global yang dipakai app.py, batch.py dan service.py
+METRICS = Metrics(enabled=os.environ.get(METRICS_ENV, "") == "1")
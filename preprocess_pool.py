@@ -0,0 +1,267 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+from app import compute_raw_analysis, run_text_preprocessing
+from artifacts import load_text_resources, model_path
+from stem_cache import DEFAULT_AUTOSAVE_EVERY, DEFAULT_LEXICON_PATH, append_lexicon
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+# Jumlah teks per tugas IPC; cukup besar agar biaya pickle/antrean teramortisasi,
+# cukup kecil agar beban tersebar merata ke semua worker
+DEFAULT_CHUNK_SIZE = 64
+# Jumlah tugas tertunda per worker; membatasi memori untuk input tak terbatas
+PENDING_PER_WORKER = 4
+READY_TIMEOUT_SECONDS = 300
+
+# =============================================================================
+# 2. WORKER
+# =============================================================================
+
+# Sumber daya per proses worker: stemmer dan stopword dimuat sekali saat worker dibuat
+_worker_resources = None
+_worker_barrier = None
+
+def _init_worker(artifact_dir: str, lexicon_path: str, barrier):
+    global _worker_resources, _worker_barrier
+    _worker_resources = load_text_resources(artifact_dir, lexicon_path)
+    _worker_barrier = barrier
+    # Worker tidak menulis leksikon; stem barunya dikirim ke proses induk (lihat _run_task)
+    _worker_resources["stemmer"].autosave_every = None
+
+def _ready(_):
+    # Setiap worker memegang satu tugas hingga semuanya siap (lihat warm_up)
+    _worker_barrier.wait(READY_TIMEOUT_SECONDS)
+    return os.getpid()
+
+def clean_chunk(texts, resources: dict = None):
+    if resources is None:
+        resources = _worker_resources
+    stemmer, stopwords = resources["stemmer"], resources["stopwords"]
+    return [run_text_preprocessing(text, stemmer, stopwords) for text in texts]
+
+def prepare_chunk(texts, resources: dict = None):
+    # Pasangan (raw_analysis, teks bersih) per teks, seperti yang dibutuhkan service.py
+    return list(zip(map(compute_raw_analysis, texts), clean_chunk(texts, resources)))
+
+def _run_task(task, texts):
+    # Hasil tugas beserta stem baru sejak tugas sebelumnya. Hanya proses induk
+    # yang menulis leksikon, jadi worker tidak saling menggandakan atau
+    # memotong baris file yang sama.
+    return task(texts), _worker_resources["stemmer"].take_pending()
+
+# =============================================================================
+# 3. POOL PRA-PEMROSESAN
+# =============================================================================
+
+class PreprocessPool:
+    # Menjalankan run_text_preprocessing di beberapa proses. Input dikirim per
+    # chunk dan hasil dikembalikan sesuai urutan input. workers=1 berjalan di
+    # proses yang sama tanpa IPC.
+    def __init__(self, workers: int = DEFAULT_WORKERS, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 artifact_dir: str = None, lexicon_path: str = DEFAULT_LEXICON_PATH):
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.artifact_dir = artifact_dir
+        self.lexicon_path = lexicon_path
+        self._pool = None
+        self._resources = None
+        self._learned = {}
+        self._lexicon_offset = 0
+        self._learned_lock = threading.Lock()
+
+    def start(self):
+        if self.workers == 1:
+            if self._resources is None:
+                self._resources = load_text_resources(self.artifact_dir, self.lexicon_path)
+        elif self._pool is None:
+            context = multiprocessing.get_context()
+            barrier = context.Barrier(self.workers)
+            self._pool = context.Pool(
+                self.workers, initializer=_init_worker,
+                initargs=(self.artifact_dir, self.lexicon_path, barrier),
+            )
+        return self
+
+    def warm_up(self):
+        # Menunggu semua worker selesai memuat stemmer, agar waktu mulai tidak
+        # tercampur dengan pengukuran throughput
+        self.start()
+        if self._pool is not None:
+            self._pool.map(_ready, range(self.workers), chunksize=1)
+        return self
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+            with self._learned_lock:
+                self._write_learned()
+        if self._resources is not None:
+            self._resources["stemmer"].flush()
+
+    # Stem baru dari worker dikumpulkan per kata (duplikat antarworker hilang)
+    # lalu ditulis sekaligus setiap DEFAULT_AUTOSAVE_EVERY kata dan saat close()
+    def _learn(self, stems):
+        if not stems:
+            return
+        with self._learned_lock:
+            self._learned.update(stems)
+            if len(self._learned) >= DEFAULT_AUTOSAVE_EVERY:
+                self._write_learned()
+
+    def _write_learned(self):
+        if self._learned and self.lexicon_path:
+            _, self._lexicon_offset, _ = append_lexicon(model_path(self.lexicon_path), self._learned.items(),
+                                                        self._lexicon_offset)
+        self._learned = {}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _chunks(self, texts):
+        iterator = iter(texts)
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def imap(self, texts):
+        # Generator teks bersih, satu per teks input, dalam urutan input.
+        # apply_async dengan antrean terbatas dipakai karena Pool.imap menarik
+        # seluruh iterable input ke antrean tugas sekaligus.
+        self.start()
+        if self._pool is None:
+            for chunk in self._chunks(texts):
+                yield from clean_chunk(chunk, self._resources)
+            return
+        pending = deque()
+        max_pending = self.workers * PENDING_PER_WORKER
+        for chunk in self._chunks(texts):
+            pending.append(self._pool.apply_async(_run_task, (clean_chunk, chunk)))
+            if len(pending) >= max_pending:
+                yield from self._collect(pending.popleft().get())
+        while pending:
+            yield from self._collect(pending.popleft().get())
+
+    def _collect(self, payload):
+        results, stems = payload
+        self._learn(stems)
+        return results
+
+    def map(self, texts) -> list:
+        return list(self.imap(texts))
+
+    def apply_async(self, texts, callback, error_callback, with_features: bool = False):
+        # Tanpa menunggu hasil, untuk pemanggil di event loop (service.py):
+        # callback menerima daftar hasil dari thread hasil multiprocessing.Pool.
+        # with_features: setiap hasil berupa (raw_analysis, teks bersih).
+        self.start()
+        task = prepare_chunk if with_features else clean_chunk
+        texts = list(texts)
+        if self._pool is None:
+            try:
+                results = task(texts, self._resources)
+            except Exception as exc:
+                error_callback(exc)
+            else:
+                callback(results)
+            return
+        self._pool.apply_async(_run_task, (task, texts), callback=lambda payload: callback(self._collect(payload)),
+                               error_callback=error_callback)
+
+def preprocess_parallel(texts, workers: int = DEFAULT_WORKERS, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        artifact_dir: str = None, lexicon_path: str = DEFAULT_LEXICON_PATH):
+    with PreprocessPool(workers, chunk_size, artifact_dir, lexicon_path) as pool:
+        yield from pool.imap(texts)
+
+# =============================================================================
+# 4. BENCHMARK SKALABILITAS
+# =============================================================================
+
+def scaling_curve(texts, worker_counts, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  artifact_dir: str = None, lexicon_path: str = None) -> list:
+    rows, baseline, reference = [], None, None
+    for workers in worker_counts:
+        started = time.perf_counter()
+        with PreprocessPool(workers, chunk_size, artifact_dir, lexicon_path) as pool:
+            pool.warm_up()
+            startup = time.perf_counter() - started
+            start = time.perf_counter()
+            cleaned = pool.map(texts)
+            elapsed = time.perf_counter() - start
+        if reference is None:
+            reference = cleaned
+        docs_per_s = len(texts) / elapsed if elapsed else 0.0
+        baseline = baseline or docs_per_s
+        rows.append({
+            "workers": workers,
+            "startup_seconds": startup,
+            "seconds": elapsed,
+            "docs_per_s": docs_per_s,
+            "speedup": docs_per_s / baseline if baseline else 0.0,
+            "efficiency": docs_per_s / baseline / workers if baseline else 0.0,
+            "matches_first_run": cleaned == reference,
+        })
+    return rows
+
+def _default_worker_counts():
+    counts, workers = [], 1
+    while workers < DEFAULT_WORKERS:
+        counts.append(workers)
+        workers *= 2
+    return counts + [DEFAULT_WORKERS]
+
+def main(argv=None):
+    from bench import DEFAULT_SEED, generate_corpus
+
+    parser = argparse.ArgumentParser(description="Pra-pemrosesan paralel: kurva skalabilitas per jumlah worker.")
+    parser.add_argument("corpus", nargs="?", help="File teks (satu dokumen per baris); default korpus sintetis.")
+    parser.add_argument("-n", "--size", type=int, default=20_000, help="Jumlah teks korpus sintetis.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workers", default=",".join(map(str, _default_worker_counts())),
+                        help="Daftar jumlah worker, mis. 1,2,4,8,16,32.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--lexicon", default=None,
+                        help="Leksikon stem (default: tanpa leksikon agar Sastrawi benar-benar diukur).")
+    parser.add_argument("--artifact-dir", default=None)
+    parser.add_argument("-o", "--output", help="Simpan hasil sebagai JSON.")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            texts = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        texts = [record["text"] for record in generate_corpus(args.size, args.seed)]
+    worker_counts = [int(part) for part in args.workers.split(",") if part.strip()]
+
+    rows = scaling_curve(texts, worker_counts, args.chunk_size, args.artifact_dir, args.lexicon)
+    print(f"{len(texts)} teks, chunk {args.chunk_size}, {os.cpu_count()} CPU")
+    print(f"{'worker':>7}{'mulai (s)':>11}{'waktu (s)':>11}{'dok/s':>11}{'speedup':>9}{'efisiensi':>11}")
+    for row in rows:
+        print(f"{row['workers']:>7}{row['startup_seconds']:>11.2f}{row['seconds']:>11.2f}{row['docs_per_s']:>11.1f}"
+              f"{row['speedup']:>9.2f}{row['efficiency']:>11.0%}{'' if row['matches_first_run'] else '  BERBEDA'}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"size": len(texts), "chunk_size": args.chunk_size, "cpu_count": os.cpu_count(),
+                       "rows": rows}, f, indent=2)
+    return 0 if all(row["matches_first_run"] for row in rows) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import pickle
+import sys
+import tempfile
+from itertools import islice
+
+from app import perform_analysis
+from artifacts import (
+    DEFAULT_MODEL_PATH,
+    DEFAULT_VECTORIZER_PATH,
+    VOCAB_INDEXES,
+    export_scorer,
+    load_mapped_resources,
+    load_pickle_resources,
+    write_scorer_tables,
+)
+from batch import detect_format
+from bench import DEFAULT_SEED, generate_corpus
+from compiled_scorer import LinearScorer
+from preprocess_pool import PreprocessPool
+from stem_cache import DEFAULT_LEXICON_PATH
+from train import read_labelled
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+# Proporsi term (terurut menurut kontribusi) yang dicoba pada laporan akurasi vs ukuran
+DEFAULT_FRACTIONS = (1.0, 0.5, 0.25, 0.1, 0.05, 0.02)
+DEFAULT_OUTPUT_DIR = "model_artifacts_pruned"
+DEFAULT_EVAL_SIZE = 4000
+# Jumlah teks acuan untuk pemeriksaan verdict perform_analysis setelah ekspor
+DEFAULT_CHECK_SIZE = 500
+
+# =============================================================================
+# 2. PEMANGKASAN KOSAKATA
+# =============================================================================
+
+def _contribution(entry) -> float:
+    # Kontribusi maksimum satu term ke nilai keputusan: tf-idf ternormalisasi
+    # tidak melebihi idf, jadi |idf x bobot| adalah batas atasnya
+    _, idf, weight = entry
+    return abs(idf * weight)
+
+def prune_terms(scorer, keep: int = None, min_weight: float = None) -> LinearScorer:
+    # Term dengan kontribusi <= min_weight dibuang, lalu hanya keep teratas yang
+    # dipertahankan. Kalibrasi model penuh tetap dipakai; normalisasi kini dihitung atas term tersisa sehingga nilai
+    # keputusan sedikit bergeser (lihat laporan dan check_verdicts).
+    ranked = sorted(scorer.table.items(), key=lambda item: _contribution(item[1]), reverse=True)
+    if min_weight is not None:
+        ranked = [item for item in ranked if _contribution(item[1]) > min_weight]
+    if keep is not None:
+        ranked = ranked[:keep]
+    table = {term: (column, idf, weight) for column, (term, (_, idf, weight)) in enumerate(ranked)}
+    return LinearScorer(
+        table=table,
+        intercept=scorer.intercept,
+        classes=scorer.classes,
+        token_pattern=scorer.token_pattern,
+        lowercase=scorer.lowercase,
+        sublinear_tf=scorer.sublinear_tf,
+        binary=scorer.binary,
+        norm=scorer.norm,
+        calibration=scorer.calibration,
+        prob_a=scorer.prob_a,
+        prob_b=scorer.prob_b,
+    )
+
+# =============================================================================
+# 3. LAPORAN AKURASI VS UKURAN
+# =============================================================================
+
+def full_model_labels(resources: dict, cleaned_texts) -> list:
+    # Label model penuh (sklearn) sebagai acuan kesepakatan
+    predictions = resources["model"].predict(resources["vectorizer"].transform(cleaned_texts))
+    return [label.item() if hasattr(label, "item") else label for label in predictions]
+
+def evaluate_scorer(scorer, cleaned_texts, labels, full_labels) -> dict:
+    predicted = [scorer.score(text)[0] for text in cleaned_texts]
+    total = len(predicted)
+    return {
+        "accuracy": sum(p == label for p, label in zip(predicted, labels)) / total if total else None,
+        "agreement": sum(p == label for p, label in zip(predicted, full_labels)) / total if total else None,
+    }
+
+def artifact_bytes(scorer, vocab_index: str = "perfect") -> int:
+    # Ukuran vocab + idf.npy + coef.npy seperti yang ditulis export_scorer
+    with tempfile.TemporaryDirectory(prefix="hoax-prune-") as tmp:
+        write_scorer_tables(scorer, tmp, vocab_index)
+        return sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp))
+
+def size_report(scorer, cleaned_texts, labels, full_labels, fractions=DEFAULT_FRACTIONS,
+                vocab_index: str = "perfect") -> list:
+    rows = []
+    for fraction in fractions:
+        pruned = prune_terms(scorer, keep=max(1, round(len(scorer.table) * fraction)))
+        row = {
+            "fraction": fraction,
+            "terms": len(pruned.table),
+            "artifact_bytes": artifact_bytes(pruned, vocab_index),
+            # Pembanding: kosakata sebagai dict Python yang dipickle
+            "dict_pickle_bytes": len(pickle.dumps(pruned.table, protocol=pickle.HIGHEST_PROTOCOL)),
+        }
+        row.update(evaluate_scorer(pruned, cleaned_texts, labels, full_labels))
+        rows.append(row)
+    return rows
+
+# =============================================================================
+# 4. PEMERIKSAAN VERDICT
+# =============================================================================
+
+def check_verdicts(full_resources: dict, pruned_resources: dict, texts) -> dict:
+    # perform_analysis utuh pada kedua sumber daya; tanpa cache verdict agar
+    # kedua sisi benar-benar menilai ulang setiap teks
+    full = dict(full_resources, result_cache=None)
+    pruned = dict(pruned_resources, result_cache=None)
+    changed, compared, max_delta = [], 0, 0.0
+    for index, text in enumerate(texts):
+        expected, actual = perform_analysis(text, full), perform_analysis(text, pruned)
+        if "error" in expected or "error" in actual:
+            if ("error" in expected) != ("error" in actual):
+                changed.append(index)
+            continue
+        compared += 1
+        if expected["prediction"] != actual["prediction"]:
+            changed.append(index)
+        max_delta = max(max_delta, abs(expected["confidence"] - actual["confidence"]))
+    return {"texts": len(texts), "compared": compared, "changed": changed, "max_confidence_delta": max_delta}
+
+# =============================================================================
+# 5. EKSEKUSI CLI
+# =============================================================================
+
+def _load_labelled(path: str, fmt: str, text_field: str, label_field: str, size: int, seed: int) -> list:
+    if not path:
+        return [(record["text"], record["label"]) for record in generate_corpus(size, seed)]
+    fmt = detect_format(path, ("jsonl", "csv"), "jsonl") if fmt == "auto" else fmt
+    with open(path, encoding="utf-8", newline="") as stream:
+        return list(islice(read_labelled(stream, fmt, text_field, label_field), size))
+
+def _parse_fractions(value: str):
+    return tuple(float(part) for part in value.split(",") if part.strip())
+
+def _print_report(rows, vectorizer_path: str):
+    print(f"Pembanding: {vectorizer_path} {os.path.getsize(vectorizer_path) / 1e6:.2f} MB")
+    print(f"{'proporsi':>9}{'term':>9}{'artefak (MB)':>14}{'dict (MB)':>11}{'akurasi':>10}{'sepakat':>10}")
+    for row in rows:
+        accuracy = "-" if row["accuracy"] is None else f"{row['accuracy']:.2%}"
+        agreement = "-" if row["agreement"] is None else f"{row['agreement']:.2%}"
+        print(f"{row['fraction']:>9.0%}{row['terms']:>9}{row['artifact_bytes'] / 1e6:>14.2f}"
+              f"{row['dict_pickle_bytes'] / 1e6:>11.2f}{accuracy:>10}{agreement:>10}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pangkas kosakata TF-IDF berbobot kecil dan ekspor vectorizer ringkas.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("report", "export"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--data", help="Korpus berlabel JSONL/CSV; default korpus sintetis bench.py.")
+        cmd.add_argument("--format", choices=("auto", "jsonl", "csv"), default="auto")
+        cmd.add_argument("--text-field", default="text")
+        cmd.add_argument("--label-field", default="label")
+        cmd.add_argument("--seed", type=int, default=DEFAULT_SEED)
+        cmd.add_argument("--model", default=DEFAULT_MODEL_PATH)
+        cmd.add_argument("--vectorizer", default=DEFAULT_VECTORIZER_PATH)
+        cmd.add_argument("--vocab-index", choices=VOCAB_INDEXES, default="perfect")
+    report = sub.choices["report"]
+    report.add_argument("-n", "--size", type=int, default=DEFAULT_EVAL_SIZE)
+    report.add_argument("--fractions", type=_parse_fractions, default=DEFAULT_FRACTIONS,
+                        help="Daftar proporsi term yang dipertahankan, mis. 1,0.5,0.1.")
+    report.add_argument("--workers", type=int, default=1, help="Jumlah proses stemming paralel.")
+    report.add_argument("-o", "--output", help="Simpan laporan sebagai JSON.")
+    export = sub.choices["export"]
+    amount = export.add_mutually_exclusive_group(required=True)
+    amount.add_argument("--fraction", type=float, help="Proporsi term dengan kontribusi terbesar yang dipertahankan.")
+    amount.add_argument("--keep", type=int, help="Jumlah term dengan kontribusi terbesar yang dipertahankan.")
+    amount.add_argument("--min-weight", type=float, help="Buang term dengan |idf x bobot| <= nilai ini.")
+    export.add_argument("--check", type=int, default=DEFAULT_CHECK_SIZE,
+                        help="Jumlah teks acuan untuk memeriksa verdict perform_analysis (0 = lewati).")
+    export.add_argument("-o", "--output", default=DEFAULT_OUTPUT_DIR,
+                        help="Direktori artefak; gunakan model_artifacts agar langsung dipakai app.py.")
+    args = parser.parse_args(argv)
+
+    resources = load_pickle_resources(args.model, args.vectorizer)
+    scorer = resources["scorer"]
+    if scorer is None:
+        print("Model atau vectorizer tidak linear/tidak didukung; pemangkasan memerlukan scorer linear.", file=sys.stderr)
+        return 1
+
+    if args.command == "report":
+        records = _load_labelled(args.data, args.format, args.text_field, args.label_field, args.size, args.seed)
+        with PreprocessPool(args.workers) as pool:
+            cleaned = [(text, label) for text, (_, label) in zip(pool.imap(raw for raw, _ in records), records) if text]
+        cleaned_texts = [text for text, _ in cleaned]
+        labels = [label for _, label in cleaned]
+        full_labels = full_model_labels(resources, cleaned_texts)
+        rows = size_report(scorer, cleaned_texts, labels, full_labels, args.fractions, args.vocab_index)
+        _print_report(rows, args.vectorizer)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({"texts": len(cleaned_texts), "vocab_index": args.vocab_index, "rows": rows}, f, indent=2)
+        return 0
+
+    keep = args.keep
+    if args.fraction is not None:
+        keep = max(1, round(len(scorer.table) * args.fraction))
+    pruned = prune_terms(scorer, keep=keep, min_weight=args.min_weight)
+    if not pruned.table:
+        print("Error: tidak ada term yang tersisa setelah pemangkasan.", file=sys.stderr)
+        return 2
+    output_dir = args.output
+    info = {"pruned_from": len(scorer.table), "pruning": {"keep": keep, "min_weight": args.min_weight}}
+    meta = export_scorer(pruned, output_dir, args.vocab_index, info)
+    print(f"{output_dir}: {meta['n_features']} dari {len(scorer.table)} term "
+          f"({meta['n_features'] / len(scorer.table):.1%}), indeks {args.vocab_index}")
+    if args.check <= 0:
+        return 0
+
+    texts = [text for text, _ in _load_labelled(args.data, args.format, args.text_field, args.label_field,
+                                                args.check, args.seed)]
+    pruned_resources = load_mapped_resources(output_dir, DEFAULT_LEXICON_PATH)
+    check = check_verdicts(resources, pruned_resources, texts)
+    print(f"Verdict berubah: {len(check['changed'])} dari {check['texts']} teks acuan "
+          f"(selisih keyakinan maks. {check['max_confidence_delta']:.4f})")
+    if check["changed"]:
+        print(f"PERINGATAN: verdict berbeda pada teks #{', #'.join(map(str, check['changed'][:10]))}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import lru_cache
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+DEFAULT_MAX_ENTRIES = 20_000
+DEFAULT_TTL_SECONDS = 24 * 3600
+# Batas baris backend sqlite; yang tertua dibuang lebih dulu
+DEFAULT_MAX_DISK_ROWS = 200_000
+# Baris kedaluwarsa (TTL) dihapus dari sqlite setiap sekian put
+DEFAULT_PURGE_EVERY = 100
+SIMHASH_BITS = 64
+# SimHash dibagi menjadi 7 pita; pasangan berjarak Hamming <= 6 pasti berbagi
+# minimal satu pita (pigeonhole), sehingga pita dipakai untuk mencari kandidat.
+SIMHASH_BANDS = 7
+DEFAULT_MAX_DISTANCE = SIMHASH_BANDS - 1
+# Kandidat diverifikasi dengan estimasi Jaccard bottom-k (MinHash) atas token,
+# karena SimHash teks pendek saja dapat mendekatkan teks yang tidak terkait.
+# Di bawah SKETCH_SIZE token unik estimasinya sama dengan Jaccard sebenarnya;
+# 0.9 masih menerima satu-dua kata yang diganti pada teks 20-50 token.
+SKETCH_SIZE = 64
+DEFAULT_MIN_JACCARD = 0.9
+# Bantahan yang mengutip hoaks utuh tetap mirip secara Jaccard (kata "tidak"
+# hilang sebagai stopword), jadi verdict hampir-sama hanya dipakai bila kedua
+# teks memuat penanda bantahan yang sama. Bentuknya hasil stemming
+# run_text_preprocessing ("faktanya" -> "fakta", "dibantah" -> "ban").
+REBUTTAL_MARKERS = frozenset({
+    "hoaks", "hoax", "fakta", "klarifikasi", "ban", "bantah", "bukan", "salah", "keliru",
+    "sesat", "benar", "palsu", "cek", "disinformasi", "misinformasi", "turnbackhoax", "mafindo",
+})
+DEFAULT_NEAR_MIN_TOKENS = 20
+
+URL_RE = re.compile(r'http\S+|www\S+')
+NON_WORD_RE = re.compile(r'[^\w]+')
+
+# =============================================================================
+# 2. NORMALISASI & SIDIK JARI TEKS
+# =============================================================================
+
+# Emoji, tanda baca, URL, kapitalisasi dan spasi tidak mengubah kunci
+def normalize_text(text: str) -> str:
+    text = URL_RE.sub(' ', text.lower())
+    return ' '.join(NON_WORD_RE.sub(' ', text).split())
+
+def content_key(text: str, namespace: str = "") -> str:
+    digest = hashlib.sha256(namespace.encode("utf-8") + b"\0" + normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+@lru_cache(maxsize=200_000)
+def _token_hash(token: str) -> int:
+    # blake2b stabil antar proses (hash() bawaan Python diacak per proses)
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+def simhash(tokens) -> int:
+    weights = [0] * SIMHASH_BITS
+    for token, count in Counter(tokens).items():
+        h = _token_hash(token)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if (h >> bit) & 1 else -count
+    value = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            value |= 1 << bit
+    return value
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def _band_layout():
+    width, extra = divmod(SIMHASH_BITS, SIMHASH_BANDS)
+    layout, shift = [], 0
+    for i in range(SIMHASH_BANDS):
+        bits = width + (1 if i < extra else 0)
+        layout.append((shift, (1 << bits) - 1))
+        shift += bits
+    return layout
+
+BAND_LAYOUT = _band_layout()
+
+def simhash_bands(value: int):
+    return [(value >> shift) & mask for shift, mask in BAND_LAYOUT]
+
+def minhash_sketch(tokens, size: int = SKETCH_SIZE):
+    return tuple(sorted({_token_hash(token) for token in tokens})[:size])
+
+def rebuttal_markers(tokens):
+    return tuple(sorted(REBUTTAL_MARKERS.intersection(tokens)))
+
+def estimate_jaccard(a, b, size: int = SKETCH_SIZE) -> float:
+    union = sorted(set(a) | set(b))[:size]
+    if not union:
+        return 0.0
+    sa, sb = set(a), set(b)
+    return sum(1 for h in union if h in sa and h in sb) / len(union)
+
+def fingerprint_files(paths) -> str:
+    # Namespace cache: verdict lama tidak terpakai lagi setelah model diganti
+    digest = hashlib.sha1()
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        except OSError:
+            digest.update(path.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+# =============================================================================
+# 3. BACKEND DISK (SQLITE, OPSIONAL)
+# =============================================================================
+
+class SqliteBackend:
+    # Jumlah baris dibatasi max_rows (tertua dibuang lebih dulu) dan baris
+    # kedaluwarsa dihapus setiap purge_every put, agar file tidak tumbuh tanpa batas
+    def __init__(self, path: str, max_rows: int = DEFAULT_MAX_DISK_ROWS, purge_every: int = DEFAULT_PURGE_EVERY):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.max_rows = max_rows
+        self.purge_every = purge_every
+        self._puts = 0
+        columns = ", ".join(f"b{i} INTEGER" for i in range(SIMHASH_BANDS))
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, simhash TEXT, sketch TEXT, "
+                f"{columns}, verdict TEXT, created REAL, markers TEXT)"
+            )
+            # File lama (sebelum ada kolom markers) tetap dipakai untuk duplikat persis
+            if "markers" not in {row[1] for row in self._conn.execute("PRAGMA table_info(verdicts)")}:
+                self._conn.execute("ALTER TABLE verdicts ADD COLUMN markers TEXT")
+            for i in range(SIMHASH_BANDS):
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS verdicts_b{i} ON verdicts (b{i})")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS verdicts_created ON verdicts (created)")
+            self._rows = self._count()
+            self._evict()
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    def _evict(self):
+        if self._rows > self.max_rows:
+            self._rows -= self._conn.execute(
+                "DELETE FROM verdicts WHERE key IN (SELECT key FROM verdicts ORDER BY created LIMIT ?)",
+                (self._rows - self.max_rows,),
+            ).rowcount
+
+    def get(self, key: str, min_created: float):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT verdict FROM verdicts WHERE key = ? AND created >= ?", (key, min_created)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def candidates(self, value: int, min_created: float):
+        where = " OR ".join(f"b{i} = ?" for i in range(SIMHASH_BANDS))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT simhash, sketch, markers, verdict FROM verdicts "
+                f"WHERE ({where}) AND simhash IS NOT NULL AND markers IS NOT NULL AND created >= ?",
+                (*simhash_bands(value), min_created),
+            ).fetchall()
+        for stored, sketch, markers, verdict in rows:
+            yield (int(stored, 16), tuple(json.loads(sketch)), tuple(json.loads(markers))), json.loads(verdict)
+
+    def put(self, key: str, fingerprint, verdict: dict, created: float, min_created: float = None):
+        if fingerprint is None:
+            row, markers = (None, None, *([None] * SIMHASH_BANDS)), None
+        else:
+            value, sketch, markers = fingerprint
+            row, markers = (f"{value:016x}", json.dumps(sketch), *simhash_bands(value)), json.dumps(markers)
+        bands = ", ".join(f"b{i}" for i in range(SIMHASH_BANDS))
+        with self._lock, self._conn:
+            exists = self._conn.execute("SELECT 1 FROM verdicts WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO verdicts (key, simhash, sketch, {bands}, verdict, created, markers) "
+                f"VALUES (?, ?, ?, {', '.join('?' * SIMHASH_BANDS)}, ?, ?, ?)",
+                (key, *row, json.dumps(verdict), created, markers),
+            )
+            self._rows += exists is None
+            self._puts += 1
+            if min_created is not None and self._puts % self.purge_every == 0:
+                self._conn.execute("DELETE FROM verdicts WHERE created < ?", (min_created,))
+                # Dihitung ulang karena proses lain dapat berbagi file yang sama
+                self._rows = self._count()
+            self._evict()
+
+    def purge(self, min_created: float) -> int:
+        with self._lock, self._conn:
+            removed = self._conn.execute("DELETE FROM verdicts WHERE created < ?", (min_created,)).rowcount
+            self._rows -= removed
+            return removed
+
+    def count(self) -> int:
+        with self._lock:
+            return self._count()
+
+# =============================================================================
+# 4. CACHE VERDICT
+# =============================================================================
+
+class VerdictCache:
+    # Dua tingkat pencarian: kunci hash teks ternormalisasi (duplikat persis) lalu
+    # indeks SimHash berpita atas hasil run_text_preprocessing (hampir sama),
+    # diverifikasi dengan estimasi Jaccard MinHash. Memori dibatasi dengan
+    # LRU + TTL; backend sqlite opsional untuk persistensi antar restart,
+    # dibatasi max_disk_rows dan TTL yang sama.
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL_SECONDS,
+                 max_distance: int = DEFAULT_MAX_DISTANCE, min_jaccard: float = DEFAULT_MIN_JACCARD,
+                 near_min_tokens: int = DEFAULT_NEAR_MIN_TOKENS, namespace: str = "", path: str = None,
+                 max_disk_rows: int = DEFAULT_MAX_DISK_ROWS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = min(max_distance, DEFAULT_MAX_DISTANCE)
+        self.min_jaccard = min_jaccard
+        self.near_min_tokens = near_min_tokens
+        self.namespace = namespace
+        self.backend = SqliteBackend(path, max_disk_rows) if path else None
+        self._entries = OrderedDict()
+        self._bands = [{} for _ in range(SIMHASH_BANDS)]
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        return content_key(text, self.namespace)
+
+    def fingerprint(self, tokens):
+        if len(tokens) < self.near_min_tokens:
+            return None
+        return simhash(tokens), minhash_sketch(tokens), rebuttal_markers(tokens)
+
+    def _min_created(self, now: float) -> float:
+        return now - self.ttl if self.ttl is not None else 0.0
+
+    def _similarity(self, fingerprint, stored):
+        # Jaccard estimasi bila kandidat lolos saringan SimHash dan penanda
+        # bantahan, selain itu None
+        if fingerprint[2] != stored[2] or hamming_distance(fingerprint[0], stored[0]) > self.max_distance:
+            return None
+        similarity = estimate_jaccard(fingerprint[1], stored[1])
+        return similarity if similarity >= self.min_jaccard else None
+
+    def _remove(self, key: str):
+        _, fingerprint, _ = self._entries.pop(key)
+        if fingerprint is not None:
+            for band, table in zip(simhash_bands(fingerprint[0]), self._bands):
+                keys = table.get(band)
+                if keys:
+                    keys.discard(key)
+                    if not keys:
+                        del table[band]
+
+    def get_exact(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] < self._min_created(now):
+                    self._remove(key)
+                else:
+                    self._entries.move_to_end(key)
+                    self.exact_hits += 1
+                    return entry[2]
+        if self.backend:
+            verdict = self.backend.get(key, self._min_created(now))
+            if verdict is not None:
+                with self._lock:
+                    self.exact_hits += 1
+                return verdict
+        return None
+
+    def get_near(self, fingerprint):
+        if fingerprint is None:
+            return None
+        min_created = self._min_created(time.time())
+        best = None
+        with self._lock:
+            candidates = set()
+            for band, table in zip(simhash_bands(fingerprint[0]), self._bands):
+                candidates.update(table.get(band, ()))
+            for key in candidates:
+                created, stored, verdict = self._entries[key]
+                if created < min_created:
+                    continue
+                similarity = self._similarity(fingerprint, stored)
+                if similarity is not None and (best is None or similarity > best[0]):
+                    best = (similarity, key, verdict)
+            if best is not None:
+                self._entries.move_to_end(best[1])
+                self.near_hits += 1
+                return best[2]
+        if self.backend:
+            for stored, verdict in self.backend.candidates(fingerprint[0], min_created):
+                similarity = self._similarity(fingerprint, stored)
+                if similarity is not None and (best is None or similarity > best[0]):
+                    best = (similarity, None, verdict)
+            if best is not None:
+                with self._lock:
+                    self.near_hits += 1
+                return best[2]
+        return None
+
+    def put(self, key: str, verdict: dict, fingerprint=None):
+        now = time.time()
+        with self._lock:
+            self.misses += 1
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (now, fingerprint, verdict)
+            if fingerprint is not None:
+                for band, table in zip(simhash_bands(fingerprint[0]), self._bands):
+                    table.setdefault(band, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        if self.backend:
+            self.backend.put(key, fingerprint, verdict, now, self._min_created(now))
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.near_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.near_hits) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,411 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+
+from app import MIN_CLEAN_TOKENS, TEXT_TOO_SHORT_ERROR, generate_advanced_insights, load_resources
+from artifacts import DEFAULT_ARTIFACT_DIR, model_path
+from batch import label_for, score_cleaned_texts
+from compiled_scorer import _to_builtin
+from metrics import METRICS
+from preprocess_pool import PreprocessPool, prepare_chunk
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_WORKERS = 4
+MAX_BODY_BYTES = 2 * 1024 * 1024
+MAX_TEXTS_PER_REQUEST = 1000
+
+# =============================================================================
+# 2. PRA-PEMROSESAN DI WORKER POOL
+# =============================================================================
+
+# Pra-pemrosesan memakai PreprocessPool (preprocess_pool.py); hasilnya dikirim
+# dari thread hasil multiprocessing.Pool kembali ke event loop
+def _settle(future, result=None, error=None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+# =============================================================================
+# 3. MICRO-BATCHING DINAMIS
+# =============================================================================
+
+class MicroBatcher:
+    # Mengumpulkan permintaan yang datang bersamaan hingga max_batch_size atau
+    # max_wait berlalu sejak item pertama, lalu menilai semuanya dalam satu panggilan.
+    def __init__(self, score_fn, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait: float = DEFAULT_MAX_WAIT_MS / 1000):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.items = 0
+        self._queue = None
+        self._task = None
+        # Satu thread khusus agar pemanggilan model tidak memblokir event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scorer")
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.score_fn, items)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.items += len(items)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue else 0,
+        }
+
+# =============================================================================
+# 4. LAYANAN INFERENSI
+# =============================================================================
+
+class InferenceService:
+    def __init__(self, resources: dict, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, workers: int = DEFAULT_WORKERS,
+                 pool: str = "process", artifact_dir: str = None):
+        self.resources = resources
+        self.workers = workers
+        self.pool = pool
+        # Artefak mmap dicari di direktori model yang sama dengan app.py (lihat artifacts.model_path)
+        self.artifact_dir = artifact_dir or model_path(DEFAULT_ARTIFACT_DIR)
+        self.batcher = MicroBatcher(
+            lambda cleaned_texts: score_cleaned_texts(cleaned_texts, resources),
+            max_batch_size=max_batch_size,
+            max_wait=max_wait_ms / 1000,
+        )
+        self._executor = None
+
+    def start(self):
+        if self.pool == "process" and self.workers > 1:
+            # Satu teks per tugas: permintaan tunggal tidak menunggu chunk penuh.
+            # PreprocessPool dengan satu worker berjalan di proses ini dan akan
+            # memblokir event loop, jadi kasus itu memakai thread seperti --pool thread.
+            self._executor = PreprocessPool(self.workers, chunk_size=1, artifact_dir=self.artifact_dir).start()
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="preprocess")
+        self.batcher.start()
+
+    async def stop(self):
+        await self.batcher.stop()
+        if isinstance(self._executor, PreprocessPool):
+            # close() menunggu tugas tersisa dan menulis leksikon stem; jangan blok event loop
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.close)
+        elif self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _preprocess(self, text: str):
+        loop = asyncio.get_running_loop()
+        if isinstance(self._executor, PreprocessPool):
+            future = loop.create_future()
+            self._executor.apply_async(
+                [text],
+                callback=lambda results: loop.call_soon_threadsafe(_settle, future, results[0]),
+                error_callback=lambda exc: loop.call_soon_threadsafe(_settle, future, None, exc),
+                with_features=True,
+            )
+            return await future
+        results = await loop.run_in_executor(self._executor, prepare_chunk, [text], self.resources)
+        return results[0]
+
+    async def analyze(self, text: str) -> dict:
+        start_time = time.time()
+        with METRICS.stage("service_preprocess"):
+            raw_analysis, cleaned_text = await self._preprocess(text)
+        if len(cleaned_text.split()) < MIN_CLEAN_TOKENS:
+            METRICS.inc("rejected_too_short_total")
+            return {"error": TEXT_TOO_SHORT_ERROR}
+
+        with METRICS.stage("service_score"):
+            prediction, confidence = await self.batcher.submit(cleaned_text)
+        if METRICS.enabled:
+            METRICS.observe("service_total", time.time() - start_time)
+        result = {
+            "prediction": _to_builtin(prediction),
+            "label": label_for(prediction),
+            "confidence": confidence,
+            "processing_time": time.time() - start_time,
+            "raw_analysis": raw_analysis,
+        }
+        insights = generate_advanced_insights(result)
+        result["insights"] = {
+            category: [{"title": title, "text": text} for title, text in items]
+            for category, items in insights.items()
+        }
+        return result
+
+    async def analyze_many(self, texts):
+        return await asyncio.gather(*(self.analyze(text) for text in texts))
+
+# =============================================================================
+# 5. SERVER HTTP/JSON MINIMAL
+# =============================================================================
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def _validate_text(value):
+    if not isinstance(value, str) or not value.strip():
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Harap kirim teks berita pada field 'text'.")
+    return value
+
+async def route(service: InferenceService, method: str, path: str, body: bytes):
+    if method == "GET" and path == "/health":
+        return HTTPStatus.OK, {"status": "ok"}
+    if method == "GET" and path == "/stats":
+        return HTTPStatus.OK, service.batcher.stats()
+    if method == "GET" and path == "/metrics":
+        # Format teks Prometheus; tahap pra-pemrosesan di pool proses tercatat
+        # di registri masing-masing worker, jadi hanya terlihat dengan --pool thread
+        return HTTPStatus.OK, METRICS.dump()
+    if method != "POST" or path not in ("/analyze", "/analyze/batch"):
+        raise HttpError(HTTPStatus.NOT_FOUND, "Endpoint tidak ditemukan.")
+
+    try:
+        payload = json.loads(body or b"{}")
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Body harus berupa JSON yang valid.") from exc
+    if not isinstance(payload, dict):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Body harus berupa objek JSON.")
+
+    if path == "/analyze":
+        result = await service.analyze(_validate_text(payload.get("text")))
+        status = HTTPStatus.UNPROCESSABLE_ENTITY if "error" in result else HTTPStatus.OK
+        return status, result
+
+    texts = payload.get("texts")
+    if not isinstance(texts, list) or not texts:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Harap kirim daftar teks pada field 'texts'.")
+    if len(texts) > MAX_TEXTS_PER_REQUEST:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Maksimal {MAX_TEXTS_PER_REQUEST} teks per permintaan.")
+    results = await service.analyze_many([_validate_text(text) for text in texts])
+    return HTTPStatus.OK, {"results": results}
+
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode("latin-1").split()
+    except ValueError as exc:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Baris permintaan tidak valid.") from exc
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError as exc:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Header Content-Length tidak valid.") from exc
+    if length < 0:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Header Content-Length tidak valid.")
+    if length > MAX_BODY_BYTES:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body permintaan terlalu besar.")
+    body = await reader.readexactly(length) if length else b""
+    keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+    return method, target.split("?", 1)[0], body, keep_alive
+
+def _write_response(writer, status: HTTPStatus, payload, keep_alive: bool):
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body, content_type = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+def make_handler(service: InferenceService):
+    async def handle(reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, path, body, keep_alive = request
+                    status, payload = await route(service, method, path, body)
+                except HttpError as exc:
+                    status, payload = exc.status, {"error": exc.message}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as exc:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Kesalahan internal: {exc}"}
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+    return handle
+
+# =============================================================================
+# 6. KLIEN DALAM PROSES (UNTUK PENGUJIAN LOKAL)
+# =============================================================================
+
+class ServiceClient:
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+
+    async def request(self, method: str, path: str, payload=None):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nConnection: close\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        data = await reader.readexactly(int(headers.get("content-length") or 0))
+        writer.close()
+        if headers.get("content-type", "").startswith("application/json"):
+            return status, json.loads(data)
+        return status, data.decode("utf-8")
+
+    async def metrics(self):
+        return await self.request("GET", "/metrics")
+
+    async def analyze(self, text: str):
+        return await self.request("POST", "/analyze", {"text": text})
+
+    async def analyze_batch(self, texts):
+        return await self.request("POST", "/analyze/batch", {"texts": texts})
+
+@asynccontextmanager
+async def running_service(resources: dict, host: str = DEFAULT_HOST, port: int = 0, **options):
+    # Menjalankan layanan di event loop yang sedang aktif dan mengembalikan klien;
+    # port 0 memilih port bebas sehingga aman dipakai di skrip uji lokal.
+    service = InferenceService(resources, **options)
+    service.start()
+    server = await asyncio.start_server(make_handler(service), host, port)
+    try:
+        bound_port = server.sockets[0].getsockname()[1]
+        yield ServiceClient(host, bound_port)
+    finally:
+        server.close()
+        await server.wait_closed()
+        await service.stop()
+
+# =============================================================================
+# 7. EKSEKUSI CLI
+# =============================================================================
+
+async def serve(resources: dict, host: str, port: int, **options):
+    service = InferenceService(resources, **options)
+    service.start()
+    server = await asyncio.start_server(make_handler(service), host, port)
+    print(f"Layanan deteksi hoax berjalan di http://{host}:{port}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan HTTP/JSON deteksi berita hoax dengan micro-batching.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Jumlah worker pra-pemrosesan.")
+    parser.add_argument("--pool", choices=("process", "thread"), default="process")
+    parser.add_argument("--artifact-dir", default=None,
+                        help="Default: model_artifacts di direktori model (lihat artifacts.model_path).")
+    args = parser.parse_args(argv)
+
+    resources = load_resources()
+    if not resources:
+        print("Error: Pastikan file model 'svm_model.pkl' dan 'tfidf_vectorizer.pkl' ada di direktori yang sama.", file=sys.stderr)
+        return 1
+    try:
+        asyncio.run(serve(
+            resources, args.host, args.port,
+            max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+            workers=args.workers, pool=args.pool, artifact_dir=args.artifact_dir,
+        ))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
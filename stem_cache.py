@@ -0,0 +1,259 @@
+import argparse
+import atexit
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows: append tetap jalan, tanpa kunci antarproses
+    fcntl = None
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+DEFAULT_LEXICON_PATH = "stem_lexicon.tsv"
+DEFAULT_CACHE_SIZE = 50_000
+DEFAULT_AUTOSAVE_EVERY = 500
+
+# =============================================================================
+# 2. LEKSIKON STEM DI DISK
+# =============================================================================
+
+# Format leksikon: satu pasangan "kata<TAB>stem" per baris. Format ini bisa
+# ditambah (append) tanpa menulis ulang file saat kosakata baru teramati.
+def _parse_lines(f, lexicon: dict, offset: int) -> int:
+    # Hanya baris lengkap yang dibaca; offset (byte) menunjuk akhir baris terakhir
+    for line in f:
+        if not line.endswith(b"\n"):
+            break
+        offset += len(line)
+        word, sep, stem = line.decode("utf-8").rstrip("\r\n").partition("\t")
+        if sep and word:
+            lexicon[word] = stem
+    return offset
+
+def read_lexicon(path: str, lexicon: dict, offset: int = 0) -> int:
+    if not os.path.exists(path):
+        return offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return _parse_lines(f, lexicon, offset)
+
+def load_lexicon(path: str) -> dict:
+    lexicon = {}
+    read_lexicon(path, lexicon)
+    return lexicon
+
+# Entri yang sudah ditulis proses lain sejak offset dibaca dulu (di bawah kunci
+# file) dan dilewati; sisanya ditulis dalam satu write agar baris tidak terpotong.
+# Mengembalikan (jumlah entri yang ditulis, offset baru, entri dari proses lain).
+def append_lexicon(path: str, entries, offset: int = 0):
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(offset)
+            others = {}
+            _parse_lines(f, others, offset)
+            fresh = {}
+            for word, stem in entries:
+                if word not in others:
+                    fresh[word] = stem
+            data = "".join(f"{word}\t{stem}\n" for word, stem in fresh.items()).encode("utf-8")
+            f.seek(0, os.SEEK_END)
+            f.write(data)
+            f.flush()
+            return len(fresh), f.tell(), others
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+# =============================================================================
+# 3. STEMMER DENGAN CACHE BERLAPIS
+# =============================================================================
+
+def sastrawi_words() -> list:
+    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+    factory = StemmerFactory()
+    words = factory.get_words() if hasattr(factory, "get_words") else factory.get_words_from_file()
+    return sorted({w.strip() for w in words if w.strip()})
+
+def create_stemmer(dictionary=None):
+    # Stemmer Sastrawi mentah. StemmerFactory().create_stemmer() sudah dibungkus
+    # ArrayCache Sastrawi yang tidak terbatas, sehingga LRU CachedStemmer tidak
+    # lagi membatasi memori dan hitungan miss-nya tidak mencerminkan stemming nyata.
+    from Sastrawi.Dictionary.ArrayDictionary import ArrayDictionary
+    from Sastrawi.Stemmer.Stemmer import Stemmer
+    return Stemmer(dictionary if dictionary is not None else ArrayDictionary(sastrawi_words()))
+
+class CachedStemmer:
+    # Pembungkus stemmer Sastrawi dengan antarmuka yang sama (.stem(word)).
+    # Urutan pencarian: leksikon dari disk -> cache LRU terbatas -> stemmer asli.
+    # Dengan lexicon_path, kata baru langsung masuk leksikon (bukan LRU) dan
+    # ditambahkan ke file, sehingga setiap kata ditulis sekali dan tetap
+    # terpakai setelah restart; LRU hanya membatasi memori tanpa file leksikon.
+    def __init__(self, stemmer, lexicon_path: str = None, max_size: int = DEFAULT_CACHE_SIZE,
+                 autosave_every: int = DEFAULT_AUTOSAVE_EVERY):
+        self.stemmer = stemmer
+        self.lexicon_path = lexicon_path
+        self.max_size = max_size
+        self.autosave_every = autosave_every
+        self.lexicon = {}
+        self._offset = read_lexicon(lexicon_path, self.lexicon) if lexicon_path else 0
+        self._lru = OrderedDict()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.lexicon_hits = 0
+        self.cache_hits = 0
+        self.misses = 0
+        if lexicon_path:
+            atexit.register(self.flush)
+
+    def stem(self, word: str) -> str:
+        stem = self.lexicon.get(word)
+        if stem is not None:
+            self.lexicon_hits += 1
+            return stem
+
+        with self._lock:
+            stem = self._lru.get(word)
+            if stem is not None:
+                self._lru.move_to_end(word)
+                self.cache_hits += 1
+                return stem
+
+        stem = self.stemmer.stem(word)
+
+        with self._lock:
+            self.misses += 1
+            if self.lexicon_path:
+                self.lexicon[word] = stem
+                self._pending.append((word, stem))
+                should_flush = self.autosave_every is not None and len(self._pending) >= self.autosave_every
+            else:
+                self._lru[word] = stem
+                if len(self._lru) > self.max_size:
+                    self._lru.popitem(last=False)
+                should_flush = False
+        if should_flush:
+            self.flush()
+        return stem
+
+    # Kata baru yang belum ditulis, untuk pemanggil yang menulis leksikon
+    # sendiri (worker preprocess_pool.py dengan autosave_every=None)
+    def take_pending(self) -> list:
+        with self._lock:
+            entries, self._pending = self._pending, []
+        return entries
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            entries = self.take_pending()
+            if not entries or not self.lexicon_path:
+                return 0
+            written, self._offset, others = append_lexicon(self.lexicon_path, entries, self._offset)
+        # Stem yang ditambahkan proses lain ikut terpakai tanpa restart
+        self.lexicon.update(others)
+        return written
+
+    def stats(self) -> dict:
+        lookups = self.lexicon_hits + self.cache_hits + self.misses
+        return {
+            "lexicon_size": len(self.lexicon),
+            "cache_size": len(self._lru),
+            "lexicon_hits": self.lexicon_hits,
+            "cache_hits": self.cache_hits,
+            "misses": self.misses,
+            "hit_rate": (self.lexicon_hits + self.cache_hits) / lookups if lookups else 0.0,
+        }
+
+# =============================================================================
+# 4. PEMBANGUNAN LEKSIKON SECARA OFFLINE
+# =============================================================================
+
+def iter_corpus_words(paths, stopwords):
+    # Tokenisasi yang sama dengan run_text_preprocessing sebelum tahap stemming
+    from app import run_text_preprocessing
+
+    class _Identity:
+        def stem(self, word):
+            return word
+
+    identity = _Identity()
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                yield from run_text_preprocessing(line, identity, stopwords).split()
+
+def build_lexicon(stemmer, vectorizer=None, corpus_paths=(), stopwords=frozenset(), existing=None) -> dict:
+    lexicon = dict(existing or {})
+    # Kosakata TF-IDF berisi kata hasil stem; memetakannya ke dirinya sendiri
+    # (melalui stemmer) menutup kata dasar yang paling sering muncul. Vectorizer
+    # hashing (train.py --method hashing-sgd) tidak memiliki kosakata.
+    words = list(getattr(vectorizer, "vocabulary_", None) or [])
+    for word in words:
+        if word not in lexicon:
+            lexicon[word] = stemmer.stem(word)
+    for word in iter_corpus_words(corpus_paths, stopwords):
+        if word not in lexicon:
+            lexicon[word] = stemmer.stem(word)
+    return lexicon
+
+def write_lexicon(path: str, lexicon: dict) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for word in sorted(lexicon):
+            f.write(f"{word}\t{lexicon[word]}\n")
+    os.replace(tmp_path, path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bangun atau periksa leksikon stem untuk run_text_preprocessing.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Bangun leksikon dari kosakata vectorizer dan korpus teks.")
+    build.add_argument("-o", "--output", default=None,
+                       help="Default: stem_lexicon.tsv di direktori model (lihat artifacts.model_path).")
+    build.add_argument("--vectorizer", default=None,
+                       help="Default: tfidf_vectorizer.pkl di direktori model.")
+    build.add_argument("--corpus", nargs="*", default=[], help="File teks (satu dokumen per baris).")
+
+    stats = sub.add_parser("stats", help="Tampilkan ukuran leksikon.")
+    stats.add_argument("path", nargs="?", default=None)
+
+    args = parser.parse_args(argv)
+
+    # Impor lokal: artifacts.py mengimpor modul ini
+    from artifacts import DEFAULT_VECTORIZER_PATH, model_path
+
+    if args.command == "stats":
+        args.path = args.path or model_path(DEFAULT_LEXICON_PATH)
+    else:
+        args.output = args.output or model_path(DEFAULT_LEXICON_PATH)
+        if args.vectorizer is None:
+            args.vectorizer = model_path(DEFAULT_VECTORIZER_PATH)
+
+    if args.command == "stats":
+        print(f"{args.path}: {len(load_lexicon(args.path))} entri")
+        return 0
+
+    import joblib
+    from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+
+    stemmer = create_stemmer()
+    stopwords = set(StopWordRemoverFactory().get_stop_words())
+    vectorizer = joblib.load(args.vectorizer) if args.vectorizer else None
+    if vectorizer is not None and not hasattr(vectorizer, "vocabulary_"):
+        print(f"{args.vectorizer} tidak memiliki kosakata (vectorizer hashing); hanya korpus yang dipakai.",
+              file=sys.stderr)
+    existing = load_lexicon(args.output)
+    lexicon = build_lexicon(stemmer, vectorizer, args.corpus, stopwords, existing)
+    write_lexicon(args.output, lexicon)
+    print(f"{args.output}: {len(lexicon)} entri ({len(lexicon) - len(existing)} baru)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+import argparse
+import hashlib
+import json
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
+
+from app import (
+    MIN_CLEAN_TOKENS,
+    TEXT_TOO_SHORT_ERROR,
+    _perform_analysis,
+    clean_text,
+    filter_stopwords,
+    load_resources,
+    stem_tokens,
+)
+from compiled_scorer import _to_builtin
+from explain import explain_row
+from features import FeatureScanner, split_complete
+from metrics import METRICS
+from result_cache import NON_WORD_RE, URL_RE
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+# Ukuran potongan yang dibaca per langkah; memori puncak analisis sebanding
+# dengan nilai ini (dan jumlah term berbeda), bukan dengan panjang dokumen
+DEFAULT_CHUNK_CHARS = 1 << 16
+# Selisih probabilitas yang masih dianggap sama saat verifikasi (urutan
+# penjumlahan float dapat berbeda dari vectorizer.transform)
+CONFIDENCE_TOLERANCE = 1e-9
+DEFAULT_MEMORY_SIZES = (100_000, 1_000_000, 10_000_000)
+
+def iter_chunks(source, chunk_chars: int = DEFAULT_CHUNK_CHARS):
+    # source: str, objek file teks, atau iterable potongan str
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_chars):
+            yield source[start:start + chunk_chars]
+    elif hasattr(source, "read"):
+        for piece in iter(lambda: source.read(chunk_chars), ""):
+            yield piece
+    else:
+        yield from source
+
+# =============================================================================
+# 2. BARIS TF-IDF DARI FREKUENSI TERM
+# =============================================================================
+
+def supports_streaming(resources: dict) -> bool:
+    # Frekuensi per potongan hanya identik dengan analisis utuh untuk unigram
+    if resources.get("scorer") is not None:
+        return True
+    vectorizer = resources.get("vectorizer")
+    return (
+        vectorizer is not None
+        and getattr(vectorizer, "analyzer", None) == "word"
+        and tuple(getattr(vectorizer, "ngram_range", (1, 1))) == (1, 1)
+    )
+
+def _hashed_index(term: str, n_features: int, alternate_sign: bool):
+    # Sama dengan FeatureHasher/HashingVectorizer sklearn (murmurhash3 seed 0)
+    h = murmurhash3_32(term, seed=0)
+    if h == -2147483648:
+        index = (2147483647 - (n_features - 1)) % n_features
+    else:
+        index = abs(h) % n_features
+    return index, (-1 if alternate_sign and h < 0 else 1)
+
+def vectorize_counts(counts, vectorizer):
+    # Satu baris CSR identik dengan vectorizer.transform([teks]) dari term -> frekuensi
+    if hasattr(vectorizer, "vocabulary_"):
+        vocabulary = vectorizer.vocabulary_
+        n_features = len(vocabulary)
+        entries = {vocabulary[term]: tf for term, tf in counts.items() if term in vocabulary}
+    else:
+        n_features = vectorizer.n_features
+        entries = Counter()
+        for term, tf in counts.items():
+            index, sign = _hashed_index(term, n_features, vectorizer.alternate_sign)
+            entries[index] += sign * tf
+
+    indices = np.array(sorted(entries), dtype=np.int32)
+    data = np.array([entries[index] for index in indices], dtype=np.float64)
+    if vectorizer.binary:
+        data = np.ones_like(data)
+    if getattr(vectorizer, "sublinear_tf", False):
+        data = np.log(data) + 1
+    if getattr(vectorizer, "use_idf", False):
+        data = data * vectorizer.idf_[indices]
+    row = sparse.csr_matrix((data, indices, [0, len(indices)]), shape=(1, n_features), dtype=vectorizer.dtype)
+    if vectorizer.norm:
+        row = normalize(row, norm=vectorizer.norm, copy=False)
+    return row
+
+# =============================================================================
+# 3. ANALISIS BERTAHAP
+# =============================================================================
+
+class StreamingAnalysis:
+    # Padanan perform_analysis untuk dokumen yang datang per potongan. Setiap
+    # chunk berspasi lengkap dibersihkan, disaring, di-stem dan dihitung
+    # frekuensi term-nya, lalu dibuang; yang disimpan hanya penghitung fitur
+    # mentah, frekuensi term yang dikenal model dan hash kunci cache.
+    # Pencarian hampir-duplikat tidak dilakukan karena butuh seluruh token.
+    def __init__(self, resources: dict):
+        if not supports_streaming(resources):
+            raise ValueError("Analisis bertahap hanya mendukung vectorizer unigram.")
+        self.resources = resources
+        self.scanner = FeatureScanner()
+        self.counts = Counter()
+        self.token_count = 0
+        self._carry = ""
+        self._key_started = False
+        self._started = time.time()
+
+        scorer = resources.get("scorer")
+        if scorer is not None:
+            self._terms = scorer.tokenize
+            self._known = lambda term: scorer.table.get(term) is not None
+        else:
+            vectorizer = resources["vectorizer"]
+            self._terms = vectorizer.build_analyzer()
+            vocabulary = getattr(vectorizer, "vocabulary_", None)
+            self._known = (lambda term: term in vocabulary) if vocabulary is not None else (lambda term: True)
+
+        result_cache = resources.get("result_cache")
+        self._key_digest = None
+        if result_cache is not None:
+            # Kunci yang sama dengan result_cache.content_key atas teks utuh
+            self._key_digest = hashlib.sha256(result_cache.namespace.encode("utf-8") + b"\0")
+
+    def feed(self, piece: str):
+        self.scanner.feed(piece)
+        complete, self._carry = split_complete(self._carry + piece)
+        if complete:
+            self._consume(complete)
+        return self
+
+    def _consume(self, text: str):
+        if self._key_digest is not None:
+            normalized = " ".join(NON_WORD_RE.sub(" ", URL_RE.sub(" ", text.lower())).split())
+            if normalized:
+                self._key_digest.update(((" " if self._key_started else "") + normalized).encode("utf-8"))
+                self._key_started = True
+
+        tokens = filter_stopwords(clean_text(text), self.resources["stopwords"])
+        cleaned_text = " ".join(stem_tokens(tokens, self.resources["stemmer"]))
+        self.token_count += len(cleaned_text.split())
+        known = self._known
+        for term in self._terms(cleaned_text):
+            if known(term):
+                self.counts[term] += 1
+
+    def result(self) -> dict:
+        if self._carry:
+            self._consume(self._carry)
+            self._carry = ""
+        raw_analysis = self.scanner.result()
+        resources = self.resources
+        result_cache = resources.get("result_cache")
+
+        with METRICS.stage("cache_lookup"):
+            cache_key = self._key_digest.hexdigest() if self._key_digest is not None else None
+            verdict = result_cache.get_exact(cache_key) if result_cache is not None else None
+        cache_status = "exact" if verdict is not None else "fresh"
+
+        if verdict is None:
+            if self.token_count < MIN_CLEAN_TOKENS:
+                METRICS.inc("rejected_too_short_total")
+                return {"error": TEXT_TOO_SHORT_ERROR}
+
+            if resources.get("scorer") is not None:
+                with METRICS.stage("compiled_score"):
+                    prediction, probability = resources["scorer"].score_counts(self.counts)
+                with METRICS.stage("explain"):
+                    explanation = resources["scorer"].explain_counts(self.counts)
+            else:
+                with METRICS.stage("vectorize"):
+                    vectorized_text = vectorize_counts(self.counts, resources["vectorizer"])
+                with METRICS.stage("predict"):
+                    prediction = resources["model"].predict(vectorized_text)[0]
+                with METRICS.stage("predict_proba"):
+                    probability = resources["model"].predict_proba(vectorized_text)[0]
+                with METRICS.stage("explain"):
+                    explanation = explain_row(vectorized_text, resources["vectorizer"], resources["model"])
+            verdict = {
+                "prediction": _to_builtin(prediction),
+                "confidence": float(max(probability)),
+                "explanation": explanation,
+            }
+            if result_cache is not None:
+                result_cache.put(cache_key, verdict)
+
+        return {
+            "prediction": verdict["prediction"],
+            "confidence": verdict["confidence"],
+            "processing_time": time.time() - self._started,
+            "raw_analysis": raw_analysis,
+            "explanation": verdict.get("explanation"),
+            "cache": cache_status,
+        }
+
+def analyze_stream(source, resources: dict, chunk_chars: int = DEFAULT_CHUNK_CHARS) -> dict:
+    analysis = StreamingAnalysis(resources)
+    for piece in iter_chunks(source, chunk_chars):
+        analysis.feed(piece)
+    return analysis.result()
+
+# =============================================================================
+# 4. VERIFIKASI & PROFIL MEMORI
+# =============================================================================
+
+def compare_results(streamed: dict, in_memory: dict) -> list:
+    # Daftar perbedaan; kosong bila kedua jalur memberi hasil yang sama
+    if "error" in streamed or "error" in in_memory:
+        return [] if streamed.get("error") == in_memory.get("error") else ["error"]
+    problems = []
+    if streamed["prediction"] != in_memory["prediction"]:
+        problems.append("prediction")
+    if abs(streamed["confidence"] - in_memory["confidence"]) > CONFIDENCE_TOLERANCE:
+        problems.append("confidence")
+    raw_streamed, raw_memory = streamed["raw_analysis"], in_memory["raw_analysis"]
+    problems.extend(f"raw_analysis.{name}" for name in raw_memory if raw_streamed.get(name) != raw_memory[name])
+    return problems
+
+def verify_streaming(text: str, resources: dict, chunk_chars: int = DEFAULT_CHUNK_CHARS) -> list:
+    # Cache dimatikan agar kedua jalur benar-benar menghitung ulang verdict
+    resources = dict(resources, result_cache=None)
+    return compare_results(analyze_stream(text, resources, chunk_chars), _perform_analysis(text, resources))
+
+def synthetic_document(size: int, seed: int):
+    # Dokumen panjang dari korpus bench.py, dihasilkan per potongan tanpa
+    # pernah menyatukan seluruh teks
+    from bench import generate_corpus
+
+    produced, records = 0, generate_corpus(1 << 30, seed)
+    while produced < size:
+        piece = next(records)["text"][:size - produced] + "\n\n"
+        produced += len(piece)
+        yield piece
+
+def _peak_memory(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        return result, tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+def memory_profile(resources: dict, sizes=DEFAULT_MEMORY_SIZES, seed: int = 0,
+                   chunk_chars: int = DEFAULT_CHUNK_CHARS) -> list:
+    resources = dict(resources, result_cache=None)
+    rows = []
+    for size in sizes:
+        streamed, stream_mb = _peak_memory(
+            lambda size=size: analyze_stream(synthetic_document(size, seed), resources, chunk_chars))
+        text = "".join(synthetic_document(size, seed))
+        in_memory, memory_mb = _peak_memory(lambda text=text: _perform_analysis(text, resources))
+        rows.append({
+            "chars": len(text),
+            "streaming_peak_mb": stream_mb,
+            "in_memory_peak_mb": memory_mb,
+            "matches": not compare_results(streamed, in_memory),
+        })
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analisis bertahap untuk dokumen sangat panjang.")
+    parser.add_argument("input", nargs="?", help="File teks yang dianalisis ('-' untuk stdin).")
+    parser.add_argument("--chunk-chars", type=int, default=DEFAULT_CHUNK_CHARS)
+    parser.add_argument("--verify", action="store_true",
+                        help="Bandingkan dengan analisis utuh di memori (memuat seluruh file).")
+    parser.add_argument("--memory", action="store_true",
+                        help="Ukur memori puncak kedua jalur pada dokumen sintetis berbagai ukuran.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_MEMORY_SIZES)),
+                        help="Ukuran dokumen sintetis (karakter) untuk --memory.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.chunk_chars < 1:
+        print("Error: --chunk-chars harus >= 1.", file=sys.stderr)
+        return 2
+    if not args.input and not args.memory:
+        parser.error("berikan file input atau --memory")
+
+    resources = load_resources()
+    if not resources:
+        print("Error: Pastikan file model 'svm_model.pkl' dan 'tfidf_vectorizer.pkl' ada di direktori yang sama.", file=sys.stderr)
+        return 1
+    if not supports_streaming(resources):
+        print("Error: model ini tidak mendukung analisis bertahap (hanya vectorizer unigram).", file=sys.stderr)
+        return 1
+
+    status = 0
+    if args.memory:
+        sizes = [int(part) for part in args.sizes.split(",") if part.strip()]
+        print(f"{'karakter':>12}{'bertahap (MB)':>15}{'utuh (MB)':>12}")
+        for row in memory_profile(resources, sizes, args.seed, args.chunk_chars):
+            print(f"{row['chars']:>12}{row['streaming_peak_mb']:>15.1f}{row['in_memory_peak_mb']:>12.1f}"
+                  f"{'' if row['matches'] else '  BERBEDA'}")
+            status = status or (0 if row["matches"] else 1)
+
+    if args.input:
+        stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        try:
+            if args.verify:
+                text = stream.read()
+                problems = verify_streaming(text, resources, args.chunk_chars)
+                print("Hasil bertahap identik dengan analisis utuh." if not problems
+                      else "Berbeda pada: " + ", ".join(problems))
+                status = status or (1 if problems else 0)
+                result = analyze_stream(text, resources, args.chunk_chars)
+            else:
+                result = analyze_stream(stream, resources, args.chunk_chars)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import os
+import warnings
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("sklearn")
+pytest.importorskip("Sastrawi")
+
+import app
+from artifacts import load_pickle_resources
+from metrics import METRICS
+from result_cache import VerdictCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEXT = ("Pemerintah resmi mengumumkan kebijakan baru tentang subsidi energi "
+        "yang mulai berlaku bulan depan menurut keterangan kementerian terkait.")
+
+@pytest.fixture(scope="module")
+def resources():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        resources = load_pickle_resources(os.path.join(ROOT, "svm_model.pkl"),
+                                          os.path.join(ROOT, "tfidf_vectorizer.pkl"))
+    return dict(resources, result_cache=None)
+
+def test_repeat_submit_uses_result_cache(resources):
+    # Submit ulang teks yang sama memakai verdict dari cache hasil, dengan
+    # waktu analisis dan counter METRICS milik permintaan itu sendiri
+    METRICS.reset()
+    with METRICS.enabled_for():
+        cached = dict(resources, result_cache=VerdictCache())
+        first = app.perform_analysis(TEXT, cached)
+        second = app.perform_analysis(TEXT, cached)
+        counters = METRICS.snapshot()["counters"]
+    assert first["cache"] == "fresh"
+    assert second["cache"] == "exact"
+    assert (second["prediction"], second["confidence"]) == (first["prediction"], first["confidence"])
+    assert counters["analyses_total{outcome=fresh}"] == 1
+    assert counters["analyses_total{outcome=exact}"] == 1
+
+def test_result_view_is_built_once_per_result(resources):
+    # Kartu dan gauge disimpan di session_state; rerun hanya mengirim ulang isinya
+    view = app.build_result_view(app.perform_analysis(TEXT, resources))
+    assert view["header"].endswith("</div>") and "Terindikasi" in view["header"]
+    assert view["gauge"].data[0].type == "indicator"
+    assert view["insights"]
+
+def test_rejected_text_counts_in_metrics_dump(resources):
+    # Teks terlalu singkat menaikkan analyses_total{rejected} dan
+    # rejected_too_short_total bersamaan, juga saat dikirim ulang
+    METRICS.reset()
+    with METRICS.enabled_for():
+        cached = dict(resources, result_cache=VerdictCache())
+        for _ in range(2):
+            assert app.perform_analysis("halo dunia", cached) == {"error": app.TEXT_TOO_SHORT_ERROR}
+        app.perform_analysis(TEXT, cached)
+        lines = METRICS.dump().splitlines()
+    assert "# TYPE hoax_analyses_total counter" in lines
+    assert 'hoax_analyses_total{outcome="rejected"} 2' in lines
+    assert 'hoax_analyses_total{outcome="fresh"} 1' in lines
+    assert "# TYPE hoax_rejected_too_short_total counter" in lines
+    assert "hoax_rejected_too_short_total 2" in lines
+    assert 'hoax_stage_seconds_count{stage="total"} 3' in lines
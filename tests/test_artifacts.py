@@ -0,0 +1,22 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from artifacts import MappedPerfectTable, MappedStringTable, write_perfect_table, write_string_table
+
+def test_string_table_lookup(tmp_path):
+    prefix = str(tmp_path / "kata_dasar")
+    write_string_table(prefix, ["makan", "minum", "tidur"])
+    table = MappedStringTable(prefix)
+    assert table.contains("minum")
+    assert not table.contains("berlari")
+    # Sastrawi memanggil dictionary.contains(None) saat disambiguasi awalan gagal
+    assert not table.contains(None)
+
+def test_perfect_table_lookup(tmp_path):
+    prefix = str(tmp_path / "vocab")
+    write_perfect_table(prefix, ["makan", "minum", "tidur"])
+    table = MappedPerfectTable(prefix)
+    assert table.contains("tidur")
+    assert not table.contains("berlari")
+    assert not table.contains(None)
@@ -0,0 +1,84 @@
+import os
+import random
+import subprocess
+import sys
+import warnings
+
+import pytest
+
+pytest.importorskip("sklearn")
+joblib = pytest.importorskip("joblib")
+np = pytest.importorskip("numpy")
+
+from artifacts import MappedStringTable, MappedTermTable, write_scorer_tables
+from bench import generate_corpus
+from compiled_scorer import LinearScorer, compile_scorer, load_scorer, verify_scorer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(ROOT, "svm_model.pkl")
+VECTORIZER_PATH = os.path.join(ROOT, "tfidf_vectorizer.pkl")
+# Selisih terukur pada model bawaan ~1.5e-14; batas ini masih jauh di bawah
+# DEFAULT_TOLERANCE CLI namun menangkap kesalahan kalibrasi/normalisasi
+MAX_ABS_DIFF = 1e-12
+
+@pytest.fixture(scope="module")
+def model_and_vectorizer():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return joblib.load(MODEL_PATH), joblib.load(VECTORIZER_PATH)
+
+def _reference_texts(vectorizer):
+    rng = random.Random(42)
+    vocab = list(vectorizer.vocabulary_)
+    texts = [" ".join(rng.choices(vocab, k=rng.randint(1, 300))) for _ in range(300)]
+    texts += [record["text"] for record in generate_corpus(200, seed=5)]
+    return texts + ["", "kata-tak-dikenal sama sekali"]
+
+def test_compiled_scorer_matches_sklearn(model_and_vectorizer):
+    model, vectorizer = model_and_vectorizer
+    scorer = compile_scorer(model, vectorizer)
+    assert scorer is not None
+    report = verify_scorer(scorer, model, vectorizer, _reference_texts(vectorizer))
+    assert report["label_disagreements"] == 0
+    assert report["max_abs_diff"] < MAX_ABS_DIFF
+
+def test_cli_export_is_loadable(model_and_vectorizer, tmp_path):
+    # Dump dari __main__ (CLI) harus tetap dapat dimuat lewat modul
+    output = tmp_path / "scorer.pkl"
+    subprocess.run([sys.executable, "compiled_scorer.py", "export", "--model", MODEL_PATH,
+                    "--vectorizer", VECTORIZER_PATH, "-o", str(output)], cwd=ROOT, check=True)
+    model, vectorizer = model_and_vectorizer
+    loaded = load_scorer(str(output))
+    expected = compile_scorer(model, vectorizer)
+    for text in _reference_texts(vectorizer)[:50]:
+        assert loaded.score(text) == expected.score(text)
+
+def test_calibrated_linear_svc_matches_sklearn(model_and_vectorizer):
+    # Jalur tfidf-svm train.py: LinearSVC + CalibratedClassifierCV(sigmoid, ensemble=False)
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.svm import LinearSVC
+
+    _, vectorizer = model_and_vectorizer
+    texts = _reference_texts(vectorizer)[:300]
+    labels = [i % 2 for i in range(len(texts))]
+    model = CalibratedClassifierCV(LinearSVC(random_state=0), method="sigmoid", cv=3, ensemble=False)
+    model.fit(vectorizer.transform(texts), labels)
+    scorer = compile_scorer(model, vectorizer)
+    assert scorer is not None and scorer.calibration == "sigmoid"
+    report = verify_scorer(scorer, model, vectorizer, _reference_texts(vectorizer))
+    assert report["label_disagreements"] == 0
+    assert report["max_abs_diff"] < MAX_ABS_DIFF
+
+@pytest.mark.parametrize("variant", [{}, {"sublinear_tf": True}, {"binary": True, "norm": "l1"}, {"norm": None}])
+def test_score_many_is_identical_to_score(model_and_vectorizer, tmp_path, variant):
+    # Jalur chunk batch.py (dict maupun tabel mmap) harus sama persis, bukan sekadar mendekati
+    model, vectorizer = model_and_vectorizer
+    compiled = compile_scorer(model, vectorizer)
+    write_scorer_tables(compiled, str(tmp_path))
+    mapped = MappedTermTable(MappedStringTable(str(tmp_path / "vocab")),
+                             np.load(tmp_path / "idf.npy", mmap_mode="r"), np.load(tmp_path / "coef.npy", mmap_mode="r"))
+    texts = _reference_texts(vectorizer)
+    for table in (compiled.table, mapped):
+        state = dict(compiled.to_dict(), table=table, **variant)
+        scorer = LinearScorer.from_dict(state)
+        assert scorer.score_many(texts) == [scorer.score(text) for text in texts]
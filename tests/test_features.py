@@ -0,0 +1,25 @@
+import random
+
+from features import VERIFY_SAMPLES, verify
+
+# Potongan yang menyentuh setiap pola: batas kata, frasa multi-kata, tanggal, huruf besar
+FRAGMENTS = (
+    "jangan", "kaget", "jangan kaget", "wajib tahu", "ternyata", "TERNYATA", "tak disangka",
+    "saya", "Kami", "penulis", "menurut", "sumber", "sebarkan", "share", "viral", "HEBOH",
+    "presiden", "BI", "bi", "12 Mei 2024", "1999", "2024a", "_2024", "12345", "Xbegini",
+    "!", "?", "...", ".", ",", " ", "  ", "\n", "\t", "'", '"', "-", "é", "ABC",
+    # Huruf non-ASCII yang oleh re.IGNORECASE disamakan dengan huruf ASCII
+    "\u0130", "\u0131", "\u017f", "\u212a", "ta\u212a di\u017fangka", "wajıb tahu",
+)
+
+def _random_texts(count: int, seed: int):
+    rng = random.Random(seed)
+    for _ in range(count):
+        parts = rng.choices(FRAGMENTS, k=rng.randint(0, 40))
+        yield "".join(part + rng.choice(("", " ", " ", "\n", ".")) for part in parts)
+
+def test_reference_samples_match():
+    assert verify(VERIFY_SAMPLES) == 0
+
+def test_random_texts_match():
+    assert verify(_random_texts(5000, seed=3)) == 0
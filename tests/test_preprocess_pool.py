@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("Sastrawi")
+
+from bench import generate_corpus
+from preprocess_pool import PreprocessPool
+from stem_cache import load_lexicon
+
+def test_workers_share_one_deduplicated_lexicon(tmp_path):
+    # Worker yang mempelajari kata yang sama tidak menggandakan baris leksikon
+    path = str(tmp_path / "stem_lexicon.tsv")
+    texts = [record["text"] for record in generate_corpus(64, 3)]
+    with PreprocessPool(workers=2, chunk_size=4, lexicon_path=path) as pool:
+        cleaned = pool.map(texts)
+    with open(path, encoding="utf-8") as f:
+        words = [line.split("\t")[0] for line in f]
+    assert words and len(words) == len(set(words))
+    assert set(" ".join(cleaned).split()) <= set(load_lexicon(path).values())
+
+    # Menjalankan ulang dengan leksikon yang sama tidak menambah baris
+    with PreprocessPool(workers=2, chunk_size=4, lexicon_path=path) as pool:
+        assert pool.map(texts) == cleaned
+    with open(path, encoding="utf-8") as f:
+        assert sum(1 for _ in f) == len(words)
@@ -0,0 +1,65 @@
+import result_cache
+from result_cache import SqliteBackend, VerdictCache
+
+def _verdict(i):
+    return {"prediction": i % 2, "confidence": 0.9}
+
+def test_sqlite_backend_evicts_oldest_rows(tmp_path):
+    backend = SqliteBackend(str(tmp_path / "cache.sqlite"), max_rows=5)
+    for i in range(12):
+        backend.put(f"k{i}", None, _verdict(i), created=float(i))
+        assert backend.count() <= 5
+    assert [backend.get(f"k{i}", 0.0) is not None for i in range(12)] == [False] * 7 + [True] * 5
+    # Menimpa kunci yang ada tidak menambah baris
+    backend.put("k11", None, _verdict(0), created=20.0)
+    assert backend.count() == 5
+    assert backend.get("k7", 0.0) is not None
+
+def test_sqlite_backend_limit_applies_to_existing_file(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    backend = SqliteBackend(path, max_rows=10)
+    for i in range(10):
+        backend.put(f"k{i}", None, _verdict(i), created=float(i))
+    assert SqliteBackend(path, max_rows=3).count() == 3
+
+def test_verdict_cache_purges_expired_rows_on_put(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+    cache = VerdictCache(ttl=60, path=str(tmp_path / "cache.sqlite"))
+    cache.backend.purge_every = 5
+    for i in range(4):
+        cache.put(f"old{i}", _verdict(i))
+    now[0] += 120
+    for i in range(3):
+        cache.put(f"new{i}", _verdict(i))
+    # Put ke-5 menjalankan purge TTL: empat baris lama terhapus dari disk
+    assert cache.backend.count() == 3
+    assert cache.get_exact("new0") is not None
+
+# Token hasil run_text_preprocessing (sudah di-stem, stopword seperti "tidak" hilang)
+HOAX_TOKENS = ("pesan berantai edar vaksin covid kandung chip magnetik lacak perintah sebar segera keluarga teman "
+               "grup whatsapp hapus dokter rumah sakit benar tubuh tempel logam suntik dua ribu warga lapor gejala "
+               "aneh jangan mau vaksin anak istri lindung orang tua informasi rahasia bocor laboratorium luar "
+               "negeri").split()
+
+def test_rebuttal_quoting_hoax_is_not_a_near_duplicate():
+    cache = VerdictCache()
+    hoax = cache.fingerprint(HOAX_TOKENS)
+    cache.put("hoax", {"prediction": 1, "confidence": 0.97}, hoax)
+    for prefix, suffix in (("hoaks", "sesat"), ("cek", "hoaks"), ("klarifikasi", "salah")):
+        rebuttal = cache.fingerprint([prefix] + HOAX_TOKENS + [suffix])
+        # Lolos SimHash dan Jaccard; yang membedakan hanya penanda bantahan
+        assert result_cache.hamming_distance(hoax[0], rebuttal[0]) <= cache.max_distance
+        assert result_cache.estimate_jaccard(hoax[1], rebuttal[1]) >= cache.min_jaccard
+        assert cache.get_near(rebuttal) is None
+    edited = list(HOAX_TOKENS)
+    edited[5] = "sebut"
+    assert cache.get_near(cache.fingerprint(edited)) == {"prediction": 1, "confidence": 0.97}
+
+def test_rebuttal_guard_survives_sqlite_round_trip(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    writer = VerdictCache(path=path)
+    writer.put("hoax", {"prediction": 1, "confidence": 0.97}, writer.fingerprint(HOAX_TOKENS))
+    reader = VerdictCache(path=path)
+    assert reader.get_near(reader.fingerprint(["hoaks"] + HOAX_TOKENS + ["sesat"])) is None
+    assert reader.get_near(reader.fingerprint(HOAX_TOKENS + ["segera"])) is not None
@@ -0,0 +1,117 @@
+import asyncio
+import os
+import time
+import warnings
+from http import HTTPStatus
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+from service import HttpError, MicroBatcher, _read_request, running_service
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEXT = ("Pemerintah resmi mengumumkan kebijakan baru tentang subsidi energi "
+        "yang mulai berlaku bulan depan menurut keterangan kementerian terkait.")
+
+def _read(raw: bytes):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await _read_request(reader)
+    return asyncio.run(run())
+
+@pytest.mark.parametrize("value", ["-5", "abc", "1.5"])
+def test_invalid_content_length_is_bad_request(value):
+    with pytest.raises(HttpError) as excinfo:
+        _read(f"POST /analyze HTTP/1.1\r\nContent-Length: {value}\r\n\r\n".encode())
+    assert excinfo.value.status == HTTPStatus.BAD_REQUEST
+
+def test_parse_errors_keep_their_cause():
+    for raw in (b"GARBAGE\r\n\r\n", b"POST /analyze HTTP/1.1\r\nContent-Length: abc\r\n\r\n"):
+        with pytest.raises(HttpError) as excinfo:
+            _read(raw)
+        assert isinstance(excinfo.value.__cause__, ValueError)
+
+def test_empty_content_length_means_no_body():
+    assert _read(b"POST /analyze HTTP/1.1\r\nContent-Length: \r\n\r\n")[2] == b""
+
+def test_body_is_read_by_content_length():
+    method, path, body, keep_alive = _read(b'POST /analyze?x=1 HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}extra')
+    assert (method, path, body, keep_alive) == ("POST", "/analyze", b"{}", True)
+
+def _run_batcher(items, max_batch_size, max_wait):
+    sizes = []
+
+    def score(batch):
+        sizes.append(len(batch))
+        return [item * 10 for item in batch]
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=max_batch_size, max_wait=max_wait)
+        batcher.start()
+        try:
+            started = time.perf_counter()
+            results = await asyncio.gather(*(batcher.submit(item) for item in items))
+            return results, time.perf_counter() - started, batcher.stats()
+        finally:
+            await batcher.stop()
+
+    results, elapsed, stats = asyncio.run(run())
+    return results, sizes, elapsed, stats
+
+def test_batcher_flushes_when_batch_is_full():
+    # max_wait sangat panjang: batch hanya bisa terkirim karena ukurannya penuh
+    results, sizes, elapsed, stats = _run_batcher(range(8), max_batch_size=4, max_wait=30.0)
+    assert results == [item * 10 for item in range(8)]
+    assert sizes == [4, 4]
+    assert elapsed < 10
+    assert stats["batches"] == 2 and stats["mean_batch_size"] == 4
+
+def test_batcher_flushes_partial_batch_after_max_wait():
+    results, sizes, elapsed, stats = _run_batcher(range(3), max_batch_size=64, max_wait=0.05)
+    assert results == [0, 10, 20]
+    assert sizes == [3]
+    assert 0.04 <= elapsed < 10
+
+@pytest.fixture(scope="module")
+def resources():
+    pytest.importorskip("sklearn")
+    pytest.importorskip("Sastrawi")
+    from artifacts import load_pickle_resources
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        resources = load_pickle_resources(os.path.join(ROOT, "svm_model.pkl"),
+                                          os.path.join(ROOT, "tfidf_vectorizer.pkl"), lexicon_path=None)
+    return dict(resources, result_cache=None)
+
+def _with_client(resources, scenario):
+    async def run():
+        async with running_service(resources, pool="thread", workers=2) as client:
+            return await scenario(client)
+    return asyncio.run(run())
+
+def test_short_text_is_unprocessable(resources):
+    status, payload = _with_client(resources, lambda client: client.analyze("halo dunia"))
+    assert status == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert "terlalu singkat" in payload["error"]
+
+def test_batch_endpoint_matches_single_requests(resources):
+    texts = [TEXT, "halo dunia", TEXT.upper()]
+
+    async def scenario(client):
+        batch = await client.analyze_batch(texts)
+        singles = [await client.analyze(text) for text in texts]
+        invalid = await client.analyze_batch([TEXT, ""])
+        return batch, singles, invalid
+
+    (status, payload), singles, invalid = _with_client(resources, scenario)
+    assert status == HTTPStatus.OK
+    assert len(payload["results"]) == len(texts)
+    assert "error" in payload["results"][1]
+    for result, (_, single) in zip(payload["results"], singles):
+        assert {key: result.get(key) for key in ("prediction", "label", "confidence", "error")} == \
+            {key: single.get(key) for key in ("prediction", "label", "confidence", "error")}
+    assert invalid[0] == HTTPStatus.BAD_REQUEST
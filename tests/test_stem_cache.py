@@ -0,0 +1,38 @@
+from stem_cache import CachedStemmer, load_lexicon
+
+class UpperStemmer:
+    def __init__(self):
+        self.calls = 0
+
+    def stem(self, word):
+        self.calls += 1
+        return word.upper()
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+def test_new_stems_are_appended_once(tmp_path):
+    # LRU sekecil apa pun tidak membuat kata yang sama ditulis ulang ke leksikon
+    path = str(tmp_path / "stem_lexicon.tsv")
+    stemmer = CachedStemmer(UpperStemmer(), lexicon_path=path, max_size=1, autosave_every=2)
+    for word in ["makan", "minum", "makan", "tidur", "minum", "makan"]:
+        stemmer.stem(word)
+    stemmer.flush()
+    assert sorted(_lines(path)) == ["makan\tMAKAN", "minum\tMINUM", "tidur\tTIDUR"]
+    assert stemmer.stemmer.calls == 3
+
+def test_stems_written_by_another_process_are_skipped(tmp_path):
+    path = str(tmp_path / "stem_lexicon.tsv")
+    first = CachedStemmer(UpperStemmer(), lexicon_path=path)
+    second = CachedStemmer(UpperStemmer(), lexicon_path=path)
+    first.stem("makan")
+    second.stem("makan")
+    second.stem("minum")
+    assert first.flush() == 1
+    assert second.flush() == 1
+    first.stem("tidur")
+    first.flush()
+    assert _lines(path) == ["makan\tMAKAN", "minum\tMINUM", "tidur\tTIDUR"]
+    assert load_lexicon(path) == {"makan": "MAKAN", "minum": "MINUM", "tidur": "TIDUR"}
+    assert first.lexicon["minum"] == "MINUM"
@@ -0,0 +1,73 @@
+import os
+import warnings
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("sklearn")
+pytest.importorskip("Sastrawi")
+
+from app import _perform_analysis, run_text_preprocessing
+from artifacts import load_pickle_resources
+from streaming import (
+    StreamingAnalysis,
+    analyze_stream,
+    compare_results,
+    iter_chunks,
+    synthetic_document,
+    verify_streaming,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TAIL = (" Dilansir dari http://contoh.go.id/berita?id=12 pada 17 Agustus 2024, PRESIDEN menegaskan:"
+        " \"jangan kaget\"... wajib tahu!! Ternyata tak disangka, sebarkan-sebarkan ke 1000 grup?")
+# Termasuk 1 karakter per potongan, sehingga setiap batas potongan jatuh di tengah token
+CHUNK_SIZES = (1, 3, 17, 256, 4096)
+
+@pytest.fixture(scope="module")
+def resources():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        resources = load_pickle_resources(os.path.join(ROOT, "svm_model.pkl"),
+                                          os.path.join(ROOT, "tfidf_vectorizer.pkl"))
+    return dict(resources, result_cache=None)
+
+@pytest.fixture(scope="module")
+def text():
+    return "".join(synthetic_document(6000, 2)) + TAIL
+
+def _in_memory_counts(text, resources):
+    vectorizer = resources["vectorizer"]
+    cleaned_text = run_text_preprocessing(text, resources["stemmer"], resources["stopwords"])
+    terms = vectorizer.build_analyzer()(cleaned_text)
+    return Counter(term for term in terms if term in vectorizer.vocabulary_)
+
+def _streamed(pieces, resources):
+    analysis = StreamingAnalysis(resources)
+    for piece in pieces:
+        analysis.feed(piece)
+    return analysis
+
+@pytest.mark.parametrize("chunk_chars", CHUNK_SIZES)
+@pytest.mark.parametrize("path", ["compiled", "sklearn"])
+def test_streamed_counts_and_prediction_match(resources, text, chunk_chars, path):
+    if path == "sklearn":
+        resources = dict(resources, scorer=None)
+    analysis = _streamed(iter_chunks(text, chunk_chars), resources)
+    result = analysis.result()
+    assert analysis.counts == _in_memory_counts(text, resources)
+    assert analysis.token_count == len(run_text_preprocessing(text, resources["stemmer"], resources["stopwords"]).split())
+    assert verify_streaming(text, resources, chunk_chars) == []
+    assert result["prediction"] == analyze_stream(text, resources)["prediction"]
+
+def test_boundary_inside_token_and_url(resources, text):
+    # Potongan diputus di tengah kata, angka, URL dan frasa umpan klik
+    cuts = sorted({text.index(marker) + offset for marker, offset in
+                   (("PRESIDEN", 3), ("http", 9), ("2024", 2), ("jangan kaget", 8), ("sebarkan-", 9))})
+    pieces = [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+    assert "".join(pieces) == text
+    analysis = _streamed(pieces, resources)
+    streamed = analysis.result()
+    assert analysis.counts == _in_memory_counts(text, resources)
+    assert compare_results(streamed, _perform_analysis(text, resources)) == []
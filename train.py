@@ -0,0 +1,343 @@
+import argparse
+import csv
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from collections import deque
+
+import joblib
+import numpy as np
+
+from artifacts import (
+    DEFAULT_ARTIFACT_DIR,
+    DEFAULT_MODEL_PATH,
+    DEFAULT_VECTORIZER_PATH,
+    MODEL_DIR_ENV,
+    MODEL_INFO_PATH,
+    convert,
+    has_artifacts,
+    model_path,
+)
+from batch import chunked, detect_format
+from preprocess_pool import DEFAULT_CHUNK_SIZE, PreprocessPool
+from stem_cache import DEFAULT_LEXICON_PATH
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+METHODS = ("tfidf-svm", "hashing-sgd")
+DEFAULT_TEST_RATIO = 0.1
+DEFAULT_BATCH_SIZE = 10_000
+DEFAULT_EPOCHS = 5
+DEFAULT_HASH_BITS = 20
+DEFAULT_SEED = 42
+# Lipatan CV untuk kalibrasi sigmoid pada jalur tfidf-svm (CalibratedClassifierCV)
+DEFAULT_CALIBRATION_FOLDS = 3
+
+HOAX_LABELS = {"1", "hoax", "hoaks", "true"}
+VALID_LABELS = {"0", "valid", "fakta", "false"}
+METHOD_NAMES = {"tfidf-svm": "SVM", "hashing-sgd": "SGD"}
+
+# =============================================================================
+# 2. PEMBACAAN KORPUS BERLABEL SECARA STREAMING
+# =============================================================================
+
+def parse_label(value) -> int:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return int(value)
+    text = str(value).strip().lower()
+    if text in HOAX_LABELS:
+        return 1
+    if text in VALID_LABELS:
+        return 0
+    raise ValueError(f"Label tidak dikenali: {value!r}")
+
+def read_labelled(stream, fmt: str, text_field: str = "text", label_field: str = "label"):
+    # Menghasilkan pasangan (teks, label) satu per satu; korpus tidak pernah dimuat utuh
+    if fmt == "csv":
+        rows = csv.DictReader(stream)
+    else:
+        rows = (json.loads(line) for line in stream if line.strip())
+    for row in rows:
+        text = row.get(text_field) or ""
+        if text.strip():
+            yield text, parse_label(row.get(label_field))
+
+def is_held_out(text: str, test_ratio: float) -> bool:
+    # Pembagian deterministik berdasarkan hash teks: teks identik selalu jatuh
+    # ke bagian yang sama sehingga duplikat tidak bocor ke data uji
+    return zlib.crc32(text.encode("utf-8")) % 10_000 < test_ratio * 10_000
+
+# =============================================================================
+# 3. PRA-PEMROSESAN PARALEL KE FILE SPOOL
+# =============================================================================
+
+def spool_corpus(records, spool_dir: str, workers: int, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 test_ratio: float = DEFAULT_TEST_RATIO, artifact_dir: str = None,
+                 lexicon_path: str = DEFAULT_LEXICON_PATH) -> dict:
+    # Teks bersih ditulis satu per baris ("label<TAB>teks") ke train.tsv/test.tsv
+    # agar tahap pelatihan dapat membaca ulang korpus tanpa menstem ulang
+    counts = {"train": 0, "test": 0, "empty": 0}
+    paths = {split: os.path.join(spool_dir, f"{split}.tsv") for split in ("train", "test")}
+    files = {split: open(path, "w", encoding="utf-8") for split, path in paths.items()}
+    # Label dan pembagian dicatat saat teks diserahkan ke pool; hasil pool
+    # kembali dalam urutan input sehingga cukup diambil dari depan antrean
+    pending = deque()
+
+    def texts():
+        for text, label in records:
+            pending.append((is_held_out(text, test_ratio), label))
+            yield text
+
+    start = time.perf_counter()
+    try:
+        with PreprocessPool(workers, chunk_size, artifact_dir, lexicon_path) as pool:
+            for cleaned_text in pool.imap(texts()):
+                held_out, label = pending.popleft()
+                if not cleaned_text:
+                    counts["empty"] += 1
+                    continue
+                split = "test" if held_out else "train"
+                files[split].write(f"{label}\t{cleaned_text}\n")
+                counts[split] += 1
+    finally:
+        for f in files.values():
+            f.close()
+    elapsed = time.perf_counter() - start
+    total = counts["train"] + counts["test"] + counts["empty"]
+    return {
+        **counts,
+        "paths": paths,
+        "seconds": elapsed,
+        "docs_per_s": total / elapsed if elapsed else 0.0,
+    }
+
+def iter_spool(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            label, _, text = line.rstrip("\n").partition("\t")
+            yield int(label), text
+
+def _shuffled(iterable, buffer_size: int, rng: random.Random):
+    # Pengacakan dengan buffer terbatas, cukup agar SGD tidak melihat label terurut
+    buffer = []
+    for item in iterable:
+        buffer.append(item)
+        if len(buffer) >= buffer_size:
+            rng.shuffle(buffer)
+            yield from buffer[: buffer_size // 2]
+            del buffer[: buffer_size // 2]
+    rng.shuffle(buffer)
+    yield from buffer
+
+# =============================================================================
+# 4. PELATIHAN
+# =============================================================================
+
+def train_tfidf_svm(train_path: str, C: float = 1.0, min_df: int = 1, max_features: int = None,
+                    sublinear_tf: bool = False, calibration_folds: int = DEFAULT_CALIBRATION_FOLDS,
+                    seed: int = DEFAULT_SEED):
+    # Jalur kosakata eksplisit: TfidfVectorizer unigram + SVM linear (liblinear,
+    # waktu latih linear terhadap jumlah dokumen) dengan kalibrasi sigmoid lewat
+    # CalibratedClassifierCV. ensemble=False menyisakan satu model linear sehingga
+    # tetap dapat dikompilasi menjadi LinearScorer. Matriks sparse TF-IDF seluruh
+    # data latih tetap harus muat di memori; untuk korpus yang lebih besar dari
+    # itu gunakan hashing-sgd. (SVC libsvm pada model bawaan berskala superlinear
+    # dan tidak selesai pada jutaan dokumen.)
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.svm import LinearSVC
+
+    vectorizer = TfidfVectorizer(min_df=min_df, max_features=max_features, sublinear_tf=sublinear_tf)
+    matrix = vectorizer.fit_transform(text for _, text in iter_spool(train_path))
+    labels = np.fromiter((label for label, _ in iter_spool(train_path)), dtype=np.int64)
+    model = CalibratedClassifierCV(
+        LinearSVC(C=C, random_state=seed), method="sigmoid", cv=calibration_folds, ensemble=False,
+    )
+    model.fit(matrix, labels)
+    return model, vectorizer
+
+def train_hashing_sgd(train_path: str, epochs: int = DEFAULT_EPOCHS, batch_size: int = DEFAULT_BATCH_SIZE,
+                      hash_bits: int = DEFAULT_HASH_BITS, ngram_max: int = 1, alpha: float = 1e-5,
+                      seed: int = DEFAULT_SEED):
+    # Jalur out-of-core: HashingVectorizer tidak perlu kosakata, SGD (log loss)
+    # dilatih per batch lewat partial_fit, memori konstan terhadap ukuran korpus
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.linear_model import SGDClassifier
+
+    vectorizer = HashingVectorizer(
+        n_features=2 ** hash_bits, alternate_sign=False, ngram_range=(1, ngram_max), norm="l2",
+    )
+    model = SGDClassifier(loss="log_loss", alpha=alpha, random_state=seed)
+    rng = random.Random(seed)
+    for _ in range(epochs):
+        for batch in chunked(_shuffled(iter_spool(train_path), batch_size * 4, rng), batch_size):
+            labels, texts = zip(*batch)
+            model.partial_fit(vectorizer.transform(texts), np.asarray(labels), classes=np.array([0, 1]))
+    return model, vectorizer
+
+def evaluate(model, vectorizer, test_path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    confusion = {"tp": 0, "tn": 0, "fp": 0, "fn": 0}
+    for batch in chunked(iter_spool(test_path), batch_size):
+        labels, texts = zip(*batch)
+        for expected, predicted in zip(labels, model.predict(vectorizer.transform(texts))):
+            key = ("t" if expected == predicted else "f") + ("p" if predicted == 1 else "n")
+            confusion[key] += 1
+    total = sum(confusion.values())
+    predicted_hoax = confusion["tp"] + confusion["fp"]
+    actual_hoax = confusion["tp"] + confusion["fn"]
+    return {
+        "n_test": total,
+        "accuracy": (confusion["tp"] + confusion["tn"]) / total if total else None,
+        "precision_hoax": confusion["tp"] / predicted_hoax if predicted_hoax else None,
+        "recall_hoax": confusion["tp"] / actual_hoax if actual_hoax else None,
+        "confusion": confusion,
+    }
+
+def _peak_memory_mb() -> dict:
+    # ru_maxrss dalam KB di Linux; RUSAGE_CHILDREN = puncak worker yang sudah selesai
+    return {
+        "main": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "workers": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+def train(corpus_path: str, method: str, output_dir: str, workers: int = os.cpu_count() or 1,
+          fmt: str = "auto", text_field: str = "text", label_field: str = "label",
+          test_ratio: float = DEFAULT_TEST_RATIO, chunk_size: int = DEFAULT_CHUNK_SIZE,
+          artifact_dir: str = None, lexicon_path: str = DEFAULT_LEXICON_PATH, spool_dir: str = None,
+          **options) -> dict:
+    fmt = detect_format(corpus_path, ("jsonl", "csv"), "jsonl") if fmt == "auto" else fmt
+    started = time.perf_counter()
+    cleanup_spool = spool_dir is None
+    spool_dir = spool_dir or tempfile.mkdtemp(prefix="hoax-train-")
+    try:
+        with open(corpus_path, encoding="utf-8", newline="") as stream:
+            spool = spool_corpus(
+                read_labelled(stream, fmt, text_field, label_field), spool_dir, workers,
+                chunk_size=chunk_size, test_ratio=test_ratio,
+                artifact_dir=artifact_dir, lexicon_path=lexicon_path,
+            )
+
+        fit_started = time.perf_counter()
+        if method == "tfidf-svm":
+            model, vectorizer = train_tfidf_svm(spool["paths"]["train"], **options)
+        else:
+            model, vectorizer = train_hashing_sgd(spool["paths"]["train"], **options)
+        fit_seconds = time.perf_counter() - fit_started
+
+        evaluation = evaluate(model, vectorizer, spool["paths"]["test"])
+    finally:
+        if cleanup_spool:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+
+    os.makedirs(output_dir, exist_ok=True)
+    joblib.dump(model, model_path(DEFAULT_MODEL_PATH, output_dir))
+    joblib.dump(vectorizer, model_path(DEFAULT_VECTORIZER_PATH, output_dir))
+
+    total_seconds = time.perf_counter() - started
+    documents = spool["train"] + spool["test"] + spool["empty"]
+    info = {
+        "method": method,
+        "method_name": METHOD_NAMES[method],
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "corpus": os.path.abspath(corpus_path),
+        "n_train": spool["train"],
+        "n_empty": spool["empty"],
+        **evaluation,
+        "workers": workers,
+        "preprocess_seconds": spool["seconds"],
+        "preprocess_docs_per_s": spool["docs_per_s"],
+        "fit_seconds": fit_seconds,
+        "fit_docs_per_s": spool["train"] / fit_seconds if fit_seconds else 0.0,
+        "total_seconds": total_seconds,
+        "total_docs_per_s": documents / total_seconds if total_seconds else 0.0,
+        "peak_memory_mb": _peak_memory_mb(),
+    }
+    with open(model_path(MODEL_INFO_PATH, output_dir), "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+    return info
+
+# =============================================================================
+# 5. EKSEKUSI CLI
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latih ulang model deteksi hoax dari korpus berlabel secara streaming.")
+    parser.add_argument("corpus", help="Korpus JSONL/CSV dengan kolom teks dan label (1/hoax, 0/valid).")
+    parser.add_argument("--method", choices=METHODS, default="tfidf-svm",
+                        help="tfidf-svm: SVM linear terkalibrasi, matriks TF-IDF harus muat di memori; "
+                             "hashing-sgd: out-of-core, memori konstan untuk korpus besar.")
+    parser.add_argument("-o", "--output-dir", default=".", help="Direktori tujuan svm_model.pkl dan tfidf_vectorizer.pkl.")
+    parser.add_argument("--overwrite", action="store_true", help="Izinkan menimpa model yang sudah ada.")
+    parser.add_argument("--format", choices=("auto", "jsonl", "csv"), default="auto")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--label-field", default="label")
+    parser.add_argument("--test-ratio", type=float, default=DEFAULT_TEST_RATIO)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Jumlah proses stemming paralel.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Jumlah teks per tugas worker.")
+    parser.add_argument("--spool-dir", help="Simpan teks bersih di sini (default: direktori sementara, dihapus).")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--C", type=float, default=1.0, help="[tfidf-svm] Parameter regularisasi LinearSVC.")
+    parser.add_argument("--calibration-folds", type=int, default=DEFAULT_CALIBRATION_FOLDS, help="[tfidf-svm]")
+    parser.add_argument("--min-df", type=int, default=1, help="[tfidf-svm]")
+    parser.add_argument("--max-features", type=int, help="[tfidf-svm]")
+    parser.add_argument("--sublinear-tf", action="store_true", help="[tfidf-svm]")
+    parser.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS, help="[hashing-sgd]")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="[hashing-sgd]")
+    parser.add_argument("--hash-bits", type=int, default=DEFAULT_HASH_BITS, help="[hashing-sgd]")
+    parser.add_argument("--ngram-max", type=int, default=1, help="[hashing-sgd]")
+    parser.add_argument("--alpha", type=float, default=1e-5, help="[hashing-sgd]")
+    args = parser.parse_args(argv)
+
+    targets = [model_path(name, args.output_dir) for name in (DEFAULT_MODEL_PATH, DEFAULT_VECTORIZER_PATH)]
+    if not args.overwrite and any(os.path.exists(path) for path in targets):
+        print(f"Error: model sudah ada di {args.output_dir}; gunakan --overwrite atau --output-dir lain.", file=sys.stderr)
+        return 1
+
+    if args.method == "tfidf-svm":
+        options = {"C": args.C, "min_df": args.min_df, "max_features": args.max_features,
+                   "sublinear_tf": args.sublinear_tf, "calibration_folds": args.calibration_folds,
+                   "seed": args.seed}
+    else:
+        options = {"epochs": args.epochs, "batch_size": args.batch_size, "hash_bits": args.hash_bits,
+                   "ngram_max": args.ngram_max, "alpha": args.alpha, "seed": args.seed}
+
+    info = train(
+        args.corpus, args.method, args.output_dir, workers=args.workers, fmt=args.format,
+        text_field=args.text_field, label_field=args.label_field, test_ratio=args.test_ratio,
+        chunk_size=args.chunk_size, spool_dir=args.spool_dir, **options,
+    )
+    accuracy = f"{info['accuracy']:.2%}" if info["accuracy"] is not None else "-"
+    print(f"Metode          : {args.method}")
+    print(f"Data latih/uji  : {info['n_train']} / {info['n_test']} ({info['n_empty']} kosong dilewati)")
+    print(f"Akurasi uji     : {accuracy}")
+    print(f"Pra-pemrosesan  : {info['preprocess_docs_per_s']:.1f} dok/s dengan {info['workers']} worker")
+    print(f"Pelatihan       : {info['fit_seconds']:.1f} s ({info['fit_docs_per_s']:.1f} dok/s)")
+    print(f"Total           : {info['total_seconds']:.1f} s ({info['total_docs_per_s']:.1f} dok/s)")
+    print(f"Memori puncak   : {info['peak_memory_mb']['main']:.0f} MB utama, "
+          f"{info['peak_memory_mb']['workers']:.0f} MB per worker")
+
+    # Artefak mmap lama akan lebih diutamakan load_resources daripada pickle baru
+    artifact_dir = model_path(DEFAULT_ARTIFACT_DIR, args.output_dir)
+    if has_artifacts(artifact_dir):
+        try:
+            convert(targets[0], targets[1], artifact_dir)
+            print(f"Artefak mmap di {artifact_dir} diperbarui.")
+        except ValueError:
+            print(f"Peringatan: {artifact_dir} berisi model lama dan tidak dapat dibuat dari model ini; "
+                  f"hapus direktori tersebut agar model baru dipakai.", file=sys.stderr)
+    if os.path.abspath(args.output_dir) != os.path.abspath(model_path("")):
+        print(f"Jalankan aplikasi dengan {MODEL_DIR_ENV}={args.output_dir} agar model dan metrik ini dipakai.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from bench import DEFAULT_SEED, generate_corpus, summarize
+
+# =============================================================================
+# 1. KONFIGURASI
+# =============================================================================
+
+DEFAULT_APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+DEFAULT_SESSIONS = 10
+# Rerun tanpa submit per sesi, meniru interaksi widget setelah hasil tampil
+DEFAULT_RERUNS = 20
+DEFAULT_TIMEOUT_SECONDS = 60
+SUBMIT_LABEL = "Periksa Berita"
+RESULT_HEADERS = ("Terindikasi HOAX", "Terindikasi VALID")
+# Diimpor sebelum pengukuran; tanpa ini skrip yang diukur lebih dulu menanggung
+# biaya impor (~2 s CPU) dan "muat awal" kedua skrip tidak sebanding
+WARM_IMPORTS = ("numpy", "plotly.graph_objects", "sklearn.svm", "sklearn.feature_extraction.text",
+                "Sastrawi.Stemmer.StemmerFactory", "Sastrawi.StopWordRemover.StopWordRemoverFactory")
+
+# =============================================================================
+# 2. SESI STREAMLIT DALAM PROSES
+# =============================================================================
+
+# AppTest menjalankan skrip di thread proses ini, sehingga time.process_time()
+# mencakup seluruh CPU server untuk rerun tersebut
+def _timed_run(app_test):
+    cpu, wall = time.process_time(), time.perf_counter()
+    app_test.run()
+    if app_test.exception:
+        raise RuntimeError(f"Skrip gagal: {app_test.exception[0].message}")
+    return (time.process_time() - cpu) * 1000, (time.perf_counter() - wall) * 1000
+
+def _verdict(app_test):
+    for element in app_test.markdown:
+        for header in RESULT_HEADERS:
+            if header in element.value:
+                return header
+    return None
+
+def run_session(text: str, app_path: str = DEFAULT_APP_PATH, reruns: int = DEFAULT_RERUNS,
+                timeout: float = DEFAULT_TIMEOUT_SECONDS) -> dict:
+    app_test = AppTest.from_file(app_path, default_timeout=timeout)
+    load_cpu_ms, load_wall_ms = _timed_run(app_test)
+
+    app_test.text_area(key="text_input").input(text)
+    submit = next(button for button in app_test.button if button.label == SUBMIT_LABEL)
+    submit.click()
+    submit_cpu_ms, submit_wall_ms = _timed_run(app_test)
+    verdict = _verdict(app_test)
+
+    rerun_cpu, rerun_wall = [], []
+    for _ in range(reruns):
+        cpu_ms, wall_ms = _timed_run(app_test)
+        rerun_cpu.append(cpu_ms)
+        rerun_wall.append(wall_ms)
+
+    return {
+        "verdict": verdict,
+        "load_cpu_ms": load_cpu_ms,
+        "load_wall_ms": load_wall_ms,
+        "submit_cpu_ms": submit_cpu_ms,
+        "submit_wall_ms": submit_wall_ms,
+        "rerun_cpu_ms": rerun_cpu,
+        "rerun_wall_ms": rerun_wall,
+        "session_cpu_ms": load_cpu_ms + submit_cpu_ms + sum(rerun_cpu),
+    }
+
+def warm_imports(modules=WARM_IMPORTS):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+def profile_sessions(texts, app_path: str = DEFAULT_APP_PATH, reruns: int = DEFAULT_RERUNS,
+                     timeout: float = DEFAULT_TIMEOUT_SECONDS) -> dict:
+    sessions = [run_session(text, app_path, reruns, timeout) for text in texts]
+    return {
+        "app": app_path,
+        "sessions": len(sessions),
+        "reruns_per_session": reruns,
+        # Sesi pertama menanggung pemuatan model; dipisah agar tidak mendominasi
+        "first_load_cpu_ms": sessions[0]["load_cpu_ms"] if sessions else 0.0,
+        "submit_cpu": summarize([s["submit_cpu_ms"] / 1000 for s in sessions]),
+        "submit_wall": summarize([s["submit_wall_ms"] / 1000 for s in sessions]),
+        "rerun_cpu": summarize([ms / 1000 for s in sessions for ms in s["rerun_cpu_ms"]]),
+        "session_cpu": summarize([s["session_cpu_ms"] / 1000 for s in sessions[1:] or sessions]),
+        "verdicts": [s["verdict"] for s in sessions],
+    }
+
+# =============================================================================
+# 3. CLI
+# =============================================================================
+
+def _print_profile(name: str, profile: dict):
+    print(f"{name}: {profile['app']}")
+    print(f"  muat awal          {profile['first_load_cpu_ms']:>10.1f} ms CPU")
+    for label, key in (("submit (CPU)", "submit_cpu"), ("submit (wall)", "submit_wall"),
+                       ("rerun (CPU)", "rerun_cpu"), ("per sesi (CPU)", "session_cpu")):
+        stats = profile[key]
+        print(f"  {label:<18} p50 {stats['p50_ms']:>9.1f} ms   p95 {stats['p95_ms']:>9.1f} ms   rata-rata {stats['mean_ms']:>9.1f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ukur CPU server per sesi Streamlit (AppTest, dalam proses).")
+    parser.add_argument("--app", default=DEFAULT_APP_PATH, help="Skrip aplikasi yang diukur.")
+    parser.add_argument("--compare", help="Skrip pembanding, mis. app.py versi sebelumnya (git show REV:app.py).")
+    parser.add_argument("-n", "--sessions", type=int, default=DEFAULT_SESSIONS)
+    parser.add_argument("--reruns", type=int, default=DEFAULT_RERUNS)
+    parser.add_argument("--repeat-texts", action="store_true",
+                        help="Semua sesi mengirim teks yang sama (cache verdict antarsesi).")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_SECONDS)
+    parser.add_argument("-o", "--output", help="Simpan hasil sebagai JSON.")
+    args = parser.parse_args(argv)
+    if args.sessions < 1:
+        print("Error: --sessions harus >= 1.", file=sys.stderr)
+        return 2
+
+    texts = [record["text"] for record in generate_corpus(args.sessions, args.seed)]
+    if args.repeat_texts:
+        texts = [texts[0]] * args.sessions
+
+    warm_imports()
+    report = {"current": profile_sessions(texts, args.app, args.reruns, args.timeout)}
+    _print_profile("Sekarang", report["current"])
+    status = 0
+    if args.compare:
+        report["baseline"] = profile_sessions(texts, args.compare, args.reruns, args.timeout)
+        _print_profile("Pembanding", report["baseline"])
+        before = report["baseline"]["session_cpu"]["mean_ms"]
+        after = report["current"]["session_cpu"]["mean_ms"]
+        reduction = 1 - after / before if before else 0.0
+        report["session_cpu_reduction"] = reduction
+        print(f"Penurunan CPU per sesi: {reduction:.1%}")
+        if report["baseline"]["verdicts"] != report["current"]["verdicts"]:
+            print("PERINGATAN: verdict berbeda antara kedua skrip.")
+            status = 1
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())